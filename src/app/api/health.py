@@ -1,7 +1,42 @@
 from fastapi import APIRouter
+from app.core.couple_profile import couple_profiles
+from app.core.course_session import course_sessions
+from app.core.prompt_registry import prompt_registry
+from app.core.request_dedup import recommend_dedup
+from app.nodes.prefetch_node import prefetch_stats
+from app.pipelines.early_dispatch import early_dispatch_stats
+from app.places_api.nearby_cache import nearby_cache
+from app.places_api.tile_cache import tile_cache
+from app.places_api.poi_store import poi_store
+from app.utils.concurrency import concurrency_stats
+from app.utils.deadline import deadline_stats
+from app.utils.hedge import hedge_stats
+from app.utils.ranking import prompt_savings
+from app.utils.singleflight import singleflight_stats
 
 router = APIRouter()
 
 @router.get("/health")
 async def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@router.get("/health/stats")
+async def health_stats():
+    """캐시 적중률 등 성능 관련 카운터."""
+    return {
+        "places_nearby_cache": nearby_cache.stats(),
+        "places_tile_cache": tile_cache.stats(),
+        "poi_store": poi_store.stats(),
+        "couple_profile": couple_profiles.stats(),
+        "course_session": course_sessions.stats(),
+        "recommend_dedup": recommend_dedup.stats(),
+        "places_prefetch": prefetch_stats.stats(),
+        "singleflight": singleflight_stats(),
+        "concurrency": concurrency_stats(),
+        "prompt_savings": prompt_savings.stats(),
+        "prompts": prompt_registry.stats(),
+        "deadline": deadline_stats.stats(),
+        "llm_hedge": hedge_stats(),
+        "sequence_stream": early_dispatch_stats.stats(),
+    }
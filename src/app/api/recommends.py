@@ -1,13 +1,18 @@
 # src/app/api/recommends.py
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator
 from app.core.auth import verify_token
+from app.core.couple_profile import couple_profiles, wants_fresh
+from app.core.course_session import course_sessions, new_course_id
+from app.core.request_dedup import recommend_dedup, recommend_fingerprint
 from app.models.lg_schemas import State
 from app.pipelines.pipeline import build_workflow
+from app.utils.deadline import new_deadline
 from app.utils.filters.categories import ALL_CATEGORIES
-from config import AUTH_SERVICE_URL
-import httpx
 import traceback
 import json
+import time
 
 router = APIRouter()
 
@@ -48,23 +53,41 @@ def _build_response_payload(final_state: State) -> dict:
         data = parsed_output.get("data") or data
         title = parsed_output.get("title") or title
 
-    return {"title": title, "explain": explain, "data": data}
+    total_distance_m = (parsed_output or {}).get("total_distance_m", final_state.get("route_distance_m"))
+    return {"title": title, "explain": explain, "data": data, "total_distance_m": total_distance_m}
 
 
-@router.post("/recommends")
-async def recommend_course(
-    body: dict,
-    request: Request,
-    token_payload: dict = Depends(verify_token)
-):
+def _save_course_session(final_state: State, payload: dict) -> dict:
+    """리롤용 코스 세션 저장 후 응답에 course_id를 붙인다 (세션을 끈 경우 None)."""
+    course_id = final_state.get("course_id")
+    if not course_id or not course_sessions.enabled or not payload.get("data"):
+        return {**payload, "course_id": None}
+    try:
+        course_sessions.save(course_sessions.build(
+            course_id,
+            couple_id=final_state.get("couple_id"),
+            recommendations=payload["data"],
+            pools=final_state.get("candidate_pools") or {},
+            shortlists=final_state.get("shortlists") or {},
+            user_choice=final_state.get("user_choice") or {},
+            user=final_state.get("user") or {},
+            partner=final_state.get("partner") or {},
+            couple=final_state.get("couple") or {},
+        ))
+    except Exception as e:
+        print(f"⚠️ 코스 세션 저장 실패: {e}")
+        return {**payload, "course_id": None}
+    print(f"💾 코스 세션 저장: {course_id}")
+    return {**payload, "course_id": course_id}
+
+
+async def _prepare_state(body: dict, request: Request, token_payload: dict) -> State:
     """
-    추천 코스 생성 API
-    - Header: Authorization: Bearer <JWT>
-    - Body: user_choice 정보
+    JWT / Auth 서비스 / body로 LangGraph 초기 상태를 만든다.
+    (`/recommends`와 `/recommends/stream`이 공유)
     """
-    print("\n===============================")
-    print("📡 [AI-Service] Recommend API 호출 시작")
-    print("===============================")
+    # ⏱️ 요청 마감 시각 (Auth 호출 시간 포함, 파이프라인 노드들이 남은 시간을 나눠 씀)
+    deadline_ts = new_deadline(time.monotonic())
 
     # 1️⃣ JWT에서 사용자 정보 추출
     user_id = token_payload.get("userId")
@@ -82,49 +105,11 @@ async def recommend_course(
         print("❌ Authorization 헤더 없음")
         raise HTTPException(status_code=401, detail="Authorization Header is missing in the request.")
 
-    # 2️⃣ Auth 서비스 요청 URL 구성
-    auth_url = f"{AUTH_SERVICE_URL}/api/couples/{couple_id}/recommendation-data"
-    headers = {"Authorization": auth_header}
-    print(f"🌐 Auth 서비스 URL: {auth_url}")
-    print(f"📬 전송 헤더: {headers}")
-
-    # 3️⃣ Auth 서비스 호출 (디버깅용 로그 포함)
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(auth_url, headers=headers)
-            print(f"✅ Auth 응답 상태코드: {response.status_code}")
-            if response.status_code != 200:
-                print(f"⚠️ Auth 응답 본문: {response.text[:500]}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Auth 요청 실패: {response.text}"
-                )
-            auth_data = response.json()
-            print("✅ Auth 데이터 수신 완료")
-            print(f"👤 Auth 응답 데이터: {json.dumps(auth_data, ensure_ascii=False)[:500]}")
-
-    except httpx.ConnectError as e:
-        print("❌ [ConnectError] Auth 서비스 연결 실패:", str(e))
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Auth 연결 실패: {str(e)}")
-
-    except httpx.ReadTimeout:
-        print("❌ [Timeout] Auth 서비스 응답 지연 (10초 초과)")
-        raise HTTPException(status_code=504, detail="Auth 응답 지연 (Timeout)")
-
-    except httpx.RequestError as e:
-        print(f"❌ [RequestError] {type(e)}: {str(e)}")
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Auth 요청 중 예외 발생: {str(e)}")
-
-    except Exception as e:
-        print(f"❌ [Unexpected Error] {type(e)}: {str(e)}")
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"예상치 못한 오류: {str(e)}")
+    # 2️⃣~3️⃣ Auth 서비스 커플 데이터 (coupleId 단위 캐시 + 공유 커넥션 풀, 동시 조회는 한 번만 호출)
+    data_block = await couple_profiles.get(couple_id, auth_header, refresh=wants_fresh(request))
 
     # 4️⃣ Auth 응답 파싱
     try:
-        data_block = auth_data.get("data", {}) 
         user = data_block.get("user", {})
         partner = data_block.get("partner", {})
         couple_data = data_block.get("couple", {})
@@ -154,10 +139,11 @@ async def recommend_course(
 
     # 6️⃣ Territory 지역 잠금 검증 로직 제거됨 (지역락 미적용)
 
-    # 7️⃣ LangGraph 파이프라인 실행
+    # 7️⃣ LangGraph 초기 상태
     try:
         previous_recommendations = body.get("previous_recommendations") or []
         exclude_pois = body.get("exclude_pois") or []
+        planner_mode = body.get("planner_mode")  # "per_category" | "batched" (없으면 서버 기본값)
 
         state: State = {
             "query": "데이트 추천",
@@ -178,8 +164,51 @@ async def recommend_course(
             "check_count": 0,
             "course_title": None,
             "sequence_explain": None,
+            "planner_mode": planner_mode,
+            "deadline_ts": deadline_ts,
+            "course_id": new_course_id(),
+            "couple_id": str(couple_id),
         }
+    except Exception as e:
+        print("❌ 초기 상태 구성 실패:", str(e))
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"초기 상태 구성 실패: {str(e)}")
+
+    return state
+
+
+@router.post("/recommends")
+async def recommend_course(
+    body: dict,
+    request: Request,
+    token_payload: dict = Depends(verify_token)
+):
+    """
+    추천 코스 생성 API
+    - Header: Authorization: Bearer <JWT>
+    - Body: user_choice 정보
+    """
+    print("\n===============================")
+    print("📡 [AI-Service] Recommend API 호출 시작")
+    print("===============================")
+
+    # 🪁 재시도 / 연속 탭으로 들어온 같은 요청은 파이프라인 1회 실행을 공유 (완료 후 잠시 재전송)
+    couple_id = token_payload.get("coupleId")
+    if not couple_id:
+        return await _run_recommend(body, request, token_payload)
+    return await recommend_dedup.run(
+        recommend_fingerprint(couple_id, body),
+        lambda: _run_recommend(body, request, token_payload),
+        fresh=wants_fresh(request),
+    )
 
+
+async def _run_recommend(body: dict, request: Request, token_payload: dict) -> dict:
+    """`/recommends` 본체: 초기 상태 구성 → LangGraph 실행 → 코스 세션 저장."""
+    state = await _prepare_state(body, request, token_payload)
+
+    # 8️⃣ LangGraph 파이프라인 실행
+    try:
         print("⚙️ LangGraph 실행 시작...")
         final_state = await app.ainvoke(state)
         print("✅ LangGraph 실행 완료")
@@ -189,11 +218,95 @@ async def recommend_course(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"LangGraph 실행 오류: {str(e)}")
 
-    # 8️⃣ 최종 응답
+    # 9️⃣ 최종 응답
     print("🎯 추천 결과 개수:", len(final_state.get("recommendations", [])))
     print("===============================\n")
 
-    return _build_response_payload(final_state)
+    return _save_course_session(final_state, _build_response_payload(final_state))
+
+
+def _encode_event(event: dict, sse: bool) -> str:
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    if sse:
+        return f"event: {event['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def _stream_events(state: State, sse: bool) -> AsyncIterator[str]:
+    """
+    LangGraph `astream`으로 같은 그래프를 실행하면서 이벤트를 내보낸다.
+    -   sequence: sequence_llm 완료 직후 (제목 / 설명 / 카테고리 시퀀스)
+    -   stop: 에이전트가 순번 하나를 채울 때마다 (agent_runner의 custom 이벤트, 잠정 결과)
+    -   final: output_json 완료 후 (동선 최적화/대체 선택이 반영된 최종 코스 — 클라이언트는 이것으로 교체)
+    -   error: 실행 중 오류
+    """
+    merged: dict = dict(state)
+    started = time.perf_counter()
+    first_stop_logged = False
+    try:
+        async for mode, chunk in app.astream(state, stream_mode=["updates", "custom"]):
+            if mode == "custom":
+                if isinstance(chunk, dict) and chunk.get("type") == "stop":
+                    if not first_stop_logged:
+                        first_stop_logged = True
+                        print(f"⏱️ 첫 순번 스트리밍: {time.perf_counter() - started:.2f}s")
+                    yield _encode_event(chunk, sse)
+                continue
+
+            for node, update in (chunk or {}).items():
+                if isinstance(update, dict):
+                    merged.update(update)
+                if node == "sequence_llm":
+                    yield _encode_event({
+                        "type": "sequence",
+                        "title": merged.get("course_title"),
+                        "explain": merged.get("sequence_explain"),
+                        "sequence": merged.get("recommended_sequence") or [],
+                    }, sse)
+
+        print(f"✅ LangGraph 스트리밍 완료 ({time.perf_counter() - started:.2f}s)")
+        yield _encode_event({"type": "final", **_save_course_session(merged, _build_response_payload(merged))}, sse)
+    except Exception as e:
+        print("❌ LangGraph 스트리밍 중 오류 발생:", str(e))
+        traceback.print_exc()
+        yield _encode_event({"type": "error", "detail": f"LangGraph 실행 오류: {str(e)}"}, sse)
+
+
+@router.post("/recommends/stream")
+async def recommend_course_stream(
+    body: dict,
+    request: Request,
+    token_payload: dict = Depends(verify_token)
+):
+    """
+    추천 코스 스트리밍 API (같은 입력, 같은 그래프)
+    - 기본: NDJSON (`application/x-ndjson`, 한 줄에 이벤트 하나)
+    - `Accept: text/event-stream`이면 SSE 형식
+    """
+    print("\n===============================")
+    print("📡 [AI-Service] Recommend Stream API 호출 시작")
+    print("===============================")
+
+    state = await _prepare_state(body, request, token_payload)
+    sse = "text/event-stream" in (request.headers.get("accept") or "")
+    return StreamingResponse(
+        _stream_events(state, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/couples/{couple_id}/profile-cache")
+async def invalidate_couple_profile(
+    couple_id: str,
+    token_payload: dict = Depends(verify_token)
+):
+    """커플 프로필이 바뀌었을 때 캐시된 Auth 데이터 무효화 (본인 커플만)."""
+    if str(token_payload.get("coupleId")) != couple_id:
+        raise HTTPException(status_code=403, detail="다른 커플의 캐시는 무효화할 수 없습니다")
+    removed = couple_profiles.invalidate(couple_id)
+    print(f"🧹 커플 데이터 캐시 무효화 (coupleId={couple_id}, 존재={removed})")
+    return {"coupleId": couple_id, "invalidated": removed}
 
 
 
@@ -1,13 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
-from typing import Dict, Any, List, Tuple, Set
+from typing import Dict, Any, List, Optional, Tuple, Set
 import asyncio
 from collections import defaultdict
+import time
 import traceback
-import httpx
-import json
 
 from app.core.auth import verify_token
-from config import AUTH_SERVICE_URL
+from app.core.couple_profile import couple_profiles, wants_fresh
+from app.core.course_session import course_sessions
+from app.core.settings import AGENT_MULTI_SLOT_ENABLED
 
 from app.models.schemas import ReplaceRequest, RerollResponse
 from app.pipelines.pipeline import build_workflow
@@ -25,7 +26,11 @@ from app.nodes.category_llm_node import (
     nature_agent_node,
     shopping_agent_node,
     performance_agent_node,
+    fallback_pick,
+    resolve_search_area,
+    shortlist_pick,
 )
+from app.utils.geo import distance_m
 
 # ============================================================
 # ⚙️ Router 및 Workflow 설정
@@ -58,34 +63,147 @@ def _poi_key(p: Dict[str, Any]) -> Tuple[str, ...]:
     return (name, category)
 
 def _build_reroll_state(
-    poi_to_exclude: Dict[str, Any],
+    pois_to_exclude: List[Dict[str, Any]],
     user: Dict,
     partner: Dict,
     couple: Dict,
     user_choice: Dict,
-    previous_recommendations: List[Dict]
+    previous_recommendations: List[Dict],
+    exclude_pois: Optional[List[Dict]] = None,
 ) -> Dict[str, Any]:
-    """리롤 실행용 LangGraph state 구성"""
-    category = _norm_cat(poi_to_exclude.get("category", ""))
-    seq = poi_to_exclude.get("seq")
+    """
+    리롤 실행용 LangGraph state 구성 (같은 카테고리의 여러 seq를 한 번에 바꿀 수 있음).
+    `exclude_pois`를 주면 기존 추천과 함께 제외 목록에 넣는다 (요청 전체의 taken 집합).
+    """
+    category = _norm_cat(pois_to_exclude[0].get("category", ""))
+    seqs = [p.get("seq") for p in pois_to_exclude]
+    names = ", ".join(f"'{p.get('name')}'" for p in pois_to_exclude)
     already_selected = [
-        p for p in previous_recommendations if p.get("seq") != seq
+        p for p in previous_recommendations if p.get("seq") not in seqs
     ]
 
     return {
-        "query": f"seq={seq} 위치의 '{poi_to_exclude.get('name')}' 대신 새로운 {category} 장소를 추천해줘.",
+        "query": f"seq={seqs[0] if len(seqs) == 1 else seqs} 위치의 {names} 대신 새로운 {category} 장소를 추천해줘.",
         "user": user,
         "partner": partner,
         "couple": couple,
         "user_choice": user_choice,
         "available_categories": [category],
-        "exclude_pois": previous_recommendations,
+        "exclude_pois": [*previous_recommendations, *(exclude_pois or [])],
         "previous_recommendations": previous_recommendations,
         "already_selected_pois": already_selected,
         "course_title": None,
         "sequence_explain": None,
     }
 
+def _refresh_legs(recs: List[Dict[str, Any]], user_choice: Dict[str, Any]) -> Optional[int]:
+    """리롤로 바뀐 장소 기준으로 구간 거리(leg_distance_m)와 총 이동 거리를 다시 계산."""
+    lat, lng, _ = resolve_search_area(user_choice or {})
+    prev: Optional[Tuple[float, float]] = (float(lat), float(lng))
+    total = 0
+    for rec in recs:
+        if rec.get("lat") is None or rec.get("lng") is None:
+            rec["leg_distance_m"] = None
+            prev = None
+            continue
+        here = (float(rec["lat"]), float(rec["lng"]))
+        leg = None if prev is None else int(round(distance_m(prev, here)))
+        rec["leg_distance_m"] = leg
+        total += leg or 0
+        prev = here
+    return total
+
+
+async def _reroll_from_session(
+    course_id: str,
+    seqs: List[int],
+    couple_id: Any,
+) -> RerollResponse:
+    """
+    저장된 코스 세션에서 리롤 (Auth / Places / LLM 호출 없음):
+    에이전트가 골라 둔 차순위 후보 → 순번별 후보 풀 상위 순으로 아직 유효한 장소를 고른다.
+    둘 다 바닥난 순번만 세션의 커플 컨텍스트로 에이전트를 다시 실행한다.
+    같은 course_id의 동시 리롤은 세션 dict를 함께 고치므로 course_id 단위로 직렬 처리한다.
+    """
+    async with course_sessions.lock(course_id):
+        return await _reroll_session_locked(course_id, seqs, couple_id)
+
+
+async def _reroll_session_locked(
+    course_id: str,
+    seqs: List[int],
+    couple_id: Any,
+) -> RerollResponse:
+    started = time.perf_counter()
+    session = course_sessions.get(course_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="코스 세션이 없거나 만료되었습니다 (previous_recommendations로 다시 요청)")
+    if session.get("couple_id") != str(couple_id):
+        raise HTTPException(status_code=403, detail="다른 커플의 코스입니다")
+
+    by_seq: Dict[Any, Dict[str, Any]] = {r.get("seq"): r for r in session["recommendations"]}
+    rejected: List[Dict[str, Any]] = session.setdefault("rejected", [])
+    replaced = 0
+    for seq in seqs:
+        current = by_seq.get(seq)
+        if current is None:
+            raise HTTPException(status_code=400, detail=f"seq={seq} 장소가 코스에 없습니다")
+        category = _norm_cat(current.get("category"))
+        shortlists: Dict[str, List[Dict[str, Any]]] = session.setdefault("shortlists", {})
+        shortlist = shortlists.get(str(seq)) or []
+        pool = session["pools"].get(str(seq)) or []
+        picking_state = {"already_selected_pois": list(by_seq.values()), "exclude_pois": rejected}
+        source = "shortlist"
+        pick = shortlist_pick(picking_state, category, seq, shortlist) if shortlist else None
+        if pick is not None:
+            # 사용한 후보는 목록에서 뺀다 (나머지는 다음 리롤용)
+            shortlists[str(seq)] = [a for a in shortlist if _poi_key(a) != _poi_key(pick)]
+        else:
+            source = "pool"
+            pick = fallback_pick(picking_state, category, seq, pool=pool)
+
+        if pick is None and category in AGENT_MAP:
+            source = "agent"
+            # 저장된 후보를 다 썼으면 에이전트 재실행 (세션의 커플 컨텍스트 사용, 새 후보 풀 저장)
+            print(f"📡 seq={seq} 저장된 후보 소진 → {category} 에이전트 재실행")
+            state = _build_reroll_state(
+                [current], session["user"], session["partner"], session["couple"],
+                session["user_choice"], list(by_seq.values()), rejected,
+            )
+            try:
+                result = await AGENT_MAP[category](state) or {}
+            except Exception as e:
+                print(f"❌ {category} 실행 오류 (seq={seq}): {e}")
+                result = {}
+            fresh_pool = (result.get("candidates") or {}).get(category) or []
+            session["pools"][str(seq)] = fresh_pool[: course_sessions.pool_size]
+            shortlists[str(seq)] = (result.get("alternates") or {}).get(category) or []
+            taken = {_poi_key(p) for p in (*by_seq.values(), *rejected)}
+            pick = next((c for c in result.get("recommendations", []) if _poi_key(c) not in taken), None)
+
+        if pick is None:
+            print(f"⚠️ seq={seq} 리롤할 후보 없음 → 기존 장소 유지")
+            continue
+        rejected.append(current)
+        by_seq[seq] = {**pick, "seq": seq, "category": current.get("category") or category}
+        replaced += 1
+        course_sessions.record_reroll(source)
+
+    recommendations = sorted(by_seq.values(), key=lambda r: r.get("seq") or 0)
+    total_distance_m = _refresh_legs(recommendations, session["user_choice"])
+    session["recommendations"] = recommendations
+    session["rerolls"] = session.get("rerolls", 0) + replaced
+    course_sessions.save(session)
+
+    print(f"🎯 세션 리롤 완료: {replaced}/{len(seqs)}개 교체 ({(time.perf_counter() - started) * 1000:.1f}ms)")
+    return RerollResponse(
+        explain="선택한 장소를 새로운 장소로 변경했어요!",
+        data=recommendations,
+        course_id=course_id,
+        total_distance_m=total_distance_m,
+    )
+
+
 # ============================================================
 # 🚀 리롤 API
 # ============================================================
@@ -110,28 +228,22 @@ async def replace_recommendations(
     if not couple_id:
         raise HTTPException(status_code=401, detail="coupleId 누락")
 
+    # 🆕 course_id가 있으면 저장된 코스 세션에서 바로 리롤 (전체 목록 재전송 / Auth 호출 불필요)
+    if body.course_id:
+        seqs = [body.seq] if body.seq is not None else [p.seq for p in body.exclude_pois]
+        if not seqs:
+            raise HTTPException(status_code=400, detail="seq 또는 exclude_pois 데이터 누락")
+        return await _reroll_from_session(body.course_id, seqs, couple_id)
+
     # 2️⃣ Auth 서비스 데이터 요청
     auth_header = request.headers.get("Authorization")
     if not auth_header:
         raise HTTPException(status_code=401, detail="Authorization 헤더 누락")
 
-    auth_url = f"{AUTH_SERVICE_URL}/api/couples/{couple_id}/recommendation-data"
-    print(f"🌐 Auth 서비스 URL: {auth_url}")
-
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            res = await client.get(auth_url, headers={"Authorization": auth_header})
-            if res.status_code != 200:
-                print(f"⚠️ Auth 실패 응답: {res.text[:300]}")
-                raise HTTPException(status_code=res.status_code, detail=f"Auth 요청 실패: {res.text}")
-            auth_data = res.json()
-            print("✅ Auth 데이터 수신 완료")
-            print(f"👤 Auth 응답 데이터: {json.dumps(auth_data, ensure_ascii=False)[:400]}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Auth 서비스 호출 실패: {e}")
+    # 같은 코스를 여러 번 리롤해도 coupleId 단위 캐시에서 바로 가져옴
+    data_block = await couple_profiles.get(couple_id, auth_header, refresh=wants_fresh(request))
 
     # 3️⃣ Auth 데이터 파싱
-    data_block = auth_data.get("data", {})
     user = data_block.get("user", {})
     partner = data_block.get("partner", {})
     couple = data_block.get("couple", {})
@@ -145,52 +257,66 @@ async def replace_recommendations(
     if not exclude_pois:
         raise HTTPException(status_code=400, detail="exclude_pois 데이터 누락")
 
-    # 🆕 ✅ 프론트에서 category 필드는 별도로 안 옴 → exclude_pois에서 자동 추출
-    categories = list({ _norm_cat(p.get("category")) for p in exclude_pois })
-    print(f"📂 추출된 카테고리 목록: {categories}")
+    # 🆕 ✅ 프론트에서 category 필드는 별도로 안 옴 → exclude_pois에서 카테고리별로 묶음
+    #    (같은 카테고리 여러 seq는 후보 검색 1회 + LLM 1회로 서로 다른 장소를 받음)
+    by_category: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for p in exclude_pois:
+        by_category[_norm_cat(p.get("category"))].append(p)
+    print(f"📂 추출된 카테고리 목록: { {c: [p.get('seq') for p in g] for c, g in by_category.items()} }")
+    if AGENT_MULTI_SLOT_ENABLED:
+        groups = list(by_category.items())
+    else:
+        groups = [(cat, [p]) for cat, pois in by_category.items() for p in pois]
 
-    # 5️⃣ 중복 필터 세팅
+    # 5️⃣ 중복 필터 세팅 (요청 전체 기준, 미리 한 번만 계산)
     taken: Set[Tuple[str, ...]] = set()
     for p in previous_recommendations + exclude_pois:
         taken.add(_poi_key(p))
 
     # ============================================================
-    # 🎯 단일 리롤 함수
+    # 🎯 카테고리 단위 리롤 함수
     # ============================================================
-    async def reroll_one(poi: Dict[str, Any]) -> List[Dict[str, Any]]:
-        category = _norm_cat(poi.get("category", ""))
+    async def reroll_group(category: str, pois: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         fn = AGENT_MAP.get(category)
         if not fn:
             print(f"⚠️ Unknown category: {category}")
             return []
 
         # 🆕 ✅ category는 exclude_pois 내부 값으로만 세팅됨
-        state = _build_reroll_state(poi, user, partner, couple, user_choice, previous_recommendations)
+        state = _build_reroll_state(pois, user, partner, couple, user_choice, previous_recommendations, exclude_pois)
+        seqs = [p.get("seq") for p in pois]
         try:
-            result_state = await asyncio.to_thread(fn, state)
-            candidates = (result_state or {}).get("recommendations", [])
+            if len(pois) > 1:
+                # 다중 슬롯: 한 번의 호출로 seq마다 서로 다른 장소 (seq가 지정되어 돌아옴)
+                result_state = await fn(state, slots=[s - 1 for s in seqs])
+                candidates = [c for c in (result_state or {}).get("recommendations", []) if c.get("seq") in seqs]
+            else:
+                result_state = await fn(state)
+                candidates = (result_state or {}).get("recommendations", [])
+                for c in candidates:
+                    c["seq"] = seqs[0]
             for c in candidates:
-                c["seq"] = poi.get("seq")
                 c["category"] = category
             return candidates
         except Exception as e:
-            print(f"❌ {category} 실행 오류 (seq={poi.get('seq')}): {e}")
+            print(f"❌ {category} 실행 오류 (seq={seqs}): {e}")
             traceback.print_exc()
             return []
 
     # ============================================================
-    # ⚡ 병렬 실행
+    # ⚡ 카테고리 간 병렬 실행
     # ============================================================
-    tasks = [reroll_one(p) for p in exclude_pois]
-    results = await asyncio.gather(*tasks)
+    results = await asyncio.gather(*[reroll_group(cat, pois) for cat, pois in groups])
 
     reroll_results: List[Dict[str, Any]] = []
-    for original_poi, candidates in zip(exclude_pois, results):
+    filled: Set[Any] = set()
+    for candidates in results:
         for cand in candidates:
-            if _poi_key(cand) not in taken:
-                reroll_results.append(cand)
-                taken.add(_poi_key(cand))
-                break
+            if cand.get("seq") in filled or _poi_key(cand) in taken:
+                continue
+            reroll_results.append(cand)
+            taken.add(_poi_key(cand))
+            filled.add(cand.get("seq"))
 
     print(f"🎯 리롤 완료: {len(reroll_results)}개 성공 / {len(exclude_pois)}개 요청")
     print("===============================\n")
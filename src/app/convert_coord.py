@@ -1,20 +1,57 @@
 import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 from pyproj import Transformer
 
+try:
+    from app.utils.filters.categories import ALL_CATEGORIES
+except ImportError:  # src 밖에서 스크립트로 직접 실행하는 경우
+    ALL_CATEGORIES = None
+
+# ✅ 공공데이터 업종명 키워드 → 서비스 카테고리 (앞에 있는 규칙이 우선)
+# 소상공인 상가정보 / 지방행정 인허가 / 관광정보 등에서 흔히 쓰이는 분류명 기준
+CATEGORY_KEYWORDS = [
+    ("cafe", ["카페", "커피", "제과", "베이커리", "디저트", "아이스크림", "빙수", "찻집", "다방"]),
+    ("bar", ["주점", "호프", "맥주", "와인", "칵테일", "바(bar)", "이자카야", "포차", "술집", "유흥"]),
+    ("restaurant", ["음식", "한식", "중식", "일식", "양식", "분식", "식당", "레스토랑", "뷔페", "고기", "치킨", "피자"]),
+    ("exhibit", ["미술관", "박물관", "전시", "갤러리", "기념관"]),
+    ("performance", ["공연", "극장", "영화", "연극", "뮤지컬", "콘서트", "경기장"]),
+    ("activity", ["오락", "볼링", "당구", "노래", "방탈출", "찜질", "스파", "체험", "공방", "레저", "스포츠"]),
+    ("shopping", ["쇼핑", "백화점", "시장", "서점", "아울렛", "소매", "상점"]),
+    ("view", ["전망", "야경", "스카이", "타워", "루프탑"]),
+    ("walk", ["공원", "산책", "둘레길", "거리", "광장"]),
+    ("nature", ["자연", "숲", "수목원", "계곡", "호수", "해변", "해수욕장", "산림", "생태"]),
+    ("attraction", ["관광", "명소", "유적", "고궁", "랜드마크", "테마파크", "놀이공원", "동물원", "아쿠아리움"]),
+]
+
+if ALL_CATEGORIES is not None:
+    assert {c for c, _ in CATEGORY_KEYWORDS} == set(ALL_CATEGORIES)
+
+OUTPUT_COLUMNS = ["name", "category", "source_category", "address", "lat", "lon"]
+
+
+@lru_cache(maxsize=None)
+def get_transformer(epsg_from):
+    """EPSG별 Transformer를 프로세스 안에서 한 번만 만든다 (생성 비용이 변환보다 큼)."""
+    return Transformer.from_crs(epsg_from, "EPSG:4326", always_xy=True)
+
+
 def convert_single(x, y, epsg_from):
-    transformer = Transformer.from_crs(epsg_from, "EPSG:4326", always_xy=True)
-    lon, lat = transformer.transform(x, y)
+    lon, lat = get_transformer(epsg_from).transform(x, y)
     return lat, lon
 
+
 def convert_csv(input_file, output_file, epsg_from):
     df = pd.read_csv(input_file)
 
     if "x" not in df.columns or "y" not in df.columns:
         raise ValueError("CSV 파일에 'x', 'y' 컬럼이 있어야 합니다.")
 
-    transformer = Transformer.from_crs(epsg_from, "EPSG:4326", always_xy=True)
-    lons, lats = transformer.transform(df["x"].values, df["y"].values)
+    lons, lats = get_transformer(epsg_from).transform(df["x"].values, df["y"].values)
 
     df["lon"] = lons
     df["lat"] = lats
@@ -22,14 +59,182 @@ def convert_csv(input_file, output_file, epsg_from):
     df.to_csv(output_file, index=False)
     print(f"✅ 변환 완료 → {output_file}")
 
+
+# -----------------------------
+# 대용량 적재 (bulk)
+# -----------------------------
+def map_category(text):
+    """업종명 문자열을 ALL_CATEGORIES 중 하나로 매핑 (없으면 None)."""
+    if not isinstance(text, str) or not text:
+        return None
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(k in text for k in keywords):
+            return category
+    return None
+
+
+def _transform_chunk(xs, ys, epsg_from):
+    """워커 프로세스에서 실행: 좌표 배열 변환 (Transformer는 워커별 캐시)."""
+    lons, lats = get_transformer(epsg_from).transform(xs, ys)
+    return np.asarray(lats, dtype="float64"), np.asarray(lons, dtype="float64")
+
+
+def _prepare_chunk(df, cols):
+    """필요한 컬럼만 뽑아 정리하고, 좌표가 숫자가 아닌 행은 버린다."""
+    out = pd.DataFrame({
+        "name": df[cols["name"]].astype("string").str.strip(),
+        "x": pd.to_numeric(df[cols["x"]], errors="coerce"),
+        "y": pd.to_numeric(df[cols["y"]], errors="coerce"),
+    })
+    category_cols = [c for c in cols["category"] if c in df.columns]
+    if category_cols:
+        source = df[category_cols].astype("string").fillna("").agg(" ".join, axis=1).str.strip()
+    else:
+        source = pd.Series("", index=df.index, dtype="string")
+    out["source_category"] = source
+    out["address"] = df[cols["address"]].astype("string") if cols["address"] in df.columns else pd.NA
+    return out.dropna(subset=["name", "x", "y"])
+
+
+def _finish_chunk(part, lats, lons, seen, keep_unmapped, dedup_decimals):
+    """변환 결과를 붙이고 카테고리 매핑 + 청크 간 중복 제거."""
+    part = part.assign(lat=lats, lon=lons)
+    part = part[np.isfinite(part["lat"]) & np.isfinite(part["lon"])]
+    part["category"] = part["source_category"].map(map_category).astype("string")
+    if not keep_unmapped:
+        part = part[part["category"].notna()]
+
+    keys = list(zip(
+        part["lat"].round(dedup_decimals),
+        part["lon"].round(dedup_decimals),
+        part["name"],
+    ))
+    mask = []
+    for k in keys:
+        if k in seen:
+            mask.append(False)
+        else:
+            seen.add(k)
+            mask.append(True)
+    return part[np.array(mask, dtype=bool)][OUTPUT_COLUMNS]
+
+
+def _open_writer(output_file, schema):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if output_file.endswith((".arrow", ".feather", ".ipc")):
+        return pa.ipc.new_file(output_file, schema)
+    return pq.ParquetWriter(output_file, schema, compression="zstd")
+
+
+def convert_bulk(
+    input_file,
+    output_file,
+    epsg_from,
+    *,
+    chunksize=200_000,
+    workers=None,
+    encoding="utf-8",
+    sep=",",
+    x_col="x",
+    y_col="y",
+    name_col="name",
+    category_cols=("category",),
+    address_col="address",
+    keep_unmapped=False,
+    dedup_decimals=5,
+):
+    """
+    전국 단위 공공 POI CSV를 청크 단위로 읽어 WGS84로 변환하고,
+    카테고리 매핑 + 중복 제거 후 Parquet(또는 Arrow IPC) 테이블로 저장한다.
+
+    -   파일 전체를 메모리에 올리지 않고 `chunksize` 행씩 스트리밍
+    -   좌표 변환은 프로세스 풀에서 병렬 처리 (읽기/쓰기는 메인 프로세스)
+    -   중복 기준: (위도, 경도를 `dedup_decimals` 자리로 반올림, 상호명)
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise RuntimeError("bulk 모드에는 pyarrow가 필요합니다: pip install pyarrow") from e
+
+    cols = {"x": x_col, "y": y_col, "name": name_col, "category": list(category_cols), "address": address_col}
+    workers = workers or os.cpu_count() or 1
+    schema = pa.schema([
+        ("name", pa.string()),
+        ("category", pa.string()),
+        ("source_category", pa.string()),
+        ("address", pa.string()),
+        ("lat", pa.float64()),
+        ("lon", pa.float64()),
+    ])
+
+    reader = pd.read_csv(
+        input_file,
+        chunksize=chunksize,
+        encoding=encoding,
+        sep=sep,
+        dtype=str,
+        on_bad_lines="skip",
+        low_memory=True,
+    )
+
+    seen = set()
+    total_in = total_out = 0
+    writer = _open_writer(output_file, schema)
+    pending = []  # (정리된 청크, future) — 입력 순서대로 기록
+
+    def _drain(limit):
+        nonlocal total_out
+        while len(pending) > limit:
+            part, fut = pending.pop(0)
+            lats, lons = fut.result()
+            rows = _finish_chunk(part, lats, lons, seen, keep_unmapped, dedup_decimals)
+            if len(rows):
+                writer.write_table(pa.Table.from_pandas(rows, schema=schema, preserve_index=False))
+                total_out += len(rows)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for i, df in enumerate(reader):
+                missing = [c for c in (x_col, y_col, name_col) if c not in df.columns]
+                if missing:
+                    raise ValueError(f"CSV 파일에 {missing} 컬럼이 없습니다. (--x-col/--y-col/--name-col 확인)")
+                total_in += len(df)
+                part = _prepare_chunk(df, cols)
+                fut = pool.submit(_transform_chunk, part["x"].to_numpy(), part["y"].to_numpy(), epsg_from)
+                pending.append((part, fut))
+                # 메모리 상한: 워커 수의 2배까지만 청크를 미리 읽어 둔다
+                _drain(workers * 2)
+                print(f"📦 청크 {i + 1} 처리 중: 누적 입력 {total_in:,}행 / 저장 {total_out:,}행")
+            _drain(0)
+    finally:
+        writer.close()
+
+    print(f"✅ bulk 변환 완료 → {output_file} (입력 {total_in:,}행 → 저장 {total_out:,}행)")
+    return total_out
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="공공데이터 TM 좌표 → WGS84 변환기")
-    parser.add_argument("--mode", choices=["single", "csv"], required=True)
+    parser.add_argument("--mode", choices=["single", "csv", "bulk"], required=True)
     parser.add_argument("--x", type=float)
     parser.add_argument("--y", type=float)
     parser.add_argument("--epsg", type=int, default=2097)
     parser.add_argument("--input", type=str)
     parser.add_argument("--output", type=str)
+    # bulk 전용 옵션
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--encoding", type=str, default="utf-8", help="공공데이터는 cp949인 경우가 많음")
+    parser.add_argument("--sep", type=str, default=",")
+    parser.add_argument("--x-col", type=str, default="x")
+    parser.add_argument("--y-col", type=str, default="y")
+    parser.add_argument("--name-col", type=str, default="name")
+    parser.add_argument("--category-col", type=str, action="append", help="여러 번 지정하면 이어 붙여 매핑")
+    parser.add_argument("--address-col", type=str, default="address")
+    parser.add_argument("--keep-unmapped", action="store_true", help="카테고리 매핑 실패 행도 저장")
+    parser.add_argument("--dedup-decimals", type=int, default=5)
 
     args = parser.parse_args()
 
@@ -43,4 +248,24 @@ if __name__ == "__main__":
         if args.input is None or args.output is None:
             print("❌ csv 모드에서는 --input, --output 필요")
         else:
-            convert_csv(args.input, args.output, args.epsg) 
\ No newline at end of file
+            convert_csv(args.input, args.output, args.epsg)
+    elif args.mode == "bulk":
+        if args.input is None or args.output is None:
+            print("❌ bulk 모드에서는 --input, --output 필요")
+        else:
+            convert_bulk(
+                args.input,
+                args.output,
+                args.epsg,
+                chunksize=args.chunksize,
+                workers=args.workers,
+                encoding=args.encoding,
+                sep=args.sep,
+                x_col=args.x_col,
+                y_col=args.y_col,
+                name_col=args.name_col,
+                category_cols=args.category_col or ["category"],
+                address_col=args.address_col,
+                keep_unmapped=args.keep_unmapped,
+                dedup_decimals=args.dedup_decimals,
+            )
@@ -0,0 +1,193 @@
+# src/app/core/couple_profile.py
+"""
+Auth 서비스 커플 데이터 조회 (공유 클라이언트 + TTL 캐시)
+-------------------------------------------------------
+
+`/recommends`와 `/replace`(리롤)는 매 요청마다 새 `httpx.AsyncClient`를 열어
+`{AUTH_SERVICE_URL}/api/couples/{coupleId}/recommendation-data`를 호출했습니다.
+같은 코스를 여러 번 리롤해도 바뀌지 않은 데이터를 커넥션 수립부터 다시 받아 왔습니다.
+
+-   프로세스 전역 keep-alive 커넥션 풀 하나로 Auth 서비스 호출
+    (이벤트 루프별로 생성, 루프가 바뀌면 이전 풀은 닫는다)
+-   coupleId 단위 TTL 캐시 (`COUPLE_PROFILE_TTL_S`, 0 이하이면 끔) — 200 응답만 저장
+-   같은 coupleId 동시 조회는 single-flight로 한 번만 호출
+-   무효화: `couple_profiles.invalidate(couple_id)`,
+    `DELETE /api/couples/{coupleId}/profile-cache`, 또는 요청 헤더 `Cache-Control: no-cache`
+
+coupleId는 검증된 JWT에서만 가져오므로, 같은 커플의 다른 토큰이 캐시를 공유해도 됩니다.
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import threading
+import traceback
+from typing import Any, Dict, Optional, Set
+
+import httpx
+from fastapi import HTTPException
+
+from app.core.settings import (
+    AUTH_KEEPALIVE_EXPIRY_S,
+    AUTH_MAX_CONNECTIONS,
+    AUTH_MAX_KEEPALIVE,
+    AUTH_TIMEOUT_S,
+    COUPLE_PROFILE_CACHE_SIZE,
+    COUPLE_PROFILE_TTL_S,
+)
+from app.utils.singleflight import SingleFlight
+from app.utils.ttl_cache import TTLCache
+from config import AUTH_SERVICE_URL
+
+
+def wants_fresh(request: Any) -> bool:
+    """`Cache-Control: no-cache` / `no-store` 요청이면 캐시를 건너뛴다."""
+    cache_control = (request.headers.get("Cache-Control") or "").lower()
+    return "no-cache" in cache_control or "no-store" in cache_control
+
+
+class CoupleProfileClient:
+    """coupleId → Auth 응답의 `data` 블록 (user / partner / couple)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set["asyncio.Task[None]"] = set()
+        self.cache: TTLCache[Dict[str, Any]] = TTLCache(
+            ttl_s=COUPLE_PROFILE_TTL_S, max_entries=COUPLE_PROFILE_CACHE_SIZE, name="couple_profile"
+        )
+        self.flight = SingleFlight("couple_profile")
+        self.fetches = 0
+        self.errors = 0
+        self.invalidations = 0
+
+    def _client(self) -> httpx.AsyncClient:
+        """현재 이벤트 루프에 묶인 공유 클라이언트 (루프가 바뀌면 이전 것을 닫고 새로 만든다)."""
+        loop = asyncio.get_running_loop()
+        stale: Optional[httpx.AsyncClient] = None
+        stale_loop: Optional[asyncio.AbstractEventLoop] = None
+        with self._lock:
+            if self._http is None or self._http.is_closed or self._loop is not loop:
+                stale, stale_loop = self._http, self._loop
+                self._http = httpx.AsyncClient(
+                    base_url=AUTH_SERVICE_URL,
+                    timeout=httpx.Timeout(AUTH_TIMEOUT_S),
+                    limits=httpx.Limits(
+                        max_connections=AUTH_MAX_CONNECTIONS,
+                        max_keepalive_connections=AUTH_MAX_KEEPALIVE,
+                        keepalive_expiry=AUTH_KEEPALIVE_EXPIRY_S,
+                    ),
+                )
+                self._loop = loop
+            http = self._http
+        if stale is not None and not stale.is_closed:
+            self._retire(stale, stale_loop)
+        return http
+
+    def _retire(self, http: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """교체된 클라이언트의 커넥션을 닫는다 (원래 루프가 살아 있으면 그 루프에서)."""
+        print("♻️ 이벤트 루프 변경 → 이전 Auth 커넥션 풀 정리")
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(http.aclose(), loop)
+            return
+        # 원래 루프가 이미 닫혔으면 현재 루프에서 정리 (소켓 종료 중 예외는 무시)
+        task = asyncio.get_running_loop().create_task(http.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closed)
+
+    def _closed(self, task: "asyncio.Task[None]") -> None:
+        self._closing.discard(task)
+        if not task.cancelled():
+            task.exception()  # 닫힌 루프의 소켓 정리 실패는 여기서 소비
+
+    async def _fetch(self, couple_id: Any, auth_header: str) -> Dict[str, Any]:
+        path = f"/api/couples/{couple_id}/recommendation-data"
+        print(f"🌐 Auth 서비스 호출: {AUTH_SERVICE_URL}{path}")
+        with self._lock:
+            self.fetches += 1
+        try:
+            response = await self._client().get(path, headers={"Authorization": auth_header})
+            print(f"✅ Auth 응답 상태코드: {response.status_code}")
+            if response.status_code != 200:
+                print(f"⚠️ Auth 응답 본문: {response.text[:500]}")
+                raise HTTPException(status_code=response.status_code, detail=f"Auth 요청 실패: {response.text}")
+            auth_data = response.json()
+            print(f"👤 Auth 응답 데이터: {json.dumps(auth_data, ensure_ascii=False)[:500]}")
+        except HTTPException:
+            self._count_error()
+            raise
+        except httpx.ConnectError as e:
+            self._count_error()
+            print("❌ [ConnectError] Auth 서비스 연결 실패:", str(e))
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"Auth 연결 실패: {str(e)}")
+        except httpx.TimeoutException:
+            self._count_error()
+            print(f"❌ [Timeout] Auth 서비스 응답 지연 ({AUTH_TIMEOUT_S:g}초 초과)")
+            raise HTTPException(status_code=504, detail="Auth 응답 지연 (Timeout)")
+        except httpx.RequestError as e:
+            self._count_error()
+            print(f"❌ [RequestError] {type(e)}: {str(e)}")
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"Auth 요청 중 예외 발생: {str(e)}")
+        except Exception as e:
+            self._count_error()
+            print(f"❌ [Unexpected Error] {type(e)}: {str(e)}")
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"예상치 못한 오류: {str(e)}")
+
+        data_block = auth_data.get("data", {}) if isinstance(auth_data, dict) else {}
+        if not isinstance(data_block, dict):
+            self._count_error()
+            raise HTTPException(status_code=500, detail="Auth 응답 파싱 실패")
+        self.cache.set(str(couple_id), data_block)
+        return data_block
+
+    def _count_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    async def get(self, couple_id: Any, auth_header: str, *, refresh: bool = False) -> Dict[str, Any]:
+        """
+        커플 데이터(`data` 블록)를 반환한다. 캐시에 있으면 Auth 호출 없이,
+        없으면 같은 coupleId의 동시 조회를 하나로 합쳐 호출한다.
+        반환값은 복사본이므로 호출자가 수정해도 캐시에 영향이 없다.
+        """
+        key = str(couple_id)
+        if refresh:
+            self.invalidate(key)
+        else:
+            cached = self.cache.get(key)
+            if cached is not None:
+                print(f"📦 커플 데이터 캐시 사용 (coupleId={couple_id})")
+                return copy.deepcopy(cached)
+        data_block = await self.flight.do(key, lambda: self._fetch(couple_id, auth_header))
+        return copy.deepcopy(data_block)
+
+    def invalidate(self, couple_id: Any) -> bool:
+        with self._lock:
+            self.invalidations += 1
+        return self.cache.invalidate(str(couple_id))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {"fetches": self.fetches, "errors": self.errors, "invalidations": self.invalidations}
+        return {**self.cache.stats(), **counters}
+
+    async def aclose(self) -> None:
+        """공유 커넥션 풀 정리 (앱 종료 시 호출)."""
+        with self._lock:
+            http, loop = self._http, self._loop
+            self._http, self._loop = None, None
+        if http is None or http.is_closed:
+            return
+        if loop is asyncio.get_running_loop():
+            await http.aclose()
+        else:
+            self._retire(http, loop)
+
+
+# ✅ 프로세스 전역 싱글턴
+couple_profiles = CoupleProfileClient()
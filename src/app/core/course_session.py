@@ -0,0 +1,230 @@
+# src/app/core/course_session.py
+"""
+코스 세션 저장소 (리롤용)
+-------------------------
+
+`/recommends/replace`는 클라이언트가 `previous_recommendations` / `exclude_pois` 전체를 다시 보내고,
+에이전트가 Places 검색 + LLM 호출을 처음부터 다시 했습니다 (이미 가져온 후보 풀은 버림).
+
+`/recommends`가 끝날 때 코스 하나를 `course_id`로 저장해 두고,
+리롤은 `course_id` + `seq`만 받아 저장된 후보 풀에서 바로 다음 장소를 고릅니다.
+
+세션 내용 (JSON 직렬화 가능한 최소 정보):
+-   `recommendations`: 현재 코스의 장소들 (리롤 시 갱신)
+-   `pools`: 순번별 후보 풀 (에이전트가 정렬해 둔 정제 후보, 순번당 `COURSE_SESSION_POOL_SIZE`개)
+-   `shortlists`: 순번별 에이전트 차순위 후보 (LLM이 선택과 함께 고른 장소 + 이유, 리롤 시 가장 먼저 사용)
+-   `rejected`: 리롤로 빠진 장소 (다시 추천되지 않도록)
+-   `user_choice`, `user` / `partner` / `couple`: 에이전트 재실행이 필요할 때의 컨텍스트
+
+저장:
+-   메모리 TTL LRU (`COURSE_SESSION_TTL_S`, `COURSE_SESSION_MAX_ENTRIES`)
+-   `COURSE_SESSION_PATH`가 있으면 SQLite에도 기록 (워커 재시작 / 다중 워커 간 공유).
+    쓰기는 전용 스레드(`course-session`)에서, 만료 행은 쓰기 때마다 정리
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from app.core.settings import (
+    COURSE_SESSION_MAX_ENTRIES,
+    COURSE_SESSION_PATH,
+    COURSE_SESSION_POOL_SIZE,
+    COURSE_SESSION_TTL_S,
+)
+from app.utils.ttl_cache import TTLCache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS course_sessions (
+    course_id   TEXT PRIMARY KEY,
+    payload     TEXT NOT NULL,
+    expires_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS course_sessions_expiry_idx ON course_sessions(expires_at);
+"""
+
+
+def _json_default(value: Any) -> Any:
+    # 점수 계산에서 섞여 들어온 numpy 스칼라 등
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def new_course_id() -> str:
+    return uuid.uuid4().hex
+
+
+class CourseSessionStore:
+    """course_id → 코스 세션 (메모리 TTL LRU + 선택적 SQLite)."""
+
+    def __init__(self, path: str, *, ttl_s: float, max_entries: int, pool_size: int) -> None:
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.pool_size = pool_size
+        self.memory: TTLCache[Dict[str, Any]] = TTLCache(ttl_s=ttl_s, max_entries=max_entries, name="course_session")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self.saved = 0
+        self.disk_hits = 0
+        self.expired = 0
+        self.rerolls: Counter = Counter()  # 리롤 출처별 횟수 (shortlist / pool / agent)
+        # course_id별 리롤 직렬화 (세션 dict를 await 사이에 고치므로, 쓰는 쪽이 없으면 자동 정리)
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_s > 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # -----------------------------
+    # 생성 / 저장
+    # -----------------------------
+    def build(
+        self,
+        course_id: str,
+        *,
+        couple_id: Any,
+        recommendations: List[Dict[str, Any]],
+        pools: Dict[int, List[Dict[str, Any]]],
+        shortlists: Optional[Dict[int, List[Dict[str, Any]]]] = None,
+        user_choice: Dict[str, Any],
+        user: Dict[str, Any],
+        partner: Dict[str, Any],
+        couple: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """파이프라인 결과로 세션 dict 구성 (후보 풀은 순번당 pool_size개로 자른다)."""
+        return {
+            "course_id": course_id,
+            "couple_id": str(couple_id),
+            "created_at": time.time(),
+            "rerolls": 0,
+            "recommendations": list(recommendations),
+            "pools": {str(seq): list(pool[: self.pool_size]) for seq, pool in (pools or {}).items() if pool},
+            "shortlists": {str(seq): list(items) for seq, items in (shortlists or {}).items() if items},
+            "rejected": [],
+            "user_choice": user_choice or {},
+            "user": user or {},
+            "partner": partner or {},
+            "couple": couple or {},
+        }
+
+    def save(self, session: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        self.memory.set(session["course_id"], session)
+        with self._lock:
+            self.saved += 1
+        if self.path:
+            payload = json.dumps(session, ensure_ascii=False, default=_json_default)
+            self._submit(session["course_id"], payload)
+
+    def _submit(self, course_id: str, payload: str) -> None:
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="course-session")
+
+        def _job() -> None:
+            now = time.time()
+            try:
+                with self._lock:
+                    db = self._db()
+                    db.execute(
+                        "INSERT OR REPLACE INTO course_sessions(course_id, payload, expires_at) VALUES (?, ?, ?)",
+                        (course_id, payload, now + self.ttl_s),
+                    )
+                    db.execute("DELETE FROM course_sessions WHERE expires_at < ?", (now,))
+                    # 크기 상한: 만료가 가까운 것부터 제거
+                    db.execute(
+                        "DELETE FROM course_sessions WHERE course_id IN ("
+                        " SELECT course_id FROM course_sessions ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,),
+                    )
+            except Exception as e:
+                print(f"⚠️ 코스 세션 디스크 저장 실패: {e}")
+
+        self._writer.submit(_job)
+
+    def lock(self, course_id: str) -> asyncio.Lock:
+        """같은 course_id의 리롤을 한 번에 하나씩 처리하기 위한 프로세스 내 잠금."""
+        with self._lock:
+            lock = self._locks.get(course_id)
+            if lock is None:
+                lock = asyncio.Lock()
+                self._locks[course_id] = lock
+            return lock
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def get(self, course_id: str) -> Optional[Dict[str, Any]]:
+        """세션 반환 (메모리 → 디스크 순, 만료되었으면 None). 반환값을 고친 뒤에는 save()로 저장."""
+        if not self.enabled or not course_id:
+            return None
+        session = self.memory.get(course_id)
+        if session is not None or not self.path:
+            return session
+        try:
+            with self._lock:
+                row = self._db().execute(
+                    "SELECT payload, expires_at FROM course_sessions WHERE course_id = ?", (course_id,)
+                ).fetchone()
+        except Exception as e:
+            print(f"⚠️ 코스 세션 디스크 조회 실패: {e}")
+            return None
+        if row is None:
+            return None
+        payload, expires_at = row
+        if expires_at < time.time():
+            with self._lock:
+                self.expired += 1
+            return None
+        session = json.loads(payload)
+        self.memory.set(course_id, session, ttl_s=expires_at - time.time())
+        with self._lock:
+            self.disk_hits += 1
+        return session
+
+    def record_reroll(self, source: str) -> None:
+        with self._lock:
+            self.rerolls[source] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                "path": self.path or None,
+                "saved": self.saved,
+                "disk_hits": self.disk_hits,
+                "expired": self.expired,
+                "pool_size": self.pool_size,
+                "rerolls": dict(self.rerolls),
+            }
+        return {**self.memory.stats(), **counters}
+
+
+# ✅ 프로세스 전역 싱글턴
+course_sessions = CourseSessionStore(
+    COURSE_SESSION_PATH,
+    ttl_s=COURSE_SESSION_TTL_S,
+    max_entries=COURSE_SESSION_MAX_ENTRIES,
+    pool_size=COURSE_SESSION_POOL_SIZE,
+)
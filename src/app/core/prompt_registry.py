@@ -0,0 +1,295 @@
+"""
+LangSmith 프롬프트 레지스트리
+-----------------------------
+
+노드마다 `client.pull_prompt(...)`를 호출하면 추천 한 건당 LangSmith 왕복이
+5회 이상 LLM 호출 앞에 직렬로 붙습니다. 이 모듈은 프롬프트를 프로세스 안에
+한 번 적재해 두고 다음을 담당합니다.
+
+-   버전 해시: 직렬화한 프롬프트의 sha256 앞 12자리 (`versions()`로 확인)
+-   백그라운드 갱신: `PROMPT_REFRESH_INTERVAL_S`마다 다시 pull, 내용이 바뀐 것만 교체
+-   로컬 스냅샷: 적재/갱신 성공 시 `PROMPT_SNAPSHOT_PATH`에 저장하고,
+    LangSmith에 접근할 수 없으면 스냅샷으로 부팅
+    (경로를 지정했을 때만 사용, 컨테이너 재배포 뒤에도 남는 영속 볼륨 경로 권장)
+
+노드에서는 `prompt_registry.get("gh_sequence")`처럼 사용합니다 (async 노드는 `await prompt_registry.aget(...)`).
+등록되지 않은 이름도 처음 요청될 때 pull하여 이후부터 캐시합니다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import warnings
+from typing import Any, Dict, Iterable, List, Optional
+
+from langchain_core.load import dumps, loads
+
+from app.core.settings import PROMPT_REFRESH_INTERVAL_S, PROMPT_SNAPSHOT_PATH
+
+# ✅ 서비스에서 사용하는 프롬프트 목록
+PROMPT_NAMES: List[str] = [
+    "gh_sequence",
+    "gh_check",
+    "restaurant_prompt",
+    "cafe_prompt",
+    "bar_prompt",
+    "activity_prompt",
+    "attraction_prompt",
+    "exhibit_prompt",
+    "walk_prompt",
+    "view_prompt",
+    "nature_prompt",
+    "shopping_prompt",
+    "performance_prompt",
+]
+
+
+def _version_of(serialized: str) -> str:
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:12]
+
+
+def _loads_prompt(serialized: str) -> Any:
+    """스냅샷 복원: langchain_core 클래스(프롬프트/메시지)만 허용."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            return loads(serialized, allowed_objects="core")
+        except TypeError:  # allowed_objects 인자가 없는 langchain_core
+            return loads(serialized)
+
+
+class PromptRegistry:
+    """LangSmith 프롬프트를 프로세스 안에 캐시하고 주기적으로 갱신한다."""
+
+    def __init__(
+        self,
+        names: Iterable[str],
+        *,
+        snapshot_path: Optional[str] = None,
+        refresh_interval_s: float = 300.0,
+    ) -> None:
+        self.names = list(names)
+        self.snapshot_path = snapshot_path
+        self.refresh_interval_s = refresh_interval_s
+        self._client: Any = None
+        self._client_failed = False
+        self._prompts: Dict[str, Any] = {}
+        self._serialized: Dict[str, str] = {}
+        self._versions: Dict[str, str] = {}
+        self._source: Dict[str, str] = {}  # "langsmith" | "snapshot"
+        self._lock = threading.Lock()
+        self._pull_locks: Dict[str, threading.Lock] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.pulls = 0
+        self.pull_errors = 0
+        self.updates = 0
+        self.last_refresh_at: Optional[float] = None
+
+    # -----------------------------
+    # LangSmith
+    # -----------------------------
+    def _langsmith(self) -> Any:
+        if self._client is None and not self._client_failed:
+            try:
+                from langsmith import Client
+
+                self._client = Client()
+            except Exception as e:
+                print(f"⚠️ LangSmith Client 초기화 실패. 오류: {e}")
+                self._client_failed = True
+        return self._client
+
+    def _pull(self, name: str) -> bool:
+        """LangSmith에서 한 개를 pull. 내용이 바뀌었으면 교체하고 True."""
+        client = self._langsmith()
+        if client is None:
+            raise RuntimeError("LangSmith Client not initialized")
+        self.pulls += 1
+        try:
+            prompt = client.pull_prompt(name)
+        except Exception:
+            self.pull_errors += 1
+            raise
+        serialized = dumps(prompt)
+        version = _version_of(serialized)
+        with self._lock:
+            if self._versions.get(name) == version:
+                self._source[name] = "langsmith"
+                return False
+            old = self._versions.get(name)
+            self._prompts[name] = prompt
+            self._serialized[name] = serialized
+            self._versions[name] = version
+            self._source[name] = "langsmith"
+        if old is not None:
+            self.updates += 1
+            print(f"🔄 프롬프트 갱신: {name} {old} → {version}")
+        return True
+
+    # -----------------------------
+    # 스냅샷
+    # -----------------------------
+    def load_snapshot(self) -> int:
+        """스냅샷 파일에서 아직 적재되지 않은 프롬프트를 채운다."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return 0
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ 프롬프트 스냅샷 읽기 실패: {e}")
+            return 0
+
+        loaded = 0
+        for name, serialized in (data.get("prompts") or {}).items():
+            with self._lock:
+                if name in self._prompts:
+                    continue
+            try:
+                prompt = _loads_prompt(serialized)
+            except Exception as e:
+                print(f"⚠️ 스냅샷 프롬프트 복원 실패 ({name}): {e}")
+                continue
+            with self._lock:
+                self._prompts[name] = prompt
+                self._serialized[name] = serialized
+                self._versions[name] = _version_of(serialized)
+                self._source[name] = "snapshot"
+            loaded += 1
+        if loaded:
+            print(f"🗂️ 프롬프트 스냅샷에서 {loaded}개 적재: {self.snapshot_path}")
+        return loaded
+
+    def save_snapshot(self) -> None:
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            data = {"saved_at": time.time(), "prompts": dict(self._serialized)}
+        if not data["prompts"]:
+            return
+        tmp = f"{self.snapshot_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.snapshot_path)), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.snapshot_path)
+        except Exception as e:
+            print(f"⚠️ 프롬프트 스냅샷 저장 실패: {e}")
+
+    # -----------------------------
+    # 적재 / 갱신
+    # -----------------------------
+    def refresh(self) -> int:
+        """등록된 모든 프롬프트를 다시 pull한다. 바뀐 개수를 반환."""
+        with self._lock:
+            names = list(dict.fromkeys([*self.names, *self._prompts.keys()]))
+        changed = 0
+        for name in names:
+            try:
+                if self._pull(name):
+                    changed += 1
+            except Exception as e:
+                print(f"⚠️ 프롬프트 pull 실패 ({name}): {e}")
+        self.last_refresh_at = time.time()
+        if changed:
+            self.save_snapshot()
+        return changed
+
+    def warm(self) -> None:
+        """부팅 시 1회: LangSmith에서 전부 적재하고, 실패한 것은 스냅샷으로 채운다."""
+        started = time.perf_counter()
+        self.refresh()
+        missing = [n for n in self.names if n not in self._prompts]
+        if missing:
+            self.load_snapshot()
+        missing = [n for n in self.names if n not in self._prompts]
+        print(
+            f"✅ 프롬프트 적재 완료: {len(self._prompts)}/{len(self.names)}개 "
+            f"({time.perf_counter() - started:.2f}s)"
+            + (f", 누락 {missing}" if missing else "")
+        )
+
+    def start(self) -> None:
+        """백그라운드 갱신 스레드 시작 (interval <= 0 이면 갱신하지 않음)."""
+        if self.refresh_interval_s <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="prompt-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval_s):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ 프롬프트 갱신 루프 오류: {e}")
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def get(self, name: str) -> Any:
+        """캐시된 프롬프트를 반환. 없으면 pull(실패 시 스냅샷)하여 캐시한다."""
+        prompt = self._prompts.get(name)
+        if prompt is not None:
+            return prompt
+
+        with self._lock:
+            pull_lock = self._pull_locks.setdefault(name, threading.Lock())
+        with pull_lock:
+            prompt = self._prompts.get(name)
+            if prompt is not None:
+                return prompt
+            try:
+                self._pull(name)
+                self.save_snapshot()
+            except Exception as e:
+                print(f"⚠️ 프롬프트 pull 실패 ({name}): {e} → 스냅샷 확인")
+                self.load_snapshot()
+                if name not in self._prompts:
+                    raise
+            return self._prompts[name]
+
+    async def aget(self, name: str) -> Any:
+        """async 노드용 `get`: 캐시에 없을 때의 pull(네트워크) / 스냅샷 쓰기는 스레드에서 실행."""
+        prompt = self._prompts.get(name)
+        if prompt is not None:
+            return prompt
+        return await asyncio.to_thread(self.get, name)
+
+    def versions(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._versions)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            prompts = {
+                name: {"version": self._versions[name], "source": self._source.get(name)}
+                for name in self._prompts
+            }
+        return {
+            "loaded": len(prompts),
+            "prompts": prompts,
+            "refresh_interval_s": self.refresh_interval_s,
+            "last_refresh_at": self.last_refresh_at,
+            "pulls": self.pulls,
+            "pull_errors": self.pull_errors,
+            "updates": self.updates,
+        }
+
+
+# ✅ 프로세스 전역 레지스트리
+prompt_registry = PromptRegistry(
+    PROMPT_NAMES,
+    snapshot_path=PROMPT_SNAPSHOT_PATH,
+    refresh_interval_s=PROMPT_REFRESH_INTERVAL_S,
+)
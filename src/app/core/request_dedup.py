@@ -0,0 +1,160 @@
+# src/app/core/request_dedup.py
+"""
+/recommends 중복 요청 제거 (single-flight + 짧은 재전송 창)
+---------------------------------------------------------
+
+모바일 클라이언트의 재시도, 사용자의 연속 탭으로 같은 요청이 거의 동시에 여러 번 들어오면
+요청마다 LangGraph 파이프라인 전체(LLM 5회 이상 + Places 검색)가 다시 실행되었습니다.
+
+요청 지문 = coupleId + 출발지(격자 반올림) + 시간대 + 음주 의사 + 나머지 입력의 해시
+-   같은 지문의 동시 요청은 파이프라인 1회 실행 결과를 함께 받음 (single-flight)
+-   완료된 결과는 `RECOMMEND_REPLAY_TTL_S` 동안 그대로 재전송 (같은 course_id)
+-   실패(예외)나 `data`가 빈 결과는 저장하지 않음 / `Cache-Control: no-cache` 요청은 재전송 / 진행 중 실행 공유 없이 새로 실행
+
+적중 카운터는 `/health/stats`의 `recommend_dedup`에서 확인할 수 있습니다.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.settings import (
+    RECOMMEND_DEDUP_ENABLED,
+    RECOMMEND_DEDUP_LOCATION_DECIMALS,
+    RECOMMEND_REPLAY_CACHE_SIZE,
+    RECOMMEND_REPLAY_TTL_S,
+)
+from app.utils.singleflight import SingleFlight
+from app.utils.ttl_cache import TTLCache
+
+# 지문에서 따로 다루는 user_choice 키 (나머지는 해시로)
+_KEYED = ("start", "time_window", "startTime", "endTime", "drink_intent")
+
+
+def _quantize_start(start: Any, decimals: int) -> Optional[Tuple[float, float]]:
+    if isinstance(start, (list, tuple)) and len(start) == 2:
+        try:
+            return round(float(start[0]), decimals), round(float(start[1]), decimals)
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def recommend_fingerprint(couple_id: Any, body: Dict[str, Any]) -> str:
+    """같은 결과를 내야 하는 요청끼리 같은 값이 되는 요청 지문."""
+    user_choice = body.get("user_choice") or {}
+    time_window = user_choice.get("time_window") or [user_choice.get("startTime"), user_choice.get("endTime")]
+    rest = {
+        "user_choice": {k: v for k, v in user_choice.items() if k not in _KEYED},
+        # 코스를 바꾸는 나머지 입력 (이전 추천 / 제외 장소 / 플래너 모드)
+        "body": {k: v for k, v in body.items() if k != "user_choice"},
+    }
+    digest = hashlib.sha1(
+        json.dumps(rest, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()[:16]
+    parts = (
+        str(couple_id),
+        _quantize_start(user_choice.get("start"), RECOMMEND_DEDUP_LOCATION_DECIMALS),
+        list(time_window),
+        bool(user_choice.get("drink_intent")),
+        digest,
+    )
+    return json.dumps(parts, ensure_ascii=False, default=str)
+
+
+class RecommendDedup:
+    """요청 지문 → 파이프라인 결과 (진행 중이면 공유, 끝났으면 짧게 재전송)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.replay: TTLCache[Dict[str, Any]] = TTLCache(
+            ttl_s=RECOMMEND_REPLAY_TTL_S, max_entries=RECOMMEND_REPLAY_CACHE_SIZE, name="recommend_replay"
+        )
+        self.flight = SingleFlight("recommend")
+        self.requests = 0
+        self.runs = 0
+        self.joined = 0      # 진행 중인 실행에 합류한 요청
+        self.replayed = 0    # 완료된 결과를 재전송한 요청
+        self.bypassed = 0    # no-cache 요청
+        self.unstored = 0    # data가 비어(실패/축소 실행) 재전송용으로 저장하지 않은 결과
+
+    async def run(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Dict[str, Any]]],
+        *,
+        fresh: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        `fn`(파이프라인 실행)을 지문 단위로 한 번만 실행한다.
+        반환값은 복사본이므로 호출자가 수정해도 공유 결과에 영향이 없다.
+        """
+        with self._lock:
+            self.requests += 1
+        if not RECOMMEND_DEDUP_ENABLED:
+            return await fn()
+
+        if fresh:
+            # 진행 중인 실행에도 합류하지 않고 새로 실행 (결과는 다음 중복 요청용으로 저장)
+            with self._lock:
+                self.bypassed += 1
+                self.runs += 1
+            result = await fn()
+            self._remember(key, result)
+            return copy.deepcopy(result)
+
+        cached = self.replay.get(key)
+        if cached is not None:
+            with self._lock:
+                self.replayed += 1
+            print(f"📦 중복 요청 → 완료된 추천 결과 재전송 (course_id={cached.get('course_id')})")
+            return copy.deepcopy(cached)
+
+        led = False
+
+        async def _lead() -> Dict[str, Any]:
+            nonlocal led
+            led = True
+            with self._lock:
+                self.runs += 1
+            result = await fn()
+            self._remember(key, result)
+            return result
+
+        result = await self.flight.do(key, _lead)
+        if not led:
+            with self._lock:
+                self.joined += 1
+            print(f"🪁 중복 요청 → 진행 중인 파이프라인 결과 공유 (course_id={result.get('course_id')})")
+        return copy.deepcopy(result)
+
+    def _remember(self, key: str, result: Dict[str, Any]) -> None:
+        """코스가 있는 결과만 재전송용으로 저장 (빈 결과는 같은 재시도가 다시 실행되도록)."""
+        if result.get("data"):
+            self.replay.set(key, result)
+            return
+        with self._lock:
+            self.unstored += 1
+        print("⚠️ 추천 결과가 비어 있음 → 재전송 캐시에 저장하지 않음")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            deduped = self.joined + self.replayed
+            counters = {
+                "enabled": RECOMMEND_DEDUP_ENABLED,
+                "requests": self.requests,
+                "runs": self.runs,
+                "joined": self.joined,
+                "replayed": self.replayed,
+                "bypassed": self.bypassed,
+                "unstored": self.unstored,
+                "dedup_ratio": round(deduped / self.requests, 4) if self.requests else 0.0,
+            }
+        return {**counters, "replay_cache": self.replay.stats()}
+
+
+# ✅ 프로세스 전역 싱글턴
+recommend_dedup = RecommendDedup()
@@ -1,6 +1,7 @@
 # src/app/core/settings.py
 from __future__ import annotations
 import os
+import tempfile
 
 # 날씨 API 설정
 WEATHER_TZ = os.getenv("WEATHER_TZ", "Asia/Seoul")
@@ -11,3 +12,120 @@ OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
 
 
 KMA_SERVICE_KEY = os.getenv("KMA_API_KEY", "")
+
+
+# Google Places HTTP 클라이언트 설정
+PLACES_HTTP2 = os.getenv("PLACES_HTTP2", "true").lower() in ("1", "true", "yes")
+PLACES_TIMEOUT_S = float(os.getenv("PLACES_TIMEOUT_S", "10"))
+PLACES_MAX_CONNECTIONS = int(os.getenv("PLACES_MAX_CONNECTIONS", "50"))
+PLACES_MAX_KEEPALIVE = int(os.getenv("PLACES_MAX_KEEPALIVE", "20"))
+PLACES_KEEPALIVE_EXPIRY_S = float(os.getenv("PLACES_KEEPALIVE_EXPIRY_S", "60"))
+
+# Nearby Search 결과 캐시 (TTL <= 0 이면 비활성화)
+PLACES_CACHE_TTL_S = float(os.getenv("PLACES_CACHE_TTL_S", "300"))
+PLACES_CACHE_MAX_ENTRIES = int(os.getenv("PLACES_CACHE_MAX_ENTRIES", "2048"))
+PLACES_CACHE_COORD_DECIMALS = int(os.getenv("PLACES_CACHE_COORD_DECIMALS", "3"))  # 3자리 ≈ 110m
+
+# 동일 요청 single-flight 합류 시 대기자별 최대 대기 시간
+PLACES_SINGLEFLIGHT_TIMEOUT_S = float(os.getenv("PLACES_SINGLEFLIGHT_TIMEOUT_S", "15"))
+WEATHER_SINGLEFLIGHT_TIMEOUT_S = float(os.getenv("WEATHER_SINGLEFLIGHT_TIMEOUT_S", "10"))
+
+# 병합 Nearby Search 계획 (agent_runner 사전 수집)
+PLACES_PLAN_MAX_TYPES_PER_CALL = int(os.getenv("PLACES_PLAN_MAX_TYPES_PER_CALL", "8"))
+PLACES_PLAN_MAX_CATEGORIES_PER_CALL = int(os.getenv("PLACES_PLAN_MAX_CATEGORIES_PER_CALL", "2"))
+
+# geohash 공간 타일 캐시 (가까운 출발점끼리 Places 결과 공유)
+PLACES_TILE_CACHE_ENABLED = os.getenv("PLACES_TILE_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+# 0이면 검색 반경에서 자동 결정 (타일 검색 원 ≤ 검색 반경, 1.6km → 6), 지정 시 고정 (5 ≈ 4.9km, 6 ≈ 1.2km × 0.6km)
+PLACES_TILE_PRECISION = int(os.getenv("PLACES_TILE_PRECISION", "0"))
+PLACES_TILE_TTL_S = float(os.getenv("PLACES_TILE_TTL_S", "1800"))
+PLACES_TILE_MAX_ENTRIES = int(os.getenv("PLACES_TILE_MAX_ENTRIES", "8192"))
+
+# 로컬 POI 저장소 (SQLite R-tree) — off | record | serve (기본 off, 켤 때는 영속 볼륨 경로 지정 권장)
+POI_STORE_MODE = os.getenv("POI_STORE_MODE", "off").lower()
+POI_STORE_PATH = os.getenv("POI_STORE_PATH", os.path.join(tempfile.gettempdir(), "loventure_poi_store.sqlite3"))
+POI_STORE_MAX_AGE_S = float(os.getenv("POI_STORE_MAX_AGE_S", "86400"))  # serve 모드 신선도 기준 + 이보다 오래된 장소 삭제
+
+# LangSmith 프롬프트 레지스트리 (interval <= 0 이면 백그라운드 갱신 안 함)
+# 스냅샷은 경로를 지정했을 때만 사용 (재배포 뒤에도 남아야 하므로 임시 디렉터리가 아닌 영속 볼륨 경로 지정)
+PROMPT_REFRESH_INTERVAL_S = float(os.getenv("PROMPT_REFRESH_INTERVAL_S", "300"))
+PROMPT_SNAPSHOT_PATH = os.getenv("PROMPT_SNAPSHOT_PATH", "")
+
+# 프로세스 전역 동시 실행 한도 (0 이하이면 제한 없음)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+PLACES_MAX_CONCURRENCY = int(os.getenv("PLACES_MAX_CONCURRENCY", "32"))
+
+# 같은 카테고리가 코스에 여러 번 나오면 한 번의 검색 + LLM 호출로 N개를 고른다
+AGENT_MULTI_SLOT_ENABLED = os.getenv("AGENT_MULTI_SLOT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# 에이전트 플래너 기본 모드 (요청 body의 planner_mode로 요청별 변경 가능)
+# per_category: 카테고리별 LLM 호출 / batched: 코스 전체를 한 번의 LLM 호출로 채움
+AGENT_PLANNER_MODE = os.getenv("AGENT_PLANNER_MODE", "per_category").lower()
+
+# LLM에 보낼 카테고리 후보 수 (사전 정렬 후 상위 K개를 축약 형식으로 전달, 0 이하이면 전체 그대로)
+AGENT_CANDIDATE_TOP_K = int(os.getenv("AGENT_CANDIDATE_TOP_K", "8"))
+
+# 후보 중복 제거: 이름이 같고 이 거리(m) 이내면 같은 장소로 본다
+AGENT_DEDUP_RADIUS_M = float(os.getenv("AGENT_DEDUP_RADIUS_M", "30"))
+
+# 에이전트가 선택과 함께 돌려줄 차순위 후보 수 (리롤 시 LLM 없이 바로 사용, 0이면 요청 안 함)
+AGENT_ALTERNATES = int(os.getenv("AGENT_ALTERNATES", "3"))
+
+# 병합 Nearby 호출(최대 20개)을 나눈 결과가 이보다 적은 카테고리는 단독 검색으로 다시 가져온다
+# (실제 기준은 호출마다 min(이 값, 20 // 호출이 담당하는 카테고리 수))
+# 기본값: LLM에 보낼 후보 수 + 차순위 후보 수 (순위/차순위/동선 교체에 쓸 후보가 모자라지 않도록)
+PLACES_PLAN_MIN_POOL = int(os.getenv("PLACES_PLAN_MIN_POOL", str(max(3, AGENT_CANDIDATE_TOP_K + AGENT_ALTERNATES))))
+
+# 코스 동선 최적화: 순번마다 LLM 선택 + LLM 차순위 후보(AGENT_ALTERNATES) 중 총 이동 거리가 최소인 조합 선택
+# (AGENT_ALTERNATES=0 이거나 배치 플래너면 차순위 후보가 없어 교체 없이 구간 거리만 계산)
+ROUTE_OPTIMIZE_ENABLED = os.getenv("ROUTE_OPTIMIZE_ENABLED", "true").lower() in ("1", "true", "yes")
+ROUTE_ALTERNATES = int(os.getenv("ROUTE_ALTERNATES", "3"))  # 순번별로 고려할 차순위 후보 수
+ROUTE_SWAP_PENALTY_M = float(os.getenv("ROUTE_SWAP_PENALTY_M", "300"))  # LLM 선택을 바꾸는 비용(m 환산)
+# 두 번째 순번부터 직전 장소 주변을 검색 (순번별 직렬 실행이 되므로 기본 off)
+ROUTE_CHAIN_SEARCH = os.getenv("ROUTE_CHAIN_SEARCH", "false").lower() in ("1", "true", "yes")
+ROUTE_CHAIN_RADIUS_M = float(os.getenv("ROUTE_CHAIN_RADIUS_M", "1200"))
+
+# 요청 단위 마감 시간 (요청 수신부터, 0 이하이면 무제한 = 기본값) — 노드별 예산은 app/utils/deadline.py
+# 시퀀스 LLM이 예산을 넘기면 개인화 시퀀스 대신 기본 코스로 대체되므로, 켤 때는 Gemini 지연 꼬리(p99)를 보고
+# 충분히 크게 (예: 15 이상) 잡는다
+PIPELINE_DEADLINE_S = float(os.getenv("PIPELINE_DEADLINE_S", "0"))
+# 마감이 있어도 시퀀스 LLM에는 최소 이만큼 보장 (부족분은 agent_runner 몫에서, 남은 시간 이내)
+SEQUENCE_MIN_BUDGET_S = float(os.getenv("SEQUENCE_MIN_BUDGET_S", "6"))
+
+# LLM 요청 헤징: 첫 요청이 최근 지연 백분위를 넘기면 같은 요청을 한 번 더 보내고 먼저 온 응답 사용
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_DELAY_S = float(os.getenv("LLM_HEDGE_MIN_DELAY_S", "1.0"))
+LLM_HEDGE_INITIAL_DELAY_S = float(os.getenv("LLM_HEDGE_INITIAL_DELAY_S", "3.0"))  # 샘플이 모이기 전 지연
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_MAX_RATIO = float(os.getenv("LLM_HEDGE_MAX_RATIO", "0.1"))  # 헤지 요청 수 / 전체 호출 수 상한
+
+# Places 선행 수집: sequence_llm과 병렬로, 자주 쓰이는 카테고리 상위 N개의 후보 풀을 미리 검색
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() in ("1", "true", "yes")
+PREFETCH_MAX_CATEGORIES = int(os.getenv("PREFETCH_MAX_CATEGORIES", "4"))
+
+# 시퀀스 LLM 응답을 스트리밍으로 받아 categories 항목이 완성되는 즉시 해당 에이전트를 조기 실행
+# (per_category 모드 전용, 조기 실행 에이전트는 prefetch 풀 대신 단독 검색을 사용)
+SEQUENCE_STREAM_ENABLED = os.getenv("SEQUENCE_STREAM_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Auth 서비스 커플 데이터 조회: 공유 커넥션 풀 + coupleId 단위 TTL 캐시 (TTL <= 0 이면 캐시 끔)
+AUTH_TIMEOUT_S = float(os.getenv("AUTH_TIMEOUT_S", "10"))
+AUTH_MAX_CONNECTIONS = int(os.getenv("AUTH_MAX_CONNECTIONS", "20"))
+AUTH_MAX_KEEPALIVE = int(os.getenv("AUTH_MAX_KEEPALIVE", "10"))
+AUTH_KEEPALIVE_EXPIRY_S = float(os.getenv("AUTH_KEEPALIVE_EXPIRY_S", "60"))
+COUPLE_PROFILE_TTL_S = float(os.getenv("COUPLE_PROFILE_TTL_S", "60"))
+COUPLE_PROFILE_CACHE_SIZE = int(os.getenv("COUPLE_PROFILE_CACHE_SIZE", "1024"))
+
+# 코스 세션 (리롤이 course_id + seq만으로 저장된 후보 풀에서 바로 고르도록, TTL <= 0 이면 끔)
+COURSE_SESSION_TTL_S = float(os.getenv("COURSE_SESSION_TTL_S", "1800"))
+COURSE_SESSION_MAX_ENTRIES = int(os.getenv("COURSE_SESSION_MAX_ENTRIES", "5000"))
+COURSE_SESSION_POOL_SIZE = int(os.getenv("COURSE_SESSION_POOL_SIZE", "12"))  # 순번별로 저장할 후보 수
+# 빈 값이면 메모리에만 저장 (다중 워커 / 재시작 간 공유하려면 SQLite 경로 지정)
+COURSE_SESSION_PATH = os.getenv("COURSE_SESSION_PATH", os.path.join(tempfile.gettempdir(), "loventure_course_sessions.sqlite3"))
+
+# /recommends 중복 요청 제거: 같은 지문(coupleId + 출발지 격자 + 시간대 + 음주 의사 + 나머지 입력 해시)의
+# 동시 요청은 파이프라인 1회 실행을 공유하고, 완료된 결과는 REPLAY_TTL_S 동안 그대로 재전송 (0이면 재전송 끔)
+RECOMMEND_DEDUP_ENABLED = os.getenv("RECOMMEND_DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+RECOMMEND_REPLAY_TTL_S = float(os.getenv("RECOMMEND_REPLAY_TTL_S", "15"))
+RECOMMEND_REPLAY_CACHE_SIZE = int(os.getenv("RECOMMEND_REPLAY_CACHE_SIZE", "512"))
+RECOMMEND_DEDUP_LOCATION_DECIMALS = int(os.getenv("RECOMMEND_DEDUP_LOCATION_DECIMALS", "3"))  # 소수 3자리 ≈ 100m 격자
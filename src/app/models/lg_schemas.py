@@ -24,6 +24,17 @@ class State(TypedDict):
     check_count: int # 재시도 횟수 (선택적)
     course_title: Optional[str]
     sequence_explain: Optional[str]
+    planner_mode: Optional[str] # "per_category"(기본) | "batched" — 요청별 선택
+    prompt_context: Optional[Any] # 요청 단위 프롬프트 인코딩 캐시 (app.utils.prompt_context)
+    route_distance_m: Optional[int] # 동선 최적화 후 총 이동 거리 (출발점 포함)
+    deadline_ts: Optional[float] # 요청 마감 시각 (time.monotonic 기준, 없으면 무제한)
+    prefetched_pools: Optional[Dict[str, List[Dict[str, Any]]]] # 시퀀스 계획 중 선행 수집한 카테고리별 후보 풀
+    prefetch_info: Optional[Dict[str, Any]] # 선행 수집 카테고리 / 병합 호출 구성 (적중·낭비 집계용)
+    early_agents: Optional[Any] # 시퀀스 스트리밍 중 조기 실행한 에이전트 작업 (app.pipelines.early_dispatch)
+    candidate_pools: Optional[Dict[int, List[Dict[str, Any]]]] # 순번(seq)별 정렬된 후보 풀 (코스 세션 / 리롤용)
+    shortlists: Optional[Dict[int, List[Dict[str, Any]]]] # 순번(seq)별 LLM 차순위 후보 (리롤 시 먼저 사용)
+    course_id: Optional[str] # 코스 세션 ID (리롤 시 course_id + seq로 조회)
+    couple_id: Optional[str] # JWT의 coupleId (코스 세션 소유자 확인용)
 
 # Response 스키마
 
@@ -69,6 +80,19 @@ class POIResponse(BaseModel):
     rating_avg: Optional[float] = None
     link: Optional[str] = None
 
+class AlternatePick(POIResponse): # 리롤 / 동선 교체용 차순위 후보 (data 항목과 같은 필드 + 선택 이유)
+    category: Optional[str] = None # 에이전트가 카테고리를 채우므로 누락 허용
+    open_hours: Optional[OpenHours] = None
+    reason: Optional[str] = None
+
 class AgentResponse(BaseModel): # LLM이 무조건 맞춰야 하는 최상위 스키마
     explain: str
     data: List[POIResponse]
+    alternates: List[AlternatePick] = Field(default_factory=list) # 선호 순서대로, data와 겹치지 않게
+
+class CoursePick(POIResponse):
+    seq: int # 배치 플래너에서는 코스 순번이 필수
+
+class CoursePlanResponse(BaseModel): # 배치 플래너: 코스 전체 순번을 한 번에 채우는 스키마
+    explain: str
+    data: List[CoursePick]
@@ -69,10 +69,15 @@ class POI(BaseModel):
     link: Optional[str] = None
 
 class ReplaceRequest(BaseModel):
-    exclude_pois: List[POI]
-    previous_recommendations: List[POI]
+    # course_id가 있으면 서버의 코스 세션 사용 (seq 또는 exclude_pois의 seq만 필요)
+    course_id: Optional[str] = None
+    seq: Optional[int] = None
+    exclude_pois: List[POI] = Field(default_factory=list)
+    previous_recommendations: List[POI] = Field(default_factory=list)
     user_choice: Optional[Dict[str, Any]] = None
 
 class RerollResponse(BaseModel):
     explain: str
     data: List[Dict[str, Any]]
+    course_id: Optional[str] = None
+    total_distance_m: Optional[int] = None
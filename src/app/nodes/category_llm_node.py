@@ -1,18 +1,31 @@
+import asyncio
 import json
 import re
-from math import atan2, cos, radians, sin, sqrt
-from typing import Dict, Any, List, Optional
-from langsmith import Client
-from app.models.lg_schemas import AgentResponse, State
+import numpy as np
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from langchain_core.messages import HumanMessage, SystemMessage
+from app.models.lg_schemas import AgentResponse, CoursePlanResponse, OpenHours, POIResponse, State
 from config import llm, PLACES_API_FIELDS
-from app.places_api.nearby_search_service import search_nearby  # ✅ 교체 핵심
-
-# ✅ LangSmith 클라이언트 초기화
-try:
-    client = Client()
-except Exception as e:
-    print(f"⚠️ LangSmith Client 초기화 실패. 오류: {e}")
-    client = None
+from app.core.prompt_registry import prompt_registry  # ✅ 프롬프트 캐시 (LangSmith 왕복 제거)
+from app.places_api.area_search import asearch_nearby_area  # ✅ 로컬 인덱스 / 타일 캐시 / Nearby Search
+from app.utils.hedge import hedged_call  # ✅ llm_limiter 안에서 실행 + 지연 시 헤지 요청
+from app.utils.prompt_context import compact_dumps, get_prompt_context
+from app.utils.ranking import (
+    compact_candidates,
+    couple_price_target,
+    price_level_int,
+    prompt_savings,
+    rank_candidates,
+)
+from app.core.settings import (
+    AGENT_ALTERNATES,
+    AGENT_CANDIDATE_TOP_K,
+    AGENT_DEDUP_RADIUS_M,
+    PLACES_PLAN_MIN_POOL,
+    ROUTE_CHAIN_RADIUS_M,
+)
+from app.utils.geo import distance_matrix, place_coords, poi_coords, within_radius
+from app.utils.filters.categories import category_types
 
 
 # ✅ 다국어 상호명에서 한글명을 우선 선택
@@ -66,107 +79,149 @@ def simplify_places(raw_places: list[dict]) -> list[dict]:
     return simplified
 
 
-# ✅ Google Places 타입 매핑 (category → included_types)
-# Google Places API v1 Nearby Search - Trendy Mapping (<=5 each)
-# Google Places API v1 Nearby Search - 데이트 코스 추천용으로 수정 및 검증된 매핑
-TYPE_MAP = {
-    "restaurant": [
-        "restaurant",  # 'restaurant' 하나로 검색하는 것이 가장 넓고 안정적입니다.
-    ],
-    "cafe": [
-        "cafe", "bakery", "ice_cream_shop",
-    ],
-    "bar": [
-        "bar", "night_club",  # pub, wine_bar는 검색용 타입이 아니므로 bar로 통합 검색합니다.
-    ],
-    "activity": [
-        "amusement_center", "bowling_alley", "gym", "spa", "movie_theater", "performing_arts_theater",
-    ],  # 공연 카테고리를 통합하여 실내 활동의 폭을 넓혔습니다.
-    "attraction": [
-        "tourist_attraction", "museum", "art_gallery", "aquarium", "zoo",
-    ],
-    "exhibit": [
-        "museum", "art_gallery",  # 이 카테고리는 명확해서 그대로 사용합니다.
-    ],
-    "walk": [
-        "park",  # trailhead, plaza 등은 검색 불가. 'park'로 검색하는 것이 가장 적합합니다.
-    ],
-    "view": [
-        "tourist_attraction", # '전망'은 장소 유형이 아니므로, '관광 명소'로 검색 후 LLM이 판단하게 하는 것이 좋습니다. (아래 추가 제안 참고)
-    ],
-    "nature": [
-        "park", "tourist_attraction", # mountain, lake 등 자연물은 검색 불가. '공원', '관광 명소'가 최선입니다.
-    ],
-    "shopping": [
-        "shopping_mall", "department_store", "book_store", "market",
-    ],
-    # 'performance'는 activity에 통합하거나, 그대로 두어도 좋습니다.
-    "performance": [
-        "movie_theater", "performing_arts_theater", "stadium",
-    ],
-}
-
-# ✅ 허버사인 거리를 미터 단위로 계산
-def _distance_meters(origin: tuple[float, float], target: tuple[float, float]) -> float:
-    lat1, lng1 = origin
-    lat2, lng2 = target
-
-    lat1_rad, lat2_rad = radians(lat1), radians(lat2)
-    dlat = radians(lat2 - lat1)
-    dlng = radians(lng2 - lng1)
-
-    a = sin(dlat / 2) ** 2 + cos(lat1_rad) * cos(lat2_rad) * sin(dlng / 2) ** 2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-
-    return 6371000.0 * c  # 지구 반지름 (미터)
-
-
+# ✅ 반경 필터 (허버사인 벡터 연산, 좌표가 없거나 잘못된 장소는 유지)
 def _filter_places_within_radius(
     raw_places: List[Dict[str, Any]],
     center: tuple[float, float],
     radius_m: float,
 ) -> tuple[List[Dict[str, Any]], int]:
-    filtered: List[Dict[str, Any]] = []
-    removed = 0
-
-    for place in raw_places:
-        loc = place.get("location") or {}
-        plat = loc.get("latitude")
-        plng = loc.get("longitude")
-
-        try:
-            if plat is not None and plng is not None:
-                distance = _distance_meters(center, (float(plat), float(plng)))
-                if distance <= radius_m:
-                    filtered.append(place)
-                else:
-                    removed += 1
-            else:
-                filtered.append(place)
-        except (TypeError, ValueError):
-            filtered.append(place)
+    if not raw_places:
+        return [], 0
+    lats, lngs = place_coords(raw_places)
+    mask = within_radius(center, lats, lngs, radius_m)
+    filtered = [place for place, keep in zip(raw_places, mask) if keep]
+    return filtered, len(raw_places) - len(filtered)
+
+
+# ✅ 중복 판단 키 (이름 + 좌표)
+def _poi_key(p: Dict[str, Any]) -> tuple:
+    name = (p.get("name") or "").strip().lower()
+    lat_val = p.get("lat")
+    lng_val = p.get("lng")
+    # 위치가 없을 수 있으므로, 이름만 일치하면 중복으로 간주
+    return (
+        name,
+        round(float(lat_val), 6) if isinstance(lat_val, (int, float)) else None,
+        round(float(lng_val), 6) if isinstance(lng_val, (int, float)) else None,
+    )
 
-    return filtered, removed
 
+def _dedupe_places(
+    places: List[Dict[str, Any]],
+    excluded: Sequence[Dict[str, Any]],
+    excluded_keys: set,
+    radius_m: float = AGENT_DEDUP_RADIUS_M,
+) -> List[Dict[str, Any]]:
+    """
+    기존 추천 / 앞선 후보와 겹치는 후보 제거.
+    -   이름+좌표 키가 같으면 중복 (기존 기준)
+    -   이름이 같고 `radius_m` 이내면 중복 (언어별 표기/좌표 미세 차이 흡수, 쌍별 거리 행렬)
+    """
+    if not places:
+        return []
+    refs = [*excluded, *places]
+    n, e = len(places), len(excluded)
+    lats, lngs = poi_coords(places)
+    ref_lats, ref_lngs = poi_coords(refs)
+    names = np.array([(p.get("name") or "").strip().lower() for p in places], dtype=object)
+    ref_names = np.array([(p.get("name") or "").strip().lower() for p in refs], dtype=object)
+
+    with np.errstate(invalid="ignore"):
+        near = distance_matrix(lats, lngs, ref_lats, ref_lngs) <= radius_m
+    near &= (names[:, None] == ref_names[None, :]) & (names[:, None] != "")
+    # 후보끼리는 자기보다 앞선 후보만 비교 (먼저 나온 쪽을 남김)
+    near[:, e:] &= np.tri(n, n, -1, dtype=bool)
+    dup = near.any(axis=1)
 
-# ✅ 공통 POI 검색 및 LLM 처리 함수
-def category_poi_get(
-    state: State,
+    filtered: List[Dict[str, Any]] = []
+    seen_keys = set(excluded_keys)
+    for place, is_dup in zip(places, dup):
+        key = _poi_key(place)
+        if is_dup or key in seen_keys:
+            continue
+        filtered.append(place)
+        seen_keys.add(key)
+    return filtered
+
+
+def _fallback_rank(place: Dict[str, Any]) -> tuple:
+    """LLM 선택이 모자랄 때 쓰는 결정적 순서: 평점 × √(리뷰 수 + 1), 이름순."""
+    rating = float(place.get("rating") or 0.0)
+    reviews = float(place.get("review_count") or 0.0)
+    return (-(rating * (1.0 + reviews) ** 0.5), place.get("name") or "")
+
+
+def place_to_poi(place: Dict[str, Any], category: str, seq: Optional[int]) -> Dict[str, Any]:
+    """후보 풀의 장소를 LLM 응답과 같은 POIResponse 형태로 변환 (LLM이 채우는 태그/영업시간은 비어 있음)."""
+    return POIResponse(
+        seq=seq,
+        name=place.get("name") or "",
+        category=category,
+        lat=float(place.get("lat") or 0.0),
+        lng=float(place.get("lng") or 0.0),
+        price_level=price_level_int(place.get("price_level")),
+        open_hours=OpenHours(),
+        rating_avg=place.get("rating"),
+    ).dict()
+
+
+def _assign_slots(
+    picks: List[Dict[str, Any]],
+    slot_seqs: Sequence[int],
+    pool: List[Dict[str, Any]],
+    excluded: set,
     category: str,
-    prompt_name: str,
-    keyword: Optional[str] = None,
-    *,
+) -> List[Dict[str, Any]]:
+    """
+    한 번의 LLM 응답을 여러 seq 슬롯에 배정한다.
+    -   기존 추천/서로 간 중복은 버림 (슬롯 간 중복 없음 보장)
+    -   LLM이 준 seq가 슬롯과 맞으면 그대로, 아니면 남은 슬롯에 순서대로
+    -   그래도 빈 슬롯은 후보 풀 상위 장소로 채움
+    """
+    used = set(excluded)
+    by_seq: Dict[int, Dict[str, Any]] = {}
+    leftovers: List[Dict[str, Any]] = []
+    for rec in picks:
+        key = _poi_key(rec)
+        if key in used:
+            continue
+        used.add(key)
+        seq = rec.get("seq")
+        if seq in slot_seqs and seq not in by_seq:
+            by_seq[seq] = rec
+        else:
+            leftovers.append(rec)
+
+    for seq in slot_seqs:
+        if seq not in by_seq and leftovers:
+            by_seq[seq] = leftovers.pop(0)
+
+    missing = [seq for seq in slot_seqs if seq not in by_seq]
+    if missing:
+        # 사전 정렬(AGENT_CANDIDATE_TOP_K > 0)된 풀은 그 순서를 그대로 사용
+        ordered = pool if AGENT_CANDIDATE_TOP_K > 0 else sorted(pool, key=_fallback_rank)
+        for place in ordered:
+            if not missing:
+                break
+            if _poi_key(place) in used:
+                continue
+            used.add(_poi_key(place))
+            seq = missing.pop(0)
+            by_seq[seq] = place_to_poi(place, category, seq)
+            print(f"🧩 {category} seq={seq} LLM 선택 부족 → 후보 풀 상위 장소로 대체: {place.get('name')}")
+
+    return [
+        {**by_seq[seq], "seq": seq, "category": category}
+        for seq in slot_seqs
+        if seq in by_seq
+    ]
+
+
+# ✅ 검색 중심/반경 결정 (user_choice.start, radius_m / radius_km)
+def resolve_search_area(
+    user_choice: Dict[str, Any],
     radius_m: Optional[int] = None,
-    language: str = "ko",
-    idx: Optional[int] = None,
-) -> Dict[str, Any]:
-
-    print(f"✅ {category} 추천 에이전트 실행")
-
-    # -----------------------------
-    # 위치 추출
-    # -----------------------------
-    user_choice = state.get("user_choice", {})
+) -> tuple[float, float, float]:
     lat, lng = None, None
     if "start" in user_choice:
         start = user_choice["start"]
@@ -196,6 +251,32 @@ def category_poi_get(
     if radius_m_float <= 0:
         radius_m_float = 1600.0
 
+    return lat, lng, radius_m_float
+
+
+# ✅ 카테고리 후보 로드 (사전 수집 풀 또는 Nearby Search → 반경 필터 → 정제 → 중복 제외)
+async def _load_candidates(
+    state: State,
+    category: str,
+    *,
+    radius_m: Optional[int] = None,
+    language: str = "ko",
+    center: Optional[Tuple[float, float]] = None,
+) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]], set]]:
+    """
+    (원본 장소, LLM에 보낼 정제 후보, 제외 키) 반환. 후보가 없으면 None.
+    `center`를 주면 출발점 대신 그 위치(직전 순번 장소) 주변을 `ROUTE_CHAIN_RADIUS_M` 이내로 찾는다.
+    """
+    # -----------------------------
+    # 위치 추출
+    # -----------------------------
+    user_choice = state.get("user_choice", {})
+    lat, lng, radius_m_float = resolve_search_area(user_choice, radius_m)
+    if center is not None:
+        lat, lng = center
+        radius_m_float = min(radius_m_float, ROUTE_CHAIN_RADIUS_M)
+        print(f"🔗 {category} 직전 장소 기준 검색 → lat={lat}, lng={lng}, 반경={radius_m_float}m")
+
     # ✅ 반드시 추가
     search_location = (lat, lng)
 
@@ -208,33 +289,39 @@ def category_poi_get(
     # -----------------------------
     # Google Places Nearby Search 호출
     # -----------------------------
-    type_candidates = TYPE_MAP.get(category)
-    if not type_candidates:
-        type_candidates = [category]
-    elif isinstance(type_candidates, str):
-        type_candidates = [type_candidates]
-
+    type_candidates = category_types(category)
     radius_request_value = int(radius_m_float)
 
-    print(
-        f"📡 Google Places Nearby Search 실행: {type_candidates}, 반경={radius_request_value}m, 위치=({lat}, {lng})"
-    )
-
-    try:
-        raw_resp = search_nearby(
-            location=search_location,
-            radius=radius_request_value,
-            included_types=type_candidates,
-            language=language,
+    # agent_runner가 병합 검색으로 미리 가져온 후보 풀이 있으면 그대로 사용
+    # (직전 장소 기준 검색이면 새 반경 안에 충분히 남을 때만)
+    prefetched = (state.get("poi_data") or {}).get(category)
+    if prefetched and center is not None:
+        in_radius, _ = _filter_places_within_radius(list(prefetched), (float(lat), float(lng)), radius_m_float)
+        if len(in_radius) < PLACES_PLAN_MIN_POOL:
+            prefetched = None
+    if prefetched:
+        print(f"📦 {category} 사전 수집 후보 사용: {len(prefetched)}개")
+        raw_places = list(prefetched)
+    else:
+        print(
+            f"📡 Google Places Nearby Search 실행: {type_candidates}, 반경={radius_request_value}m, 위치=({lat}, {lng})"
         )
-        raw_places = raw_resp.get("places", [])
-    except Exception as e:
-        print(f"⛔️ Google Nearby API 호출 실패: {e}")
-        return {"recommendations": [], "poi_data_delta": {category: []}}
+
+        try:
+            raw_resp = await asearch_nearby_area(
+                search_location,
+                radius_request_value,
+                type_candidates,
+                language=language,
+            )
+            raw_places = raw_resp.get("places", [])
+        except Exception as e:
+            print(f"⛔️ Google Nearby API 호출 실패: {e}")
+            return None
 
     if not raw_places:
         print(f"⛔️ '{type_candidates}' 카테고리 POI 없음")
-        return {"recommendations": [], "poi_data_delta": {category: []}}
+        return None
 
     center = (float(search_location[0]), float(search_location[1]))
     raw_places, removed_count = _filter_places_within_radius(raw_places, center, radius_m_float)
@@ -244,127 +331,444 @@ def category_poi_get(
 
     if not raw_places:
         print("⛔️ 반경 내 유효한 POI 없음")
-        return {"recommendations": [], "poi_data_delta": {category: []}}
+        return None
 
-    poi_delta = {category: raw_places}
     places = simplify_places(raw_places)
 
     already_selected = state.get("already_selected_pois", []) or []
     previous_recs = state.get("previous_recommendations", []) or []
     exclude_pois = state.get("exclude_pois", []) or []
 
-    def _poi_key(p: Dict[str, Any]) -> tuple:
-        name = (p.get("name") or "").strip().lower()
-        lat_val = p.get("lat")
-        lng_val = p.get("lng")
-        # 위치가 없을 수 있으므로, 이름만 일치하면 중복으로 간주
-        return (
-            name,
-            round(float(lat_val), 6) if isinstance(lat_val, (int, float)) else None,
-            round(float(lng_val), 6) if isinstance(lng_val, (int, float)) else None,
+    excluded = [p for p in (*already_selected, *previous_recs, *exclude_pois) if p]
+    excluded_keys = {_poi_key(p) for p in excluded}
+    filtered_places = _dedupe_places(places, excluded, excluded_keys)
+
+    if not filtered_places:
+        print("⚠️ 모든 후보가 기존 추천과 중복되어 필터링됨")
+        filtered_places = places  # 마지막 방어: LLM이 맥락 보고 판단하게 한다
+
+    if AGENT_CANDIDATE_TOP_K > 0:
+        # ✅ 평점/리뷰 수/거리/가격대 적합도로 사전 정렬 (상위 K개만 LLM에 전달)
+        price_target = couple_price_target(state.get("user"), state.get("partner"))
+        filtered_places = rank_candidates(filtered_places, center, radius_m_float, price_target)
+
+    return raw_places, filtered_places, excluded_keys
+
+
+# ✅ 예산 초과 / 실패한 순번 채우기 (LLM 없이, 이미 가져온 후보만 사용)
+def fallback_pick(
+    state: State,
+    category: str,
+    seq: int,
+    pool: Optional[List[Dict[str, Any]]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    `pool`(정제된 후보, 에이전트가 돌려준 것) 또는 `state["poi_data"]`의 사전 수집 원본에서
+    기존 선택과 겹치지 않는 상위 장소 하나를 고른다. 추가 API 호출은 하지 않는다.
+    """
+    if pool is None:
+        raw_places = (state.get("poi_data") or {}).get(category) or []
+        if not raw_places:
+            return None
+        lat, lng, radius_m_float = resolve_search_area(state.get("user_choice", {}) or {})
+        center = (float(lat), float(lng))
+        raw_places, _ = _filter_places_within_radius(list(raw_places), center, radius_m_float)
+        price_target = couple_price_target(state.get("user"), state.get("partner"))
+        pool = rank_candidates(simplify_places(raw_places), center, radius_m_float, price_target)
+    elif AGENT_CANDIDATE_TOP_K <= 0:
+        pool = sorted(pool, key=_fallback_rank)
+
+    excluded = [
+        p
+        for p in (
+            *(state.get("already_selected_pois") or []),
+            *(state.get("previous_recommendations") or []),
+            *(state.get("exclude_pois") or []),
         )
+        if p
+    ]
+    candidates = _dedupe_places(list(pool), excluded, {_poi_key(p) for p in excluded})
+    if not candidates:
+        return None
+    print(f"🧩 {category} seq={seq} 대체 선택 (후보 풀 상위): {candidates[0].get('name')}")
+    return {**place_to_poi(candidates[0], category, seq), "category": category}
+
 
-    seen_keys = {
-        _poi_key(p)
-        for p in (*already_selected, *previous_recs, *exclude_pois)
+# ✅ 리롤: 에이전트가 미리 골라 둔 차순위 후보 중 아직 유효한 첫 장소 (LLM 호출 없음)
+def shortlist_pick(
+    state: State,
+    category: str,
+    seq: int,
+    shortlist: Sequence[Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    """`shortlist` 순서를 유지하며 현재 코스 / 이전 추천 / 제외 목록과 겹치지 않는 첫 후보를 고른다."""
+    excluded = [
+        p
+        for p in (
+            *(state.get("already_selected_pois") or []),
+            *(state.get("previous_recommendations") or []),
+            *(state.get("exclude_pois") or []),
+        )
         if p
-    }
+    ]
+    valid = _dedupe_places(list(shortlist), excluded, {_poi_key(p) for p in excluded})
+    if not valid:
+        return None
+    print(f"🧩 {category} seq={seq} 차순위 후보 사용: {valid[0].get('name')} ({valid[0].get('reason') or '-'})")
+    return {**valid[0], "seq": seq, "category": category}
 
-    filtered_places: List[Dict[str, Any]] = []
-    for place in places:
-        key = _poi_key(place)
-        if key in seen_keys:
+
+def _resolve_alternates(
+    alternates: Sequence[Any],
+    pool: List[Dict[str, Any]],
+    picks: List[Dict[str, Any]],
+    excluded_keys: set,
+    category: str,
+    limit: int,
+) -> List[Dict[str, Any]]:
+    """
+    LLM이 준 차순위 후보를 실제 후보 풀의 장소와 이름으로 맞춰 POI 형태로 변환.
+    이름/좌표는 후보 풀 값을, 태그/영업시간/이유 등 LLM이 채운 필드는 그대로 유지한다.
+    풀에 없는 이름(환각) / 이번 선택 / 제외 목록과 겹치는 후보는 버린다.
+    """
+    by_name: Dict[str, List[Dict[str, Any]]] = {}
+    for place in pool:
+        by_name.setdefault((place.get("name") or "").strip().lower(), []).append(place)
+
+    matched: List[Dict[str, Any]] = []
+    llm_fields: Dict[int, Dict[str, Any]] = {}
+    for alt in alternates:
+        alt = alt.dict() if hasattr(alt, "dict") else dict(alt)
+        same_name = by_name.get((alt.get("name") or "").strip().lower())
+        if not same_name:
             continue
-        filtered_places.append(place)
-        seen_keys.add(key)
+        # 같은 이름이 여럿이면 LLM이 준 좌표에 가장 가까운 후보
+        place = min(
+            same_name,
+            key=lambda p: abs(float(p.get("lat") or 0.0) - float(alt.get("lat") or 0.0))
+            + abs(float(p.get("lng") or 0.0) - float(alt.get("lng") or 0.0)),
+        )
+        matched.append(place)
+        llm_fields[id(place)] = {
+            k: v for k, v in alt.items()
+            if k not in ("seq", "name", "category", "lat", "lng") and v not in (None, "", [], {})
+        }
+
+    kept = _dedupe_places(matched, picks, excluded_keys | {_poi_key(p) for p in picks})
+    return [
+        {**place_to_poi(place, category, None), **llm_fields.get(id(place), {}), "category": category}
+        for place in kept[:limit]
+    ]
+
+
+def _candidates_for_llm(category: str, places: List[Dict[str, Any]], min_k: int = 0) -> Any:
+    """LLM에 보낼 후보: 상위 K개를 축약 형식으로 (K <= 0 이면 기존처럼 전체 그대로)."""
+    if AGENT_CANDIDATE_TOP_K <= 0:
+        return places
+    sent = places[: max(AGENT_CANDIDATE_TOP_K, min_k)]
+    compact = compact_candidates(sent)
+    saved = prompt_savings.record(places, sent, json.dumps(compact, ensure_ascii=False))
+    print(f"✂️ {category} 후보 {len(places)}→{len(sent)}개 축약 전달 (약 {saved} 토큰 절감)")
+    return compact
 
-    if not filtered_places:
-        print("⚠️ 모든 후보가 기존 추천과 중복되어 필터링됨")
-        filtered_places = places  # 마지막 방어: LLM이 맥락 보고 판단하게 한다
+
+# ✅ 공통 POI 검색 및 LLM 처리 함수
+async def category_poi_get(
+    state: State,
+    category: str,
+    prompt_name: str,
+    keyword: Optional[str] = None,
+    *,
+    radius_m: Optional[int] = None,
+    language: str = "ko",
+    idx: Optional[int] = None,
+    slots: Optional[Sequence[int]] = None,
+    center: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    """
+    카테고리 후보를 검색하고 LLM으로 추천을 고른다.
+
+    `slots`(0-based 순번 목록)가 2개 이상이면 다중 슬롯 모드:
+    후보 풀을 한 번만 가져오고, 한 번의 LLM 호출로 슬롯 수만큼 서로 다른 장소를 받는다.
+    `candidates`에는 동선 최적화에 쓸 정렬된 후보 풀을,
+    `alternates`에는 LLM이 함께 고른 차순위 후보(`AGENT_ALTERNATES`개, 리롤용)를 함께 돌려준다.
+    """
+    slot_seqs = [i + 1 for i in slots] if slots and len(slots) > 1 else None
+
+    print(f"✅ {category} 추천 에이전트 실행" + (f" (다중 슬롯 seq={slot_seqs})" if slot_seqs else ""))
+
+    loaded = await _load_candidates(state, category, radius_m=radius_m, language=language, center=center)
+    if loaded is None:
+        return {"recommendations": [], "poi_data_delta": {category: []}}
+    raw_places, filtered_places, excluded_keys = loaded
+    poi_delta = {category: raw_places}
 
     # -----------------------------
     # LLM 입력 데이터 구성
     # -----------------------------
-    input_data = {
-        "var2": json.dumps(state.get("available_categories", []), ensure_ascii=False, indent=2),
-        "user1": json.dumps(state.get("user", {}), ensure_ascii=False, indent=2),
-        "user2": json.dumps(state.get("partner", {}), ensure_ascii=False, indent=2),
-        "couple": json.dumps(state.get("couple", {}), ensure_ascii=False, indent=2),
-        "trigger": json.dumps(state.get("user_choice", {}), ensure_ascii=False, indent=2),
-        "question": state.get("query", ""),
-        "poi_data": json.dumps(filtered_places, ensure_ascii=False),
-        "previous_recommendations": json.dumps(
-            state.get("previous_recommendations", []), ensure_ascii=False, indent=2
-        ),
-        "already_selected_pois": json.dumps(
-            state.get("already_selected_pois", []), ensure_ascii=False, indent=2
-        ),
-    }
+    # 요청 단위로 메모이즈된 compact JSON 재사용 (already_selected_pois는 새 항목만 인코딩)
+    input_data = get_prompt_context(state).agent_inputs(state)
+    input_data["poi_data"] = compact_dumps(
+        _candidates_for_llm(category, filtered_places, min_k=2 * len(slot_seqs or []))
+    )
 
     # -----------------------------
     # LLM 실행
     # -----------------------------
     try:
-        if not client:
-            raise Exception("LangSmith Client not initialized")
-
-        prompt = client.pull_prompt(prompt_name)
+        prompt = await prompt_registry.aget(prompt_name)
         messages = prompt.format_prompt(**input_data).to_messages()
+        if slot_seqs:
+            messages.append(HumanMessage(content=(
+                f"이번 코스에는 '{category}' 카테고리가 seq {slot_seqs} 위치에 {len(slot_seqs)}번 등장합니다. "
+                f"poi_data에서 서로 다른 장소 {len(slot_seqs)}개를 골라 data에 담고, "
+                f"각 항목의 seq를 {slot_seqs} 중 하나로 겹치지 않게 지정하세요."
+            )))
+        alternates_limit = AGENT_ALTERNATES * len(slot_seqs or [None])
+        if alternates_limit > 0:
+            # 리롤용 차순위 후보: 후보를 이미 다 본 이번 호출에서 함께 받아 둔다
+            messages.append(HumanMessage(content=(
+                f"data에 고른 장소 외에, 다음으로 추천할 만한 장소를 poi_data에서 최대 {alternates_limit}곳 골라 "
+                "추천 순서대로 alternates에 담고, 각 항목의 reason에 고른 이유를 한 문장으로 쓰세요. "
+                "data에 담은 장소와 이미 선택/제외된 장소는 넣지 마세요. 장소 이름과 좌표는 poi_data 값을 그대로 쓰고, "
+                "나머지 필드(실내 여부, 영업시간, 태그 등)도 data 항목과 같은 방식으로 채우세요."
+            )))
 
         # ✅ JSON 스키마 강제
         llm_with_schema = llm.with_structured_output(AgentResponse)
-        result: AgentResponse = llm_with_schema.invoke(messages)
+        result: AgentResponse = await hedged_call(
+            "category",
+            lambda: llm_with_schema.ainvoke(messages),
+            validate=lambda r: r is not None and bool(r.data),
+        )
 
         payload = []
         if result and result.data:
             for rec in result.data:
                 rec_dict = rec.dict()
-                if idx is not None:
+                if idx is not None and not slot_seqs:
                     rec_dict["seq"] = idx + 1
                 rec_dict["category"] = category
                 payload.append(rec_dict)
 
+        if slot_seqs:
+            payload = _assign_slots(payload, slot_seqs, filtered_places, excluded_keys, category)
+
+        alternates = _resolve_alternates(
+            (result.alternates if result else None) or [],
+            filtered_places, payload, excluded_keys, category, alternates_limit,
+        ) if alternates_limit > 0 else []
+
         print(f"📤 {category} 응답 with idx={idx}:")
         print(json.dumps(payload, ensure_ascii=False, indent=2))
-        print(f"✔️ {category} 추천 완료 (개수 {len(payload)})")
+        print(f"✔️ {category} 추천 완료 (개수 {len(payload)}, 차순위 후보 {len(alternates)})")
 
-        return {"recommendations": payload, "poi_data_delta": poi_delta}
+        return {
+            "recommendations": payload,
+            "poi_data_delta": poi_delta,
+            "candidates": {category: filtered_places},
+            "alternates": {category: alternates},
+        }
 
     except Exception as e:
         print(f"⛔️ {category} LLM 실행 오류: {e}")
         return {"recommendations": [], "poi_data_delta": {category: []}}
 
 
+# ✅ 배치 플래너: 코스 전체를 한 번의 LLM 호출로 채운다
+PLANNER_MODES = ("per_category", "batched")
+
+_BATCHED_PLANNER_SYSTEM = """당신은 커플 데이트 코스의 장소를 고르는 플래너입니다.
+입력으로 사용자(user1), 파트너(user2), 커플 정보(couple), 이번 요청 조건(trigger),
+코스 순번 목록(stops), 카테고리별 후보 장소(candidates)가 주어집니다.
+
+규칙:
+- stops의 각 seq마다 해당 category의 candidates 중에서 정확히 한 곳을 고릅니다.
+- 코스 전체에서 같은 장소를 두 번 고르지 않으며, exclude 목록의 장소도 고르지 않습니다.
+- 두 사람의 취향/예산/이동 동선과 trigger의 시간대·날씨 조건을 함께 고려합니다.
+- name, lat, lng는 후보 데이터의 값을 그대로 사용하고, category는 stop의 category를 씁니다.
+  (후보가 축약 형식이면 legend에 따라 n=name, la=lat, ln=lng 입니다.)
+- data에는 seq 순서대로 항목을 담고, explain에는 코스 전체 선택 이유를 한두 문장으로 씁니다."""
+
+
+async def course_plan_get(
+    state: State,
+    stops: Sequence[Tuple[int, str]],
+    *,
+    radius_m: Optional[int] = None,
+    language: str = "ko",
+) -> Optional[Dict[str, Any]]:
+    """
+    배치 플래너 모드: 코스의 모든 순번((idx, category) 목록)을 한 번의 구조화 호출로 채운다.
+
+    사용자/파트너/커플 JSON을 한 번만 보내고, 반복 카테고리의 후보도 한 번만 보낸다.
+    LLM 호출이 실패하면 None을 반환하며, 호출부는 카테고리별 모드로 대체한다.
+    """
+    categories = list(dict.fromkeys(cat for _, cat in stops))
+    print(f"✅ 배치 플래너 실행: {len(stops)}개 순번 / {len(categories)}개 카테고리")
+
+    loaded = await asyncio.gather(
+        *[_load_candidates(state, cat, radius_m=radius_m, language=language) for cat in categories]
+    )
+    pools = {cat: res for cat, res in zip(categories, loaded) if res is not None}
+    if not pools:
+        print("⛔️ 배치 플래너: 후보가 있는 카테고리 없음")
+        return None
+
+    seq_to_cat = {idx + 1: cat for idx, cat in stops if cat in pools}
+    excluded_keys: set = set()
+    for _, _, keys in pools.values():
+        excluded_keys |= keys
+
+    shared = get_prompt_context(state).sequence_inputs(state)
+    context = {
+        "stops": [{"seq": seq, "category": cat} for seq, cat in seq_to_cat.items()],
+        "candidates": {
+            cat: _candidates_for_llm(
+                cat, filtered, min_k=2 * sum(1 for c in seq_to_cat.values() if c == cat)
+            )
+            for cat, (_, filtered, _) in pools.items()
+        },
+        "exclude": [
+            {"name": p.get("name"), "lat": p.get("lat"), "lng": p.get("lng")}
+            for p in (
+                *(state.get("already_selected_pois") or []),
+                *(state.get("previous_recommendations") or []),
+                *(state.get("exclude_pois") or []),
+            )
+            if p
+        ],
+    }
+    # 공통 필드는 이미 인코딩된 문자열을 그대로 이어 붙인다
+    encoded = [f'"{name}":{shared[name]}' for name in ("user1", "user2", "couple", "trigger")]
+    encoded.append(f'"question":{compact_dumps(shared["question"])}')
+    encoded.extend(f'"{k}":{compact_dumps(v)}' for k, v in context.items())
+    messages = [
+        SystemMessage(content=_BATCHED_PLANNER_SYSTEM),
+        HumanMessage(content="{" + ",".join(encoded) + "}"),
+    ]
+
+    try:
+        llm_with_schema = llm.with_structured_output(CoursePlanResponse)
+        result: CoursePlanResponse = await hedged_call(
+            "planner",
+            lambda: llm_with_schema.ainvoke(messages),
+            validate=lambda r: r is not None and bool(r.data),
+        )
+    except Exception as e:
+        print(f"⛔️ 배치 플래너 LLM 실행 오류: {e}")
+        return None
+
+    picks_by_cat: Dict[str, List[Dict[str, Any]]] = {cat: [] for cat in pools}
+    for rec in (result.data if result else []) or []:
+        cat = seq_to_cat.get(rec.seq)
+        if cat:
+            picks_by_cat[cat].append(rec.dict())
+
+    # 카테고리별로 슬롯 배정 (이미 배정된 장소는 다음 카테고리에서 제외 → 코스 전체 중복 없음)
+    used = set(excluded_keys)
+    recommendations: List[Dict[str, Any]] = []
+    for cat, (_, filtered, _) in pools.items():
+        slot_seqs = [seq for seq, c in seq_to_cat.items() if c == cat]
+        assigned = _assign_slots(picks_by_cat[cat], slot_seqs, filtered, used, cat)
+        used |= {_poi_key(r) for r in assigned}
+        recommendations.extend(assigned)
+    recommendations.sort(key=lambda r: r["seq"])
+
+    print(f"✔️ 배치 플래너 완료 (개수 {len(recommendations)})")
+    return {
+        "recommendations": recommendations,
+        "poi_data_delta": {cat: raw for cat, (raw, _, _) in pools.items()},
+        "candidates": {cat: filtered for cat, (_, filtered, _) in pools.items()},
+        "explain": result.explain if result else None,
+    }
+
+
 # ✅ 개별 카테고리 에이전트 노드 정의
-def restaurant_agent_node(state: State, idx: Optional[int] = None) -> Dict[str, Any]:
-    return category_poi_get(state, "restaurant", "restaurant_prompt", "맛집 OR 레스토랑", idx=idx)
+async def restaurant_agent_node(
+    state: State,
+    idx: Optional[int] = None,
+    slots: Optional[Sequence[int]] = None,
+    center: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    return await category_poi_get(state, "restaurant", "restaurant_prompt", "맛집 OR 레스토랑", idx=idx, slots=slots, center=center)
 
-def cafe_agent_node(state: State, idx: Optional[int] = None) -> Dict[str, Any]:
-    return category_poi_get(state, "cafe", "cafe_prompt", "카페", idx=idx)
+async def cafe_agent_node(
+    state: State,
+    idx: Optional[int] = None,
+    slots: Optional[Sequence[int]] = None,
+    center: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    return await category_poi_get(state, "cafe", "cafe_prompt", "카페", idx=idx, slots=slots, center=center)
 
-def bar_agent_node(state: State, idx: Optional[int] = None) -> Dict[str, Any]:
-    return category_poi_get(state, "bar", "bar_prompt", "바 OR 펍", idx=idx)
+async def bar_agent_node(
+    state: State,
+    idx: Optional[int] = None,
+    slots: Optional[Sequence[int]] = None,
+    center: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    return await category_poi_get(state, "bar", "bar_prompt", "바 OR 펍", idx=idx, slots=slots, center=center)
 
-def activity_agent_node(state: State, idx: Optional[int] = None) -> Dict[str, Any]:
-    return category_poi_get(state, "activity", "activity_prompt", "체험 액티비티", idx=idx)
+async def activity_agent_node(
+    state: State,
+    idx: Optional[int] = None,
+    slots: Optional[Sequence[int]] = None,
+    center: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    return await category_poi_get(state, "activity", "activity_prompt", "체험 액티비티", idx=idx, slots=slots, center=center)
 
-def attraction_agent_node(state: State, idx: Optional[int] = None) -> Dict[str, Any]:
-    return category_poi_get(state, "attraction", "attraction_prompt", "명소 관광지", idx=idx)
+async def attraction_agent_node(
+    state: State,
+    idx: Optional[int] = None,
+    slots: Optional[Sequence[int]] = None,
+    center: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    return await category_poi_get(state, "attraction", "attraction_prompt", "명소 관광지", idx=idx, slots=slots, center=center)
 
-def exhibit_agent_node(state: State, idx: Optional[int] = None) -> Dict[str, Any]:
-    return category_poi_get(state, "exhibit", "exhibit_prompt", "전시회 전시장", idx=idx)
+async def exhibit_agent_node(
+    state: State,
+    idx: Optional[int] = None,
+    slots: Optional[Sequence[int]] = None,
+    center: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    return await category_poi_get(state, "exhibit", "exhibit_prompt", "전시회 전시장", idx=idx, slots=slots, center=center)
 
-def walk_agent_node(state: State, idx: Optional[int] = None) -> Dict[str, Any]:
-    return category_poi_get(state, "walk", "walk_prompt", "산책로 공원 산책", idx=idx)
+async def walk_agent_node(
+    state: State,
+    idx: Optional[int] = None,
+    slots: Optional[Sequence[int]] = None,
+    center: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    return await category_poi_get(state, "walk", "walk_prompt", "산책로 공원 산책", idx=idx, slots=slots, center=center)
 
-def view_agent_node(state: State, idx: Optional[int] = None) -> Dict[str, Any]:
-    return category_poi_get(state, "view", "view_prompt", "야경 전망대 뷰맛집", idx=idx)
+async def view_agent_node(
+    state: State,
+    idx: Optional[int] = None,
+    slots: Optional[Sequence[int]] = None,
+    center: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    return await category_poi_get(state, "view", "view_prompt", "야경 전망대 뷰맛집", idx=idx, slots=slots, center=center)
 
-def nature_agent_node(state: State, idx: Optional[int] = None) -> Dict[str, Any]:
-    return category_poi_get(state, "nature", "nature_prompt", "자연 경치 숲길", idx=idx)
+async def nature_agent_node(
+    state: State,
+    idx: Optional[int] = None,
+    slots: Optional[Sequence[int]] = None,
+    center: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    return await category_poi_get(state, "nature", "nature_prompt", "자연 경치 숲길", idx=idx, slots=slots, center=center)
 
-def shopping_agent_node(state: State, idx: Optional[int] = None) -> Dict[str, Any]:
-    return category_poi_get(state, "shopping", "shopping_prompt", "쇼핑몰 상가 쇼핑", idx=idx)
+async def shopping_agent_node(
+    state: State,
+    idx: Optional[int] = None,
+    slots: Optional[Sequence[int]] = None,
+    center: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    return await category_poi_get(state, "shopping", "shopping_prompt", "쇼핑몰 상가 쇼핑", idx=idx, slots=slots, center=center)
 
-def performance_agent_node(state: State, idx: Optional[int] = None) -> Dict[str, Any]:
-    return category_poi_get(state, "performance", "performance_prompt", "공연 연극 콘서트", idx=idx)
+async def performance_agent_node(
+    state: State,
+    idx: Optional[int] = None,
+    slots: Optional[Sequence[int]] = None,
+    center: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    return await category_poi_get(state, "performance", "performance_prompt", "공연 연극 콘서트", idx=idx, slots=slots, center=center)
@@ -43,7 +43,8 @@ def output_node(state: State) -> Dict[str, Any]:
             "mood_tag": rec.get("mood_tag", None),
             "food_tag": rec.get("food_tag", []),
             "rating_avg": rec.get("rating_avg", None),
-            "link": rec.get("link", None)
+            "link": rec.get("link", None),
+            "leg_distance_m": rec.get("leg_distance_m", None),
         }
         places.append(place_info)
 
@@ -51,7 +52,8 @@ def output_node(state: State) -> Dict[str, Any]:
     final_output_data = {
         "title": title,
         "explain": explain_text or random.choice(EXPLAIN_CHOICES),
-        "data": places
+        "data": places,
+        "total_distance_m": state.get("route_distance_m"),
     }
 
     # JSON 문자열 변환 후 상태에 저장
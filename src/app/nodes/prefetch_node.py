@@ -0,0 +1,169 @@
+# src/app/nodes/prefetch_node.py
+"""
+시퀀스 계획과 병렬로 돌리는 Places 선행 수집 (speculative prefetch)
+------------------------------------------------------------------
+
+`sequence_llm`이 Gemini 응답을 기다리는 1~3초 동안 Places 호출은 아무것도 하지 않다가,
+시퀀스가 나온 뒤에야 `agent_runner`가 Nearby Search를 시작합니다.
+
+이 노드는 hardfilter 직후 `sequence_llm`과 동시에 실행되어,
+하드필터를 통과한 카테고리(`available_categories`) 중 지금까지 시퀀스에 자주 나온
+카테고리 상위 `PREFETCH_MAX_CATEGORIES`개의 후보 풀을 병합 검색으로 미리 가져옵니다.
+`agent_runner`는 시퀀스에 포함된 카테고리의 풀을 그대로 쓰고, 빠진 카테고리만 추가로 검색합니다.
+
+적중률 / 낭비된 호출 수는 `/health/stats`의 `places_prefetch`에서 확인할 수 있습니다.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.settings import PREFETCH_ENABLED, PREFETCH_MAX_CATEGORIES
+from app.models.lg_schemas import State
+from app.nodes.category_llm_node import resolve_search_area
+from app.places_api.fetch_planner import afetch_category_pools, plan_nearby_fetches
+from app.utils.deadline import node_budget
+
+# 시퀀스 이력이 쌓이기 전의 사전 빈도 (데이트 코스에 흔한 카테고리 우선)
+_PRIOR: Dict[str, float] = {
+    "restaurant": 5.0,
+    "cafe": 5.0,
+    "walk": 3.0,
+    "view": 2.0,
+    "bar": 2.0,
+    "exhibit": 2.0,
+    "activity": 1.0,
+    "attraction": 1.0,
+    "shopping": 1.0,
+    "nature": 1.0,
+    "performance": 1.0,
+}
+
+
+class PrefetchStats:
+    """카테고리 출현 빈도(예측용)와 선행 수집 적중/낭비 카운터."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._freq: Counter = Counter()
+        self.runs = 0
+        self.timeouts = 0
+        self.calls = 0
+        self.wasted_calls = 0
+        self.categories_prefetched = 0
+        self.hits = 0          # 시퀀스 카테고리 중 선행 수집 풀로 바로 채운 수
+        self.misses = 0        # 시퀀스 카테고리 중 다시 검색해야 했던 수
+        self.wasted = 0        # 선행 수집했지만 시퀀스에 없던 카테고리 수
+        self.dropped = 0       # 호출했지만 병합 결과가 부족해 풀로 쓰지 못한 카테고리 수
+
+    def predict(self, available: Sequence[str], k: int) -> List[str]:
+        with self._lock:
+            score = {c: self._freq.get(c, 0) + _PRIOR.get(c, 0.0) for c in available}
+        return sorted(score, key=lambda c: (-score[c], c))[:k]
+
+    def record_run(self, categories: int, calls: int, timed_out: bool) -> None:
+        with self._lock:
+            self.runs += 1
+            self.categories_prefetched += categories
+            self.calls += calls
+            self.timeouts += int(timed_out)
+
+    def record_use(
+        self,
+        sequence: Sequence[str],
+        prefetched: Sequence[str],
+        call_groups: Sequence[Sequence[str]],
+    ) -> None:
+        """시퀀스가 정해진 뒤(agent_runner) 적중/낭비를 집계하고 빈도를 갱신.
+
+        `prefetched`는 실제로 풀이 남은 카테고리만 담는다. 병합 결과가 부족해 버려진 카테고리는
+        agent_runner가 다시 검색하므로, 그런 카테고리만 남은 호출도 낭비로 센다.
+        """
+        needed = set(sequence)
+        usable = set(prefetched)
+        fetched = {c for group in call_groups for c in group}
+        with self._lock:
+            self._freq.update(needed)
+            self.hits += len(needed & set(prefetched))
+            self.misses += len(needed - set(prefetched))
+            self.wasted += len(set(prefetched) - needed)
+            self.dropped += len(fetched - usable)
+            self.wasted_calls += sum(1 for group in call_groups if not needed & usable & set(group))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            needed = self.hits + self.misses
+            return {
+                "enabled": PREFETCH_ENABLED,
+                "runs": self.runs,
+                "timeouts": self.timeouts,
+                "calls": self.calls,
+                "wasted_calls": self.wasted_calls,
+                "categories_prefetched": self.categories_prefetched,
+                "hits": self.hits,
+                "misses": self.misses,
+                "wasted": self.wasted,
+                "dropped": self.dropped,
+                "hit_ratio": round(self.hits / needed, 3) if needed else 0.0,
+                "frequency": dict(self._freq.most_common()),
+            }
+
+
+# ✅ 프로세스 전역 카운터
+prefetch_stats = PrefetchStats()
+
+
+async def prefetch_node(state: State) -> Dict[str, Any]:
+    """
+    가능성 높은 카테고리의 후보 풀을 미리 가져온다 (sequence_llm과 병렬).
+    시퀀스 계획 예산 안에서만 실행하며, 실패/초과해도 파이프라인에는 영향이 없다.
+    """
+    if not PREFETCH_ENABLED:
+        return {"prefetched_pools": None}
+
+    available = state.get("available_categories") or []
+    categories = prefetch_stats.predict(available, PREFETCH_MAX_CATEGORIES)
+    if not categories:
+        return {"prefetched_pools": None}
+
+    lat, lng, radius_m = resolve_search_area(state.get("user_choice", {}) or {})
+    call_groups = [f.all_categories for f in plan_nearby_fetches(categories)]
+    print(f"🔮 Places 선행 수집: {categories} ({len(call_groups)}회 호출)")
+
+    # 시퀀스 계획과 같은 예산 안에서만 (agent_runner 시작을 늦추지 않도록)
+    budget = node_budget(state, "sequence_llm")
+    started = time.perf_counter()
+    timed_out = False
+    try:
+        fetch = afetch_category_pools(categories, (lat, lng), int(radius_m))
+        pools = await (fetch if budget is None else asyncio.wait_for(fetch, timeout=budget))
+    except asyncio.TimeoutError:
+        timed_out = True
+        pools = {}
+        print(f"⏱️ Places 선행 수집 예산 {budget:.2f}s 초과 → 건너뜀")
+    except Exception as e:
+        pools = {}
+        print(f"⚠️ Places 선행 수집 실패: {e}")
+
+    prefetch_stats.record_run(len(categories), len(call_groups), timed_out)
+    print(f"🔮 선행 수집 완료: {sorted(pools)} ({time.perf_counter() - started:.2f}s)")
+    return {
+        "prefetched_pools": pools,
+        "prefetch_info": {"categories": categories, "call_groups": call_groups},
+    }
+
+
+def take_prefetched(state: State, needed: Sequence[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """agent_runner용: 시퀀스에 필요한 카테고리의 선행 수집 풀을 꺼내고 적중/낭비를 기록."""
+    pools: Optional[Dict[str, List[Dict[str, Any]]]] = state.get("prefetched_pools")
+    info = state.get("prefetch_info") or {}
+    if pools is None or not info:
+        return {}
+    prefetch_stats.record_use(needed, list(pools), info.get("call_groups") or [])
+    hits = {c: pools[c] for c in needed if c in pools}
+    if hits:
+        print(f"🔮 선행 수집 적중: {sorted(hits)} / 필요 {list(needed)}")
+    return hits
@@ -1,21 +1,34 @@
 # sequence_llm_node.py
 import json
 import re
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Callable, List, Optional, Tuple
 
-from langsmith import Client
+from langchain_core.messages import HumanMessage
 
+from app.core.prompt_registry import prompt_registry
 from app.models.lg_schemas import State
+from app.utils.concurrency import llm_limiter
+from app.utils.hedge import hedged_call
+from app.utils.json_stream import JsonArrayStream
+from app.utils.prompt_context import get_prompt_context
 
 # config와 llm 임포트
 from config import llm
 
-# LangSmith 클라이언트 초기화
-try:
-    client = Client()
-except Exception as e:
-    print(f"⚠️ LangSmith Client 초기화 실패. 오류: {e}")
-    client = None
+# 예산 초과 시 기본 코스 (하드필터를 통과한 카테고리만, 앞에서부터 3개)
+FALLBACK_SEQUENCE = ["restaurant", "cafe", "walk", "view", "exhibit", "bar", "shopping"]
+
+
+def fallback_sequence(state: State) -> Dict[str, Any]:
+    """sequence_llm이 예산을 넘겼을 때 쓰는 결정적 시퀀스."""
+    available = state.get("available_categories") or []
+    sequence = [c for c in FALLBACK_SEQUENCE if c in available][:3] or list(available[:3])
+    print(f"🧩 기본 카테고리 시퀀스로 대체: {sequence}")
+    return {
+        "recommended_sequence": sequence,
+        "prompt_context": get_prompt_context(state),
+    }
+
 
 def _strip_code_fence(text: str) -> str:
     if text.startswith("```") and text.endswith("```"):
@@ -122,30 +135,65 @@ def _parse_structured_text(raw_text: str) -> Optional[Dict[str, Any]]:
     return payload or None
 
 
-def sequence_llm_node(state: State) -> Dict[str, Any]:
+def _chunk_text(chunk: Any) -> str:
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):  # 멀티파트 응답 조각
+        return "".join(p if isinstance(p, str) else str(p.get("text") or "") for p in content if isinstance(p, (str, dict)))
+    return ""
+
+
+async def _stream_sequence(messages: List[Any], on_category: Callable[[int, str], None]) -> str:
+    """응답을 토큰 단위로 받으며 categories 항목이 완성될 때마다 `on_category(idx, category)` 호출."""
+    parser = JsonArrayStream("categories")
+    parts: List[str] = []
+    async with llm_limiter:
+        async for chunk in llm.astream(messages):
+            text = _chunk_text(chunk)
+            parts.append(text)
+            for idx, category in parser.feed(text):
+                on_category(idx, category)
+    return "".join(parts)
+
+
+async def sequence_llm_node(
+    state: State,
+    on_category: Optional[Callable[[int, str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    `on_category`가 주어지면 응답을 스트리밍으로 받아, categories 배열 항목이 완성되는 즉시 알린다
+    (에이전트 조기 실행용 — app/pipelines/early_dispatch.py). 최종 시퀀스는 전체 응답으로 확정.
+    """
     print("✅ 카테고리 시퀀스 LLM 노드 실행")
-    if not client:
-        print("⛔️ LangSmith 클라이언트가 없어 노드를 건너뜁니다.")
-        return {"recommended_sequence": [], "status": "failed"}
-
-    input_data = {
-        "var2": json.dumps(state.get("available_categories", []), ensure_ascii=False, indent=2),
-        "user1": json.dumps(state.get("user", {}), ensure_ascii=False, indent=2),
-        "user2": json.dumps(state.get("partner", {}), ensure_ascii=False, indent=2),
-        "couple": json.dumps(state.get("couple", {}), ensure_ascii=False, indent=2),
-        "trigger": json.dumps(state.get("user_choice", {}), ensure_ascii=False, indent=2),
-        "question": state.get("query", ""),
-    }
+    # 요청 단위 프롬프트 컨텍스트: 여기서 만든 compact JSON을 이후 에이전트들이 재사용
+    prompt_context = get_prompt_context(state)
+    input_data = prompt_context.sequence_inputs(state)
     try:
-        prompt_template = client.pull_prompt("gh_sequence")
+        prompt_template = await prompt_registry.aget("gh_sequence")
         formatted_messages = prompt_template.format_prompt(**input_data).to_messages()
-        llm_raw_result = llm.invoke(formatted_messages)
 
-        response_text = ""
-        if hasattr(llm_raw_result, "content"):
-            response_text = llm_raw_result.content or ""
-        else:
-            response_text = str(llm_raw_result)
+        response_text: Optional[str] = None
+        if on_category is not None:
+            # categories를 먼저 받아야 title/explain 생성과 에이전트 실행이 겹친다
+            streamed_messages = formatted_messages + [
+                HumanMessage(content="JSON 응답에서 categories 필드를 title, explain보다 먼저 출력하세요.")
+            ]
+            try:
+                response_text = await _stream_sequence(streamed_messages, on_category)
+            except Exception as e:
+                print(f"⚠️ 시퀀스 스트리밍 실패 → 일반 호출로 재시도: {e}")
+
+        if not response_text:
+            llm_raw_result = await hedged_call(
+                "sequence",
+                lambda: llm.ainvoke(formatted_messages),
+                validate=lambda r: bool(getattr(r, "content", r)),
+            )
+            if hasattr(llm_raw_result, "content"):
+                response_text = llm_raw_result.content or ""
+            else:
+                response_text = str(llm_raw_result)
         print(f"📝 LLM 응답: {response_text}")
         parsed_payload, recommended_sequence = _extract_json_payload(response_text)
 
@@ -170,7 +218,10 @@ def sequence_llm_node(state: State) -> Dict[str, Any]:
 
         state["recommended_sequence"] = recommended_sequence
 
-        result: Dict[str, Any] = {"recommended_sequence": state["recommended_sequence"]}
+        result: Dict[str, Any] = {
+            "recommended_sequence": state["recommended_sequence"],
+            "prompt_context": prompt_context,
+        }
 
         if parsed_payload:
             course_title = parsed_payload.get("title")
@@ -190,4 +241,8 @@ def sequence_llm_node(state: State) -> Dict[str, Any]:
     except Exception as e:
         print(f"⛔️ LLM 호출 또는 프롬프트 처리 중 오류 발생: {e}")
         state["recommended_sequence"] = []
-        return {"recommended_sequence": state['recommended_sequence'], "status": "failed"}
+        return {
+            "recommended_sequence": state['recommended_sequence'],
+            "status": "failed",
+            "prompt_context": prompt_context,
+        }
@@ -1,17 +1,10 @@
 import json
 import re
 from typing import Dict, Any
-from langsmith import Client
+from app.core.prompt_registry import prompt_registry
 from app.models.schemas import State
 from config import llm
 
-# LangSmith 클라이언트 초기화
-try:
-    client = Client()
-except Exception as e:
-    print(f"⚠️ LangSmith Client 초기화 실패. 오류: {e}")
-    client = None
-
 
 def verification_node(state: State) -> Dict[str, Any]:
     """
@@ -20,24 +13,14 @@ def verification_node(state: State) -> Dict[str, Any]:
     """
     print("✅ 검증 노드 실행")
 
-    # 1. 클라이언트 유효성 체크
-    if not client:
-        print("⛔️ LangSmith 클라이언트 없음 → 검증 불가 처리")
-        state["current_judge"] = None
-        state["judgement_reason"] = "LangSmith Client 없음 → 검증 불가"
-        return {
-            "current_judge": state.get("current_judge"),
-            "judgement_reason": state.get("judgement_reason"),
-        }
-
-    # 2. 입력 데이터 구성
+    # 1. 입력 데이터 구성
     input_data = {
         "user_data": json.dumps(state.get("user_data", {}), ensure_ascii=False),
         "recommended_sequence": json.dumps(state.get("recommended_sequence", []), ensure_ascii=False),
         "recommendations": json.dumps(state.get("recommendations", []), ensure_ascii=False),
     }
 
-    # 3. 재시도 카운트 관리
+    # 2. 재시도 카운트 관리
     if "check_count" not in state:
         state["check_count"] = 0
 
@@ -53,9 +36,9 @@ def verification_node(state: State) -> Dict[str, Any]:
         }
 
     try:
-        # 4. 프롬프트 실행 시도
+        # 3. 프롬프트 실행 시도
         try:
-            check_prompt = client.pull_prompt("gh_check")
+            check_prompt = prompt_registry.get("gh_check")
         except Exception as e:
             print(f"⛔️ 검증 프롬프트 불러오기 실패: {e}")
             state["current_judge"] = False
@@ -70,7 +53,7 @@ def verification_node(state: State) -> Dict[str, Any]:
 
         raw_content = getattr(llm_raw_result, "content", "").strip()
     
-        # 5. LLM 응답 파싱
+        # 4. LLM 응답 파싱
         parsed_args = {}
         try:
             parsed_args = json.loads(raw_content)  # JSON 전체 파싱
@@ -82,7 +65,7 @@ def verification_node(state: State) -> Dict[str, Any]:
                 except Exception:
                     parsed_args = {}
 
-        # 6. 결과 반영
+        # 5. 결과 반영
         judge_val = parsed_args.get("judge")
         reason_val = parsed_args.get("reason")
 
@@ -93,7 +76,7 @@ def verification_node(state: State) -> Dict[str, Any]:
             state["current_judge"] = None
             state["judgement_reason"] = f"LLM 응답 파싱 실패: {raw_content[:100]}..."
 
-        # 7. 재시도 관리
+        # 6. 재시도 관리
         if state["current_judge"] is True:
             state["check_count"] = 0
         elif state["current_judge"] is False:
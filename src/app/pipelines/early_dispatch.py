@@ -0,0 +1,117 @@
+# src/app/pipelines/early_dispatch.py
+"""
+시퀀스 LLM 스트리밍 중 카테고리 에이전트 조기 실행
+-------------------------------------------------
+
+`SEQUENCE_STREAM_ENABLED`이면 sequence_llm이 응답을 토큰 단위로 받으며
+`categories` 배열의 항목이 완성되는 즉시 해당 카테고리의 첫 순번 에이전트를 시작합니다.
+title / explain이 이어서 생성되는 동안 에이전트의 Places 검색 + LLM 호출이 겹쳐 진행됩니다.
+
+-   카테고리마다 첫 등장 순번 하나만 조기 실행 (같은 카테고리의 다음 순번은 agent_runner가
+    조기 실행 결과를 반영한 뒤 이어서 실행 → 같은 카테고리는 여전히 직렬)
+-   최종 시퀀스(전체 응답 재파싱 / 기본 시퀀스 대체)와 순번·카테고리가 다르면 취소
+-   agent_runner가 가져가지 않은 작업은 노드 끝에서 모두 취소
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.settings import SEQUENCE_STREAM_ENABLED
+
+
+class EarlyDispatchStats:
+    """조기 실행 / 사용 / 폐기 횟수와 시퀀스 완료 시점까지 벌어 둔 시간."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.sequences = 0
+        self.dispatched = 0
+        self.used = 0
+        self.discarded = 0
+        self.head_start_s = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": SEQUENCE_STREAM_ENABLED,
+                "sequences": self.sequences,
+                "dispatched": self.dispatched,
+                "used": self.used,
+                "discarded": self.discarded,
+                "avg_head_start_s": round(self.head_start_s / self.dispatched, 3) if self.dispatched else 0.0,
+            }
+
+
+# ✅ 프로세스 전역 카운터
+early_dispatch_stats = EarlyDispatchStats()
+
+
+class EarlyDispatch:
+    """요청 단위 조기 실행 작업 묶음 (state["early_agents"]로 agent_runner에 전달)."""
+
+    def __init__(
+        self,
+        state: Dict[str, Any],
+        agents: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]],
+    ) -> None:
+        self._state = state
+        self._agents = agents
+        self._tasks: Dict[str, Tuple[int, "asyncio.Task[Dict[str, Any]]", float]] = {}
+
+    def dispatch(self, idx: int, category: str) -> None:
+        """스트리밍 파서가 idx번째 카테고리를 완성했을 때 호출."""
+        fn = self._agents.get(category)
+        if fn is None or category in self._tasks:
+            return
+        print(f"🚀 {category} 에이전트 조기 실행 (seq={idx + 1})")
+        task = asyncio.ensure_future(fn(self._state, idx))
+        self._tasks[category] = (idx, task, time.perf_counter())
+        with early_dispatch_stats._lock:
+            early_dispatch_stats.dispatched += 1
+
+    def categories(self) -> List[str]:
+        """아직 agent_runner가 가져가지 않은 조기 실행 카테고리."""
+        return list(self._tasks)
+
+    def sequence_done(self) -> None:
+        """시퀀스 응답이 끝난 시점: 조기 실행으로 앞당긴 시간을 기록."""
+        now = time.perf_counter()
+        with early_dispatch_stats._lock:
+            early_dispatch_stats.sequences += 1
+            early_dispatch_stats.head_start_s += sum(now - started for _, _, started in self._tasks.values())
+
+    def take(
+        self, category: str, sequence: Sequence[str]
+    ) -> Optional[Tuple[int, "asyncio.Task[Dict[str, Any]]"]]:
+        """최종 시퀀스와 일치하는 조기 실행 작업을 꺼낸다 (없거나 어긋나면 None)."""
+        entry = self._tasks.pop(category, None)
+        if entry is None:
+            return None
+        idx, task, _ = entry
+        if idx >= len(sequence) or sequence[idx] != category:
+            print(f"⚠️ {category} 조기 실행(seq={idx + 1})이 최종 시퀀스와 달라 취소")
+            self._discard(task)
+            return None
+        with early_dispatch_stats._lock:
+            early_dispatch_stats.used += 1
+        return idx, task
+
+    def cancel_pending(self) -> List[str]:
+        """가져가지 않은 작업 취소 (배치/체인 모드 전환, 예산 초과 등)."""
+        leftover = list(self._tasks)
+        for _, task, _ in self._tasks.values():
+            self._discard(task)
+        self._tasks.clear()
+        return leftover
+
+    @staticmethod
+    def _discard(task: "asyncio.Task[Any]") -> None:
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()  # 끝난 작업의 예외는 여기서 소비 (미처리 경고 방지)
+        with early_dispatch_stats._lock:
+            early_dispatch_stats.discarded += 1
@@ -1,16 +1,19 @@
+import asyncio
+import time
 from langgraph.graph import StateGraph, END
-from typing import Any, Dict, List, Callable ,Tuple
+from typing import Any, Awaitable, Dict, List, Callable, Optional, Tuple
 from app.models.lg_schemas import State
 from langgraph.checkpoint.base import BaseCheckpointSaver
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from langgraph.config import get_stream_writer
 
 # 정제 / 필터 노드는 테스트에서 제외
 from app.nodes.hardfilter_node import node_category_hard_filter
 # from app.nodes.data_ingestion import data_ingestion_node
 
-from app.nodes.sequence_llm_node import sequence_llm_node
+from app.nodes.sequence_llm_node import fallback_sequence, sequence_llm_node
 #from app.nodes.verification_node import verification_node
 from app.nodes.output_node import output_node
+from app.nodes.prefetch_node import prefetch_node, take_prefetched
 from app.nodes.category_llm_node import (
     restaurant_agent_node,
     cafe_agent_node,
@@ -23,10 +26,28 @@ from app.nodes.category_llm_node import (
     nature_agent_node,
     shopping_agent_node,
     performance_agent_node,
+    resolve_search_area,
+    course_plan_get,
+    PLANNER_MODES,
+    fallback_pick,
+)
+from app.pipelines.early_dispatch import EarlyDispatch
+from app.places_api.fetch_planner import afetch_category_pools
+from app.utils.deadline import deadline_stats, node_budget, with_budget
+from app.utils.prompt_context import get_prompt_context
+from app.utils.route import optimize_route
+from app.core.settings import (
+    AGENT_MULTI_SLOT_ENABLED,
+    AGENT_PLANNER_MODE,
+    ROUTE_ALTERNATES,
+    ROUTE_CHAIN_SEARCH,
+    ROUTE_OPTIMIZE_ENABLED,
+    ROUTE_SWAP_PENALTY_M,
+    SEQUENCE_STREAM_ENABLED,
 )
 
 # 카테고리 → 에이전트 함수 매핑
-AGENT_MAP: Dict[str, Callable[[State], Dict[str, Any]]] = {
+AGENT_MAP: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]] = {
     "restaurant": restaurant_agent_node,
     "cafe": cafe_agent_node,
     "bar": bar_agent_node,
@@ -40,15 +61,108 @@ AGENT_MAP: Dict[str, Callable[[State], Dict[str, Any]]] = {
     "performance": performance_agent_node,
 }
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Any, List
+def _stream_writer() -> Callable[[Any], None]:
+    """astream(stream_mode="custom")으로 실행 중이면 LangGraph writer, 아니면 아무것도 안 함."""
+    try:
+        return get_stream_writer()
+    except Exception:
+        return lambda _event: None
+
+
+def _route_key(poi: Dict[str, Any]) -> Tuple[str, float, float]:
+    # LLM이 축약 후보의 좌표(6자리)를 옮겨 적으므로 약 10m 단위로 비교
+    return (
+        (poi.get("name") or "").strip().lower(),
+        round(float(poi.get("lat") or 0.0), 4),
+        round(float(poi.get("lng") or 0.0), 4),
+    )
+
+
+def _optimize_course(
+    recs: List[Dict[str, Any]],
+    shortlists: Dict[int, List[Dict[str, Any]]],
+    start: Tuple[float, float],
+    taken: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    순번 순서를 유지한 채, 각 순번의 LLM 선택 + LLM이 함께 고른 차순위 후보(`shortlists`) 중
+    총 이동 거리가 최소인 조합으로 교체. 차순위 후보는 선호 순서와 태그/영업시간이 있는 완전한 POI라
+    교체해도 응답 필드가 비지 않는다 (거리만 보고 후보 풀에서 고르지 않음).
+    각 항목에 `leg_distance_m`(직전 지점 → 이 장소, 첫 순번은 출발점 기준)을 붙이고 총 거리를 반환.
+    """
+    recs = sorted(recs, key=lambda r: r.get("seq") or 0)
+    if not recs:
+        return recs, None
+    picked = {_route_key(p) for p in (*recs, *taken) if p}
+    layers = []
+    for rec in recs:
+        alternates = [
+            c for c in shortlists.get(rec.get("seq"), [])
+            if _route_key(c) not in picked
+        ][:ROUTE_ALTERNATES]
+        layers.append([rec, *alternates])
+
+    started = time.perf_counter()
+    plan = optimize_route(layers, start, swap_penalty_m=ROUTE_SWAP_PENALTY_M, key=_route_key)
+    if plan is None:
+        return recs, None
+
+    out: List[Dict[str, Any]] = []
+    for i, (rec, j) in enumerate(zip(recs, plan.choice)):
+        if j != 0:
+            seq = rec.get("seq")
+            rec = {**layers[i][j], "seq": seq, "category": recs[i].get("category")}
+            print(f"🧭 seq={seq} 동선 최적화로 교체: {recs[i].get('name')} → {rec.get('name')}")
+        leg = plan.legs_m[i]
+        rec["leg_distance_m"] = None if leg is None else int(round(leg))
+        out.append(rec)
+
+    print(
+        f"🧭 동선 최적화: 총 {plan.baseline_m:.0f}m → {plan.total_m:.0f}m "
+        f"(교체 {len(plan.swapped)}곳, {(time.perf_counter() - started) * 1000:.1f}ms)"
+    )
+    return out, int(round(plan.total_m))
+
+
+def _planner_mode(state: State) -> str:
+    planner_mode = (state.get("planner_mode") or AGENT_PLANNER_MODE or "per_category").lower()
+    return planner_mode if planner_mode in PLANNER_MODES else "per_category"
+
+
+async def sequence_stage_node(state: State) -> Dict[str, Any]:
+    """
+    sequence_llm_node + (SEQUENCE_STREAM_ENABLED) 카테고리가 스트리밍으로 완성되는 대로 에이전트 조기 실행.
+    조기 실행 작업은 state["early_agents"]로 agent_runner에 넘긴다 (카테고리별 병렬 모드에서만).
+    """
+    early = None
+    if SEQUENCE_STREAM_ENABLED and _planner_mode(state) == "per_category" and not ROUTE_CHAIN_SEARCH:
+        early = EarlyDispatch(state, AGENT_MAP)
+    try:
+        result = await sequence_llm_node(state, on_category=early.dispatch if early else None)
+    except BaseException:
+        # 예산 초과로 취소되면 기본 시퀀스로 넘어가므로 조기 실행분은 버린다
+        if early is not None:
+            early.cancel_pending()
+        raise
+    if early is not None:
+        early.sequence_done()
+        result["early_agents"] = early
+    return result
+
 
 from collections import defaultdict
-def agent_runner_node(state: State) -> Dict[str, Any]:
+async def agent_runner_node(state: State) -> Dict[str, Any]:
     """
     sequence_llm가 만든 recommended_sequence를 기반으로
     카테고리별 agent를 병렬로 실행하되,
     같은 카테고리끼리는 순차적으로 실행 (LLM 중복 방지)
+    → `AGENT_MULTI_SLOT_ENABLED`이면 한 번의 검색 + LLM 호출로 모든 순번을 채움
+
+    스레드 풀 없이 이벤트 루프에서 실행되며, 실제 동시 호출 수는
+    프로세스 전역 `llm_limiter` / `places_limiter`가 제한한다.
+
+    요청 마감(`deadline_ts`)이 있으면 이 노드의 예산 안에 못 끝낸 에이전트는 취소하고,
+    비어 있는 순번은 이미 가져온 후보 풀의 상위 장소로 채운다 (순번을 버리지 않음).
     """
     seq: List[str] = state.get("recommended_sequence", [])
     if not seq:
@@ -73,6 +187,12 @@ def agent_runner_node(state: State) -> Dict[str, Any]:
         )
 
     seen_keys = {_poi_key(p) for p in already_selected_pois if p}
+    emit = _stream_writer()  # 순번이 채워질 때마다 스트리밍 이벤트
+    prior_count = len(already_selected_pois)
+    pools_by_seq: Dict[int, List[Dict[str, Any]]] = {}  # 순번별 후보 풀 (대체 선택 / 리롤용)
+    shortlists: Dict[int, List[Dict[str, Any]]] = {}  # 순번별 LLM 차순위 후보 (동선 최적화 / 리롤용)
+    # 같은 카테고리의 다음 순번 에이전트가 앞선 선택을 볼 수 있도록 같은 리스트를 공유
+    state["already_selected_pois"] = already_selected_pois
 
     # ✅ 카테고리별 그룹화
     cat_groups = defaultdict(list)
@@ -80,36 +200,192 @@ def agent_runner_node(state: State) -> Dict[str, Any]:
         cat_groups[cat].append((idx, cat))
     print(f"🧩 agent_runner: {len(seq)}개 카테고리 중 {len(cat_groups)}종 병렬 실행 (같은 카테고리는 직렬)")
 
-    def run_category_group(cat: str, group: List[Tuple[int, str]]):
-        """같은 카테고리 그룹 순차 실행"""
+    # ✅ 노드 예산: 마감 시각이 지나면 진행 중인 호출을 취소하고 대체 선택으로 넘어간다
+    budget = node_budget(state, "agent_runner")
+    runner_deadline = None if budget is None else time.monotonic() + budget * 0.95  # 대체/동선 계산 여유
+    timed_out = False
+
+    async def _bounded(aw: Awaitable[Any], default: Any = None) -> Any:
+        nonlocal timed_out
+        if runner_deadline is None:
+            return await aw
+        try:
+            return await asyncio.wait_for(aw, timeout=max(0.0, runner_deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            timed_out = True
+            return default
+
+    # ✅ 겹치는 타입을 묶은 병합 Nearby Search로 카테고리별 후보 풀 사전 수집
+    #    (prefetch 노드가 시퀀스 계획 중에 미리 가져온 카테고리는 다시 검색하지 않음)
+    #    (시퀀스 스트리밍 중 조기 실행된 카테고리는 에이전트가 이미 검색 중)
+    lat, lng, radius_m = resolve_search_area(state.get("user_choice", {}) or {})
+    early: Optional[EarlyDispatch] = state.get("early_agents")
+    early_cats = set(early.categories()) if early is not None else set()
+    known = [c for c in cat_groups if c in AGENT_MAP and c not in early_cats]
+    pools = take_prefetched(state, known)
+    missing = [c for c in known if c not in pools]
+    try:
+        if missing:
+            pools.update(await _bounded(afetch_category_pools(missing, (lat, lng), int(radius_m)), {}))
+    except Exception as e:
+        print(f"⚠️ 병합 Nearby 사전 수집 실패 → 카테고리별 단독 검색: {e}")
+    state["poi_data"] = {**(state.get("poi_data") or {}), **pools}
+
+    def _collect(recs: List[Dict[str, Any]], seq: Optional[int] = None) -> None:
+        for r in recs:
+            key = _poi_key(r)
+            if key in seen_keys:
+                continue
+            if seq is not None:
+                r["seq"] = seq
+            acc.append(r)
+            already_selected_pois.append(r)
+            seen_keys.add(key)
+            emit({"type": "stop", "seq": r.get("seq"), "place": r})
+
+    def _keep_pool(result: Optional[Dict[str, Any]], cat: str, seqs: List[int]) -> None:
+        pool = ((result or {}).get("candidates") or {}).get(cat)
+        if pool:
+            for s in seqs:
+                pools_by_seq[s] = pool
+        alternates = ((result or {}).get("alternates") or {}).get(cat)
+        if alternates:
+            for s in seqs:
+                shortlists[s] = alternates
+
+    async def run_category_group(cat: str, group: List[Tuple[int, str]]):
+        """같은 카테고리 그룹 실행 (다중 슬롯 1회 호출, 또는 순차 실행)"""
+        fn = AGENT_MAP.get(cat)
+        if not fn:
+            return
+
+        taken = early.take(cat, seq) if early is not None else None
+        if taken is not None:
+            # 시퀀스 스트리밍 중 먼저 시작한 첫 순번 → 결과를 반영한 뒤 나머지 순번 실행
+            early_idx, task = taken
+            try:
+                result = await task
+                _collect((result or {}).get("recommendations", []), seq=early_idx + 1)
+                _keep_pool(result, cat, [early_idx + 1])
+            except Exception as e:
+                print(f"[ERR] {cat} 조기 실행 실패 (seq={early_idx}): {e}")
+            group = [(idx, c) for idx, c in group if idx != early_idx]
+
+        if AGENT_MULTI_SLOT_ENABLED and len(group) > 1:
+            slots = [idx for idx, _ in group]
+            try:
+                result = await fn(state, slots=slots)
+                # 슬롯별로 seq가 지정되어 돌아오므로 그대로 사용
+                slot_seqs = {idx + 1 for idx in slots}
+                _collect([r for r in (result or {}).get("recommendations", []) if r.get("seq") in slot_seqs])
+                _keep_pool(result, cat, sorted(slot_seqs))
+            except Exception as e:
+                print(f"[ERR] {cat} 다중 슬롯 실행 실패 (seq={slots}): {e}")
+            return
+
         for idx, _ in group:
+            try:
+                result = await fn(state, idx)
+                _collect((result or {}).get("recommendations", []), seq=idx + 1)
+                _keep_pool(result, cat, [idx + 1])
+            except Exception as e:
+                print(f"[ERR] {cat} 실행 실패 (seq={idx}): {e}")
+
+    async def run_chained() -> None:
+        """순번 순서대로 직렬 실행: 두 번째 순번부터 직전 장소 주변을 검색."""
+        prev: Optional[Tuple[float, float]] = None
+        for idx, cat in enumerate(seq):
             fn = AGENT_MAP.get(cat)
             if not fn:
                 continue
             try:
-                result = fn(state, idx)
-                recs = (result or {}).get("recommendations", [])
-                for r in recs:
-                    key = _poi_key(r)
-                    if key in seen_keys:
-                        continue
-                    r["seq"] = idx + 1
-                    acc.append(r)
-                    already_selected_pois.append(r)
-                    seen_keys.add(key)
+                result = await fn(state, idx, center=prev)
+                _collect((result or {}).get("recommendations", [])[:1], seq=idx + 1)
+                _keep_pool(result, cat, [idx + 1])
             except Exception as e:
                 print(f"[ERR] {cat} 실행 실패 (seq={idx}): {e}")
+                continue
+            last = next((r for r in reversed(acc) if r.get("seq") == idx + 1), None)
+            if last and last.get("lat") and last.get("lng"):
+                prev = (float(last["lat"]), float(last["lng"]))
+
+    planner_mode = _planner_mode(state)
+    started = time.perf_counter()
+
+    batched = None
+    if planner_mode == "batched":
+        # ✅ 배치 플래너: 모든 순번을 한 번의 LLM 호출로 채움 (실패 시 카테고리별 모드로 대체)
+        stops = [(idx, cat) for idx, cat in enumerate(seq) if cat in AGENT_MAP]
+        batched = await _bounded(course_plan_get(state, stops))
+        if batched is None and timed_out:
+            print("⏱️ 배치 플래너 예산 초과 → 후보 풀 상위 장소로 대체")
+        elif batched is None:
+            print("⚠️ 배치 플래너 실패 → 카테고리별 모드로 대체")
+            planner_mode = "per_category"
+        else:
+            _collect(batched.get("recommendations", []))
+            for idx, cat in stops:
+                _keep_pool(batched, cat, [idx + 1])
+
+    if batched is not None or timed_out:
+        pass  # 배치 플래너가 모두 채웠거나 이미 예산을 다 씀
+    elif ROUTE_CHAIN_SEARCH:
+        # ✅ 직전 장소 기준 검색 (순번 간 의존이 있으므로 직렬)
+        planner_mode = f"{planner_mode}+chain"
+        await _bounded(run_chained())
+    else:
+        # ✅ 다른 카테고리는 병렬 실행 (카테고리 수 제한 없음, 전역 리미터가 상한)
+        await _bounded(asyncio.gather(*[run_category_group(cat, group) for cat, group in cat_groups.items()]))
+
+    if early is not None:
+        leftover = early.cancel_pending()
+        if leftover:
+            print(f"⚠️ 사용하지 않은 조기 실행 에이전트 취소: {leftover}")
+
+    # ✅ 비어 있는 순번 (예산 초과 / LLM 실패) → 이미 가져온 후보 중 상위 장소로 채움
+    filled_seqs = {r.get("seq") for r in acc}
+    fallbacks = 0
+    for idx, cat in enumerate(seq):
+        if cat not in AGENT_MAP or idx + 1 in filled_seqs:
+            continue
+        pick = fallback_pick(state, cat, idx + 1, pool=pools_by_seq.get(idx + 1))
+        if pick:
+            _collect([pick], seq=idx + 1)
+            fallbacks += 1
+        else:
+            print(f"⚠️ {cat} seq={idx + 1} 대체할 후보 없음 → 순번 제외")
+    deadline_stats.record_agent(timed_out, fallbacks)
+    acc.sort(key=lambda r: r.get("seq") or 0)
+
+    print(
+        f"⏱️ agent_runner[{planner_mode}] {time.perf_counter() - started:.2f}s"
+        + (f" (예산 {budget:.2f}s" + (", 초과" if timed_out else "") + f", 대체 {fallbacks}곳)" if budget is not None else "")
+    )
 
-    # ✅ 다른 카테고리는 병렬 실행
-    with ThreadPoolExecutor(max_workers=min(4, len(cat_groups))) as ex:
-        futures = [ex.submit(run_category_group, cat, group) for cat, group in cat_groups.items()]
-        for _ in as_completed(futures):
-            pass
+    route_distance_m = None
+    if ROUTE_OPTIMIZE_ENABLED and acc:
+        # ✅ 순번 순서를 지키며 총 이동 거리가 최소인 조합으로 정리 (+ 구간별 거리)
+        try:
+            acc, route_distance_m = _optimize_course(
+                acc, shortlists, (lat, lng), already_selected_pois[:prior_count]
+            )
+            already_selected_pois[prior_count:] = acc
+        except Exception as e:
+            print(f"⚠️ 동선 최적화 실패 → 원래 선택 유지: {e}")
+        # 이미 인코딩된 선택 목록의 항목을 교체 / leg_distance_m 추가했으므로 다시 인코딩하게 함
+        get_prompt_context(state).invalidate("already_selected_pois")
 
     state["recommendations"] = acc
     state["already_selected_pois"] = already_selected_pois
+    state["route_distance_m"] = route_distance_m
     print(f"🧩 agent_runner 완료 — 총 {len(acc)}개 추천 생성")
-    return {"recommendations": acc}
+    return {
+        "recommendations": acc,
+        "poi_data": state["poi_data"],
+        "route_distance_m": route_distance_m,
+        "candidate_pools": pools_by_seq,
+        "shortlists": shortlists,
+    }
 def route_recommendation(state: State) -> str:
     MAX_RETRY = 2
     ok = state.get("current_judge")  # True/False or None
@@ -148,9 +424,11 @@ def build_workflow():
     workflow = StateGraph(State)
 
     # 시퀀스 노드
-    workflow.add_node("hardfilter", node_category_hard_filter)  # --- IGNORE ---
-    workflow.add_node("sequence_llm", sequence_llm_node)
-    workflow.add_node("agent_runner", agent_runner_node)     
+    # 노드별 예산 (state["deadline_ts"]가 있을 때만): 초과 시 대체 결과로 진행
+    workflow.add_node("hardfilter", with_budget("hardfilter", node_category_hard_filter, lambda s: {}))  # --- IGNORE ---
+    workflow.add_node("sequence_llm", with_budget("sequence_llm", sequence_stage_node, fallback_sequence))
+    workflow.add_node("prefetch", prefetch_node)  # sequence_llm과 병렬, 예산은 노드 안에서
+    workflow.add_node("agent_runner", with_budget("agent_runner", agent_runner_node))  # 순번 단위 대체는 노드 안에서
     # 카테고리 에이전트 노드
     '''
      workflow.add_node("restaurant_agent", restaurant_agent_node)
@@ -169,7 +447,7 @@ def build_workflow():
 
     # 검증 + 출력
     #workflow.add_node("verification", verification_node)
-    workflow.add_node("output_json", output_node)
+    workflow.add_node("output_json", with_budget("output_json", output_node))
 
     # 진입점: 바로 시퀀스 노드부터 시작
     workflow.set_entry_point("hardfilter")  # --- IGNORE ---
@@ -177,7 +455,8 @@ def build_workflow():
    
    # 단순 직렬 흐름
     workflow.add_edge("hardfilter", "sequence_llm") 
-    workflow.add_edge("sequence_llm", "agent_runner")
+    workflow.add_edge("hardfilter", "prefetch")
+    workflow.add_edge(["sequence_llm", "prefetch"], "agent_runner")  # 둘 다 끝나면 실행
     workflow.add_edge("agent_runner", "output_json")
     #workflow.add_edge("agent_runner", "verification")
     '''
@@ -0,0 +1,81 @@
+"""
+영역 검색 진입점
+----------------
+
+에이전트/병합 계획이 "이 원 안의 이 타입들"을 요청할 때 사용하는 단일 진입점입니다.
+어떤 소스에서 후보를 가져올지 여기서 결정합니다.
+
+1.  로컬 POI 저장소 (`POI_STORE_MODE=serve`이고 영역이 신선할 때)
+2.  geohash 타일 캐시 (`PLACES_TILE_CACHE_ENABLED=true`)
+3.  일반 Nearby Search (캐시 + single-flight)
+4.  Google 호출이 실패하면 로컬 저장소의 후보로 대체 (`record`/`serve` 모드)
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from app.core.settings import PLACES_TILE_CACHE_ENABLED
+from .nearby_search_service import asearch_nearby
+from .places_client import places_client
+from .poi_store import poi_store
+from .tile_cache import search_tiled
+
+# 로컬 조회 결과 수 (Nearby Search 한 페이지와 동일)
+LOCAL_RESULT_LIMIT = 20
+
+
+async def asearch_nearby_area(
+    location: Tuple[float, float],
+    radius: int,
+    included_types: Sequence[str],
+    *,
+    language: Optional[str] = "ko",
+    fields: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """검색 원 안의 장소를 가장 빠른 소스에서 가져온다 (응답 형식은 Nearby Search와 동일)."""
+    if poi_store.serving and included_types:
+        fresh = await asyncio.to_thread(
+            poi_store.is_fresh, location, float(radius), included_types, language=language
+        )
+        if fresh:
+            places = await asyncio.to_thread(
+                poi_store.query, location, float(radius), included_types, limit=LOCAL_RESULT_LIMIT
+            )
+            if places:
+                poi_store.count_served()
+                print(f"🗄️ 로컬 POI 인덱스 사용: {included_types} → {len(places)}개")
+                return {"places": places}
+
+    try:
+        if PLACES_TILE_CACHE_ENABLED and included_types:
+            return await places_client.run(search_tiled(location, radius, included_types, language, fields))
+        return await asearch_nearby(
+            location=location, radius=radius, included_types=included_types, fields=fields, language=language
+        )
+    except Exception as e:
+        if not poi_store.enabled:
+            raise
+        places = await asyncio.to_thread(
+            poi_store.query, location, float(radius), included_types, limit=LOCAL_RESULT_LIMIT
+        )
+        if not places:
+            raise
+        poi_store.count_fallback()
+        print(f"🗄️ Places 호출 실패 → 로컬 POI 후보로 대체 ({len(places)}개): {e}")
+        return {"places": places}
+
+
+def search_nearby_area(
+    location: Tuple[float, float],
+    radius: int,
+    included_types: Sequence[str],
+    *,
+    language: Optional[str] = "ko",
+    fields: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """`asearch_nearby_area`의 동기 shim."""
+    return places_client.run_sync(
+        asearch_nearby_area(location, radius, included_types, language=language, fields=fields)
+    )
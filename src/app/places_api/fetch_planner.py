@@ -0,0 +1,197 @@
+"""
+Nearby Search 병합 계획 모듈
+----------------------------
+
+카테고리별로 Nearby Search를 따로 호출하면 `TYPE_MAP`이 겹치는 카테고리
+(attraction/view/nature의 `tourist_attraction`, walk/nature의 `park`,
+attraction/exhibit의 `museum`/`art_gallery` 등)가 같은 장소를 여러 번 요청하게 됩니다.
+
+이 모듈은 코스 시퀀스 전체를 보고 필요한 타입의 합집합을 최소한의 호출로 덮도록
+계획을 세운 뒤, 응답을 `types`/`primaryType` 기준으로 카테고리별 후보 풀로 나눕니다.
+
+계획 규칙:
+-   다른 카테고리 타입의 부분집합인 카테고리는 추가 비용 없이 같은 호출에 합류
+-   한 호출의 타입 수는 `PLACES_PLAN_MAX_TYPES_PER_CALL` 이하
+-   한 호출이 담당하는 카테고리 수는 `PLACES_PLAN_MAX_CATEGORIES_PER_CALL` 이하
+    (Nearby Search는 호출당 최대 20개만 반환하므로, 너무 많이 합치면 풀이 얇아짐)
+-   나눈 결과가 최소 풀 크기 미만인 카테고리는 풀에서 빠지며, 해당 에이전트가 기존처럼
+    단독 검색(최대 20개)을 수행합니다. 최소 풀 크기는 `PLACES_PLAN_MIN_POOL`
+    (기본: LLM 후보 수 + 차순위 후보 수)과 호출당 결과 수(20)를 그 호출의 카테고리 수로
+    나눈 몫 중 작은 값입니다. 타입이 겹치지 않는 두 카테고리가 20개를 나눠 가지면
+    둘 다 11개를 넘을 수 없으므로, 고정 기준을 쓰면 병합 호출 뒤 단독 재검색이 늘어납니다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.core.settings import (
+    PLACES_PLAN_MAX_CATEGORIES_PER_CALL,
+    PLACES_PLAN_MAX_TYPES_PER_CALL,
+    PLACES_PLAN_MIN_POOL,
+)
+from app.utils.filters.categories import category_types
+from .area_search import LOCAL_RESULT_LIMIT, asearch_nearby_area
+from .places_client import places_client
+
+
+@dataclass
+class NearbyFetch:
+    """한 번의 Nearby Search 호출과 그 결과를 나눠 가질 카테고리 목록."""
+    included_types: List[str] = field(default_factory=list)
+    categories: List[str] = field(default_factory=list)   # 타입 수를 차지하는 카테고리
+    riders: List[str] = field(default_factory=list)       # 부분집합이라 무료로 합류한 카테고리
+
+    @property
+    def all_categories(self) -> List[str]:
+        return self.categories + self.riders
+
+
+def _dedup(items: Iterable[str]) -> List[str]:
+    seen: Set[str] = set()
+    out: List[str] = []
+    for x in items:
+        if x and x not in seen:
+            seen.add(x)
+            out.append(x)
+    return out
+
+
+def plan_nearby_fetches(
+    categories: Sequence[str],
+    *,
+    max_types_per_call: int = PLACES_PLAN_MAX_TYPES_PER_CALL,
+    max_categories_per_call: int = PLACES_PLAN_MAX_CATEGORIES_PER_CALL,
+) -> List[NearbyFetch]:
+    """카테고리 시퀀스를 덮는 최소 Nearby Search 호출 계획을 만든다."""
+    cats = _dedup(categories)
+    type_sets = {c: set(category_types(c)) for c in cats}
+
+    # 다른 카테고리의 타입에 완전히 포함되는 카테고리는 나중에 무료로 합류
+    riders = {
+        c for c in cats
+        if any(o != c and type_sets[c] < type_sets[o] for o in cats)
+    }
+    # 타입이 완전히 같은 카테고리는 첫 번째만 대표로 남긴다
+    leaders: List[str] = []
+    for c in cats:
+        if c in riders:
+            continue
+        if any(type_sets[c] == type_sets[o] for o in leaders):
+            riders.add(c)
+            continue
+        leaders.append(c)
+
+    plan: List[NearbyFetch] = []
+    # 타입이 많은 카테고리부터 배치 (best-fit)
+    for c in sorted(leaders, key=lambda x: -len(type_sets[x])):
+        best: Optional[NearbyFetch] = None
+        best_added = None
+        for fetch in plan:
+            if len(fetch.categories) >= max_categories_per_call:
+                continue
+            union = set(fetch.included_types) | type_sets[c]
+            if len(union) > max_types_per_call:
+                continue
+            added = len(union) - len(fetch.included_types)
+            if best is None or added < best_added:
+                best, best_added = fetch, added
+        if best is None:
+            best = NearbyFetch()
+            plan.append(best)
+        best.categories.append(c)
+        best.included_types = _dedup([*best.included_types, *category_types(c)])
+
+    for c in cats:
+        if c not in riders:
+            continue
+        host = next((f for f in plan if type_sets[c] <= set(f.included_types)), None)
+        if host is None:  # 이론상 없음: 포함 관계의 상위 카테고리가 이미 계획에 있음
+            host = NearbyFetch(included_types=category_types(c))
+            plan.append(host)
+        host.riders.append(c)
+
+    return plan
+
+
+def fetch_min_pool(fetch: NearbyFetch, min_pool: int = PLACES_PLAN_MIN_POOL) -> int:
+    """이 호출의 결과로 카테고리 풀을 인정할 최소 크기 (호출당 결과 수를 나눠 가지는 몫 이하)."""
+    # riders는 타입이 다른 카테고리에 포함되어 결과 자리를 따로 차지하지 않는다
+    share = LOCAL_RESULT_LIMIT // max(1, len(fetch.categories))
+    return max(1, min(min_pool, share))
+
+
+def partition_places(
+    places: Sequence[Dict[str, Any]],
+    categories: Sequence[str],
+) -> Dict[str, List[Dict[str, Any]]]:
+    """병합 검색 결과를 `types`/`primaryType` 기준으로 카테고리별 풀로 나눈다."""
+    pools: Dict[str, List[Dict[str, Any]]] = {c: [] for c in categories}
+    type_sets = {c: set(category_types(c)) for c in categories}
+    for place in places:
+        place_types = set(place.get("types") or [])
+        if place.get("primaryType"):
+            place_types.add(place["primaryType"])
+        for c in categories:
+            if place_types & type_sets[c]:
+                pools[c].append(place)
+    return pools
+
+
+async def afetch_category_pools(
+    categories: Sequence[str],
+    location: Tuple[float, float],
+    radius: int,
+    *,
+    language: Optional[str] = "ko",
+    min_pool: int = PLACES_PLAN_MIN_POOL,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """계획된 병합 호출을 병렬로 실행하고 카테고리별 후보 풀을 반환한다.
+
+    실패한 호출이나 후보가 `fetch_min_pool`개 미만인 카테고리는 결과에서 빠진다.
+    """
+    plan = plan_nearby_fetches(categories)
+    if not plan:
+        return {}
+
+    print(
+        f"🗺️ Nearby 병합 계획: {len(_dedup(categories))}개 카테고리 → {len(plan)}회 호출 "
+        f"{[f.all_categories for f in plan]}"
+    )
+
+    results = await asyncio.gather(
+        *[
+            asearch_nearby_area(location, radius, fetch.included_types, language=language)
+            for fetch in plan
+        ],
+        return_exceptions=True,
+    )
+
+    pools: Dict[str, List[Dict[str, Any]]] = {}
+    for fetch, resp in zip(plan, results):
+        if isinstance(resp, BaseException):
+            print(f"⛔️ 병합 Nearby 호출 실패 {fetch.included_types}: {resp}")
+            continue
+        need = fetch_min_pool(fetch, min_pool)
+        for cat, pool in partition_places(resp.get("places", []), fetch.all_categories).items():
+            if len(pool) >= need:
+                pools[cat] = pool
+            else:
+                print(f"⚠️ {cat} 병합 결과 부족({len(pool)}/{need}개) → 단독 검색으로 대체")
+    return pools
+
+
+def fetch_category_pools(
+    categories: Sequence[str],
+    location: Tuple[float, float],
+    radius: int,
+    *,
+    language: Optional[str] = "ko",
+    min_pool: int = PLACES_PLAN_MIN_POOL,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """`afetch_category_pools`의 동기 shim."""
+    return places_client.run_sync(
+        afetch_category_pools(categories, location, radius, language=language, min_pool=min_pool)
+    )
@@ -0,0 +1,54 @@
+"""
+Nearby Search 결과 캐시
+-----------------------
+
+같은 커플의 리롤, 같은 역에서 출발하는 여러 커플처럼 거의 같은 조건의
+Nearby Search가 짧은 시간 안에 반복되는 경우 응답을 재사용합니다.
+
+캐시 키:
+-   위도/경도를 `PLACES_CACHE_COORD_DECIMALS` 자리로 반올림 (3자리 ≈ 110m 격자)
+-   반경(m), 정렬된 `included_types`, 언어 코드, 필드 마스크, 최대 결과 수
+
+반올림된 격자 안의 다른 출발점이 캐시를 공유하므로, 실제 반경 필터링은
+호출부(`_filter_places_within_radius`)가 원래 중심 좌표 기준으로 다시 수행합니다.
+"""
+
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+from app.core.settings import (
+    PLACES_CACHE_COORD_DECIMALS,
+    PLACES_CACHE_MAX_ENTRIES,
+    PLACES_CACHE_TTL_S,
+)
+from app.utils.ttl_cache import TTLCache
+
+nearby_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    ttl_s=PLACES_CACHE_TTL_S,
+    max_entries=PLACES_CACHE_MAX_ENTRIES,
+    name="places_nearby",
+)
+
+
+def nearby_cache_key(
+    location: Tuple[float, float],
+    radius: int,
+    included_types: Optional[Sequence[str]],
+    language: Optional[str],
+    field_mask: str,
+    max_result_count: int,
+) -> Hashable:
+    lat, lng = location
+    return (
+        round(float(lat), PLACES_CACHE_COORD_DECIMALS),
+        round(float(lng), PLACES_CACHE_COORD_DECIMALS),
+        int(radius),
+        tuple(sorted(set(included_types or ()))),
+        language or "",
+        field_mask,
+        int(max_result_count),
+    )
+
+
+def copy_response(resp: Dict[str, Any]) -> Dict[str, Any]:
+    """캐시된 응답을 호출부가 수정해도 안전하도록 얕은 복사한다."""
+    return {**resp, "places": list(resp.get("places") or [])}
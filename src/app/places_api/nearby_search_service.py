@@ -10,17 +10,24 @@ Google Places API v1 Nearby Search 모듈
 -   `includedTypes`: 검색할 장소 유형 지정 (예: ["restaurant"], ["cafe"])
 -   `FieldMask`: 필요한 필드만 선택적으로 요청 (요금 절감 및 속도 향상)
 -   `languageCode`: 결과 언어 설정 (예: "ko" for 한국어)
+-   `asearch_nearby()`: 같은 기능의 비동기 버전 (공유 커넥션 풀 사용)
+-   응답 캐시: 같은 조건의 검색은 `nearby_cache`(TTL + LRU)에서 바로 반환
+-   single-flight: 동시에 들어온 같은 조건의 검색은 한 번만 호출하고 결과를 공유
+-   로컬 저장: 응답 장소는 `poi_store`(SQLite R-tree)에 누적 기록
 
 공식 문서: https://developers.google.com/maps/documentation/places/web-service/search-nearby
 """
 
 from typing import Optional, Sequence, Tuple, Dict, Any
-import requests
 from config import GOOGLE_PLACES_API_KEY as API_KEY
 from .field_mask_helper import build_field_mask
+from app.core.settings import PLACES_SINGLEFLIGHT_TIMEOUT_S
+from .places_client import places_client, places_flight
+from .nearby_cache import copy_response, nearby_cache, nearby_cache_key
+from .poi_store import poi_store
 
 
-def search_nearby(
+def _build_nearby_request(
     location: Tuple[float, float],
     radius: int = 1600,
     included_types: Optional[Sequence[str]] = None,
@@ -28,28 +35,12 @@ def search_nearby(
     language: Optional[str] = "ko",
     max_result_count: int = 20,
     api_key: Optional[str] = None,
-) -> Dict[str, Any]:
-    """
-    Google Places API v1 Nearby Search를 호출합니다.
-
-    Args:
-        location: (위도, 경도) 튜플 — 검색 중심점
-        radius: 검색 반경 (미터 단위, 기본=1600m)
-        included_types: 포함할 장소 유형 리스트 (예: ["restaurant"])
-        fields: 반환할 필드 목록 (예: ["displayName", "location", "rating"])
-        language: 결과 언어 코드 (기본 "ko")
-        max_result_count: 반환할 최대 장소 수 (기본=20)
-        api_key: 명시적 API 키 (없으면 .env의 GOOGLE_PLACES_API_KEY 사용)
-
-    Returns:
-        dict: Google Places API JSON 응답
-    """
+) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Nearby Search 요청 헤더와 본문을 구성합니다."""
     key = api_key or API_KEY
     if not key:
         raise RuntimeError("❌ GOOGLE_PLACES_API_KEY 누락됨 (.env 확인 필요)")
 
-    url = "https://places.googleapis.com/v1/places:searchNearby"
-
     # ✅ 기본 필드마스크
     default_mask = (
         "places.id,places.displayName,places.formattedAddress,"
@@ -77,18 +68,113 @@ def search_nearby(
 
     # ✅ 유형 설정 (예: ["restaurant"])
     if included_types:
-        payload["includedTypes"] = included_types
+        payload["includedTypes"] = list(included_types)
 
     if language:
         payload["languageCode"] = language
 
-    # ✅ 요청 실행
-    print(f"📡 Google Places Nearby Search 실행: {included_types}, 반경={radius}m, 위치={location}")
-    response = requests.post(url, headers=headers, json=payload, timeout=10)
+    return headers, payload
+
+
+async def _post_nearby(headers: Dict[str, str], payload: Dict[str, Any]) -> Dict[str, Any]:
+    """places-io 루프에서 실제 HTTP 요청을 수행합니다."""
+    response = await places_client.request("POST", "/places:searchNearby", headers=headers, json=payload)
 
     # ✅ 오류 출력 및 예외 발생
-    if not response.ok:
+    if response.is_error:
         print(f"⛔️ Google Nearby API 호출 실패: {response.status_code} {response.text}")
         response.raise_for_status()
 
     return response.json()
+
+
+async def _fetch_nearby(
+    location: Tuple[float, float],
+    radius: int,
+    included_types: Optional[Sequence[str]],
+    language: Optional[str],
+    max_result_count: int,
+    headers: Dict[str, str],
+    payload: Dict[str, Any],
+) -> Dict[str, Any]:
+    """캐시를 먼저 확인하고, miss일 때만 Google에 요청합니다 (동일 요청은 합류)."""
+    cache_key = nearby_cache_key(
+        location, radius, included_types, language, headers["X-Goog-FieldMask"], max_result_count
+    )
+    cached = nearby_cache.get(cache_key)
+    if cached is not None:
+        print(f"♻️ Nearby Search 캐시 hit: {included_types}, 반경={radius}m, 위치={location}")
+        return copy_response(cached)
+
+    async def _fetch_and_store() -> Dict[str, Any]:
+        print(f"📡 Google Places Nearby Search 실행: {included_types}, 반경={radius}m, 위치={location}")
+        resp = await _post_nearby(headers, payload)
+        nearby_cache.set(cache_key, resp)
+        poi_store.record_async(
+            resp.get("places") or [],
+            included_types=included_types,
+            location=location,
+            radius_m=radius,
+            language=language,
+        )
+        return resp
+
+    resp = await places_flight.do(
+        ("nearby", cache_key), _fetch_and_store, timeout=PLACES_SINGLEFLIGHT_TIMEOUT_S
+    )
+    return copy_response(resp)
+
+
+async def asearch_nearby(
+    location: Tuple[float, float],
+    radius: int = 1600,
+    included_types: Optional[Sequence[str]] = None,
+    fields: Optional[Sequence[str]] = None,
+    language: Optional[str] = "ko",
+    max_result_count: int = 20,
+    api_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Google Places API v1 Nearby Search를 비동기로 호출합니다.
+
+    인자와 반환값은 `search_nearby()`와 동일합니다.
+    HTTP 오류 시 `httpx.HTTPStatusError`를 발생시킵니다.
+    """
+    headers, payload = _build_nearby_request(
+        location, radius, included_types, fields, language, max_result_count, api_key
+    )
+    return await places_client.run(
+        _fetch_nearby(location, radius, included_types, language, max_result_count, headers, payload)
+    )
+
+
+def search_nearby(
+    location: Tuple[float, float],
+    radius: int = 1600,
+    included_types: Optional[Sequence[str]] = None,
+    fields: Optional[Sequence[str]] = None,
+    language: Optional[str] = "ko",
+    max_result_count: int = 20,
+    api_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Google Places API v1 Nearby Search를 호출합니다. (동기 shim)
+
+    Args:
+        location: (위도, 경도) 튜플 — 검색 중심점
+        radius: 검색 반경 (미터 단위, 기본=1600m)
+        included_types: 포함할 장소 유형 리스트 (예: ["restaurant"])
+        fields: 반환할 필드 목록 (예: ["displayName", "location", "rating"])
+        language: 결과 언어 코드 (기본 "ko")
+        max_result_count: 반환할 최대 장소 수 (기본=20)
+        api_key: 명시적 API 키 (없으면 .env의 GOOGLE_PLACES_API_KEY 사용)
+
+    Returns:
+        dict: Google Places API JSON 응답
+    """
+    headers, payload = _build_nearby_request(
+        location, radius, included_types, fields, language, max_result_count, api_key
+    )
+    return places_client.run_sync(
+        _fetch_nearby(location, radius, included_types, language, max_result_count, headers, payload)
+    )
@@ -21,7 +21,7 @@ Google Places API 장소 상세 정보 서비스 모듈
 2.  이 모듈의 `get_place_details` 함수를 다른 스크립트(예: `main.py`)에서 임포트하여 사용합니다.
     `from places_api.place_details_service import get_place_details`
 3.  함수 호출 시 `place_id`는 필수이며, `fields`, `language`, `api_key`는 선택 사항입니다.
-4.  API 호출 중 HTTP 오류(예: 4xx, 5xx 상태 코드)가 발생하면 `requests.HTTPError`가 발생합니다.
+4.  API 호출 중 HTTP 오류(예: 4xx, 5xx 상태 코드)가 발생하면 `httpx.HTTPStatusError`가 발생합니다.
     이를 적절히 `try-except` 블록으로 처리하여 오류 상황에 대응해야 합니다.
 
 예시:
@@ -40,19 +40,71 @@ Google Places API 장소 상세 정보 서비스 모듈
         print(f"주소: {details.get('formattedAddress')}")
         print(f"평점: {details.get('rating')}")
 
+비동기 코드에서는 `aget_place_details`를 `await` 하여 사용합니다.
+두 함수 모두 `places_client`의 공유 커넥션 풀을 사용합니다.
+
 필수 라이브러리:
--   `requests`: HTTP 요청을 보내는 데 사용됩니다. (`pip install requests`)
+-   `httpx`: HTTP 요청을 보내는 데 사용됩니다. (`pip install httpx[http2]`)
 -   `config`: API 키 설정을 위해 사용됩니다.
 -   `field_mask_helper`: 필드 마스크 생성을 위해 사용됩니다.
 """
 
-from typing import Optional, Sequence, Dict, Any
-import requests
+from typing import Optional, Sequence, Dict, Any, Tuple
 
 # 상위 디렉토리의 config 모듈에서 API 키를 임포트합니다.
-from config import API_KEY
+from config import GOOGLE_PLACES_API_KEY as API_KEY
 # 같은 패키지 내의 field_mask_helper 모듈에서 필드 마스크 생성 함수를 임포트합니다.
 from .field_mask_helper import build_field_mask
+from app.core.settings import PLACES_SINGLEFLIGHT_TIMEOUT_S
+from .places_client import places_client, places_flight
+
+
+def _build_details_request(
+    place_id: str,
+    fields: Optional[Sequence[str]],
+    language: Optional[str],
+    api_key: Optional[str],
+) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    key = api_key or API_KEY
+    # 장소 상세 정보의 경우 필드 경로는 Place 객체를 직접 참조합니다.
+    # 기본 필드 마스크를 정의합니다.
+    default_mask = (
+        "displayName,location,rating,userRatingCount,priceLevel,currentOpeningHours"
+    )
+    headers = {
+        "X-Goog-Api-Key": key,
+        "X-Goog-FieldMask": build_field_mask(fields, default_mask),
+    }
+
+    # GET 요청의 쿼리 파라미터를 구성합니다.
+    params: Dict[str, Any] = {}
+    if language:
+        params["languageCode"] = language
+
+    # URL 경로에 place_id를 포함합니다.
+    return f"/places/{place_id}", headers, params
+
+
+async def _get_details(path: str, headers: Dict[str, str], params: Dict[str, Any]) -> Dict[str, Any]:
+    async def _request() -> Dict[str, Any]:
+        response = await places_client.request("GET", path, headers=headers, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    # 동시에 들어온 같은 장소 조회는 하나의 요청으로 합칩니다.
+    key = ("details", path, headers["X-Goog-FieldMask"], tuple(sorted(params.items())))
+    return await places_flight.do(key, _request, timeout=PLACES_SINGLEFLIGHT_TIMEOUT_S)
+
+
+async def aget_place_details(
+    place_id: str,
+    fields: Optional[Sequence[str]] = None,
+    language: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """`get_place_details`의 비동기 버전입니다."""
+    path, headers, params = _build_details_request(place_id, fields, language, api_key)
+    return await places_client.run(_get_details(path, headers, params))
 
 
 def get_place_details(
@@ -69,31 +121,10 @@ def get_place_details(
             Place 객체를 직접 참조하므로 `places.` 접두사를 사용하지 않습니다.
             기본값은 이름, 위치, 평점, 평점 수, 가격 수준 및 현재 영업 시간을 반환합니다.
         language: 응답을 위한 선택적 언어 코드입니다.
-        api_key: 사용할 API 키입니다. 제공되지 않으면 `config.API_KEY`를 기본값으로 사용합니다.
+        api_key: 사용할 API 키입니다. 제공되지 않으면 `config.GOOGLE_PLACES_API_KEY`를 기본값으로 사용합니다.
 
     Returns:
-        파싱된 JSON 응답 (딕셔너리 형태). 성공적이지 않은 상태 코드의 경우 ``requests.HTTPError``를 발생시킵니다.
+        파싱된 JSON 응답 (딕셔너리 형태). 성공적이지 않은 상태 코드의 경우 ``httpx.HTTPStatusError``를 발생시킵니다.
     """
-    key = api_key or API_KEY
-    # 장소 상세 정보의 경우 필드 경로는 Place 객체를 직접 참조합니다.
-    # 기본 필드 마스크를 정의합니다.
-    default_mask = (
-        "displayName,location,rating,userRatingCount,priceLevel,currentOpeningHours"
-    )
-    headers = {
-        "X-Goog-Api-Key": key,
-        "X-Goog-FieldMask": build_field_mask(fields, default_mask),
-    }
-    
-    # GET 요청의 쿼리 파라미터를 구성합니다.
-    params: Dict[str, Any] = {}
-    if language:
-        params["languageCode"] = language
-    
-    # URL 경로에 place_id를 포함합니다.
-    url = f"https://places.googleapis.com/v1/places/{place_id}"
-    
-    # HTTP GET 요청을 보냅니다.
-    response = requests.get(url, headers=headers, params=params, timeout=10)
-    response.raise_for_status()
-    return response.json()
+    path, headers, params = _build_details_request(place_id, fields, language, api_key)
+    return places_client.run_sync(_get_details(path, headers, params))
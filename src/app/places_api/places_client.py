@@ -0,0 +1,152 @@
+"""
+Google Places API v1 공용 비동기 HTTP 클라이언트
+------------------------------------------------
+
+모든 Places 호출(Nearby / Text / Details)이 하나의 장수명 `httpx.AsyncClient`를
+공유하도록 하는 모듈입니다. 요청마다 새 커넥션(TLS 핸드셰이크)을 여는 대신
+keep-alive + HTTP/2 커넥션 풀을 재사용합니다.
+
+구조:
+-   커넥션 풀은 전용 이벤트 루프 스레드(`places-io`)에 묶여 있습니다.
+-   FastAPI 루프의 코루틴은 `await places_client.run(coro)` 로,
+    워커 스레드의 동기 코드는 `places_client.run_sync(coro)` 로 같은 풀을 사용합니다.
+-   HTTP/2는 `h2` 패키지가 있을 때만 활성화됩니다 (`pip install httpx[http2]`).
+-   동시에 들어온 동일 요청은 `places_flight`(single-flight)로 하나의 호출로 합쳐집니다.
+-   실제 HTTP 호출 수는 프로세스 전역 `places_limiter`(`PLACES_MAX_CONCURRENCY`)로 제한됩니다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Coroutine, Dict, Optional, TypeVar
+
+import httpx
+
+from app.core.settings import (
+    PLACES_HTTP2,
+    PLACES_KEEPALIVE_EXPIRY_S,
+    PLACES_MAX_CONNECTIONS,
+    PLACES_MAX_KEEPALIVE,
+    PLACES_TIMEOUT_S,
+)
+from app.utils.concurrency import places_limiter
+from app.utils.singleflight import SingleFlight
+
+PLACES_BASE_URL = "https://places.googleapis.com/v1"
+
+T = TypeVar("T")
+
+
+def _http2_available() -> bool:
+    if not PLACES_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        print("⚠️ h2 패키지 없음 → Places 클라이언트 HTTP/1.1 keep-alive로 동작")
+        return False
+    return True
+
+
+class PlacesClient:
+    """전용 이벤트 루프 스레드 위에서 동작하는 Places API 클라이언트."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._http: Optional[httpx.AsyncClient] = None
+
+    # -----------------------------
+    # 이벤트 루프 / 커넥션 풀 관리
+    # -----------------------------
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="places-io", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _client(self) -> httpx.AsyncClient:
+        """places-io 루프 안에서만 호출된다."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=PLACES_BASE_URL,
+                http2=_http2_available(),
+                timeout=httpx.Timeout(PLACES_TIMEOUT_S),
+                limits=httpx.Limits(
+                    max_connections=PLACES_MAX_CONNECTIONS,
+                    max_keepalive_connections=PLACES_MAX_KEEPALIVE,
+                    keepalive_expiry=PLACES_KEEPALIVE_EXPIRY_S,
+                ),
+            )
+        return self._http
+
+    def in_io_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    # -----------------------------
+    # 실행 진입점
+    # -----------------------------
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """코루틴을 places-io 루프에 예약하고 concurrent Future를 반환한다."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    async def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """임의의 이벤트 루프에서 places-io 루프의 결과를 기다린다."""
+        if self.in_io_thread():
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def run_sync(self, coro: Coroutine[Any, Any, T]) -> T:
+        """동기 호출부(워커 스레드)용 shim."""
+        if self.in_io_thread():
+            coro.close()
+            raise RuntimeError("places-io 루프 안에서는 run_sync를 호출할 수 없습니다 (await run 사용)")
+        return self.submit(coro).result()
+
+    # -----------------------------
+    # HTTP 요청 (places-io 루프에서 실행)
+    # -----------------------------
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        headers: Dict[str, str],
+        json: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        async with places_limiter:
+            return await self._client().request(
+                method,
+                path,
+                headers=headers,
+                json=json,
+                params=params,
+                timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout,
+            )
+
+    async def aclose(self) -> None:
+        """커넥션 풀과 places-io 루프를 정리한다 (앱 종료 시 호출)."""
+        with self._lock:
+            loop, thread, http = self._loop, self._thread, self._http
+            self._loop, self._thread, self._http = None, None, None
+        if loop is None:
+            return
+        if http is not None:
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(http.aclose(), loop))
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            await asyncio.to_thread(thread.join, 5)
+        loop.close()
+
+
+# ✅ 프로세스 전역 싱글턴
+places_client = PlacesClient()
+places_flight = SingleFlight("places")
@@ -0,0 +1,294 @@
+"""
+로컬 POI 저장소 (SQLite + R-tree)
+---------------------------------
+
+`search_nearby` / `search_text`로 본 모든 장소를 Place `id` 기준으로 로컬 SQLite에
+누적 저장하고, R-tree 공간 인덱스로 반경 후보를 밀리초 단위로 조회합니다.
+외부 서비스 없이 파일 하나로 동작합니다.
+
+테이블:
+-   `places`:    place_id, 좌표, types, 원본 JSON(payload), updated_at
+-   `places_rtree`: places.rowid 기준 (lat, lng) R-tree 인덱스
+-   `coverage`:  어떤 (타입, 원)을 언제 Google에 물어봤는지 기록 → 신선도 판단
+
+동작 모드 (`POI_STORE_MODE`):
+-   `off`:    사용 안 함
+-   `record`: 응답 저장만 수행. Places 호출이 실패하면 로컬 후보로 대체
+-   `serve`:  record + 검색 영역이 `POI_STORE_MAX_AGE_S` 이내에 수집된 적 있으면
+              Google 호출 없이 로컬 인덱스에서 바로 후보 반환
+
+쓰기는 전용 단일 스레드(`poi-store`)에서 비동기로 처리되어 요청 경로를 막지 않습니다.
+저장할 때마다 `POI_STORE_MAX_AGE_S`보다 오래된 장소 / 수집 이력을 지워 파일 크기가 계속 커지지 않게 합니다.
+기본값은 `off`이며, 켜려면 `POI_STORE_MODE`와 함께 `POI_STORE_PATH`(영속 볼륨 권장)를 지정합니다.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from math import cos, radians
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.settings import POI_STORE_MAX_AGE_S, POI_STORE_MODE, POI_STORE_PATH
+from app.utils.geo import distance_m, within_radius
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    rowid       INTEGER PRIMARY KEY,
+    place_id    TEXT NOT NULL UNIQUE,
+    lat         REAL NOT NULL,
+    lng         REAL NOT NULL,
+    types       TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS places_age_idx ON places(updated_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS places_rtree USING rtree(
+    id, min_lat, max_lat, min_lng, max_lng
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    id          INTEGER PRIMARY KEY,
+    place_type  TEXT NOT NULL,
+    language    TEXT NOT NULL,
+    lat         REAL NOT NULL,
+    lng         REAL NOT NULL,
+    radius_m    REAL NOT NULL,
+    fetched_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_type_idx ON coverage(place_type, language, fetched_at);
+CREATE INDEX IF NOT EXISTS coverage_age_idx ON coverage(fetched_at);
+"""
+
+
+def _bbox(center: Tuple[float, float], radius_m: float) -> Tuple[float, float, float, float]:
+    lat, lng = center
+    d_lat = radius_m / 111320.0
+    d_lng = radius_m / (111320.0 * max(cos(radians(lat)), 1e-6))
+    return lat - d_lat, lat + d_lat, lng - d_lng, lng + d_lng
+
+
+class PoiStore:
+    """Places 응답을 누적하는 로컬 공간 인덱스."""
+
+    def __init__(self, path: str, *, mode: str = "record", max_age_s: float = 86400.0) -> None:
+        self.path = path
+        self.mode = mode if path else "off"
+        self.max_age_s = max_age_s
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # 카운터 전용 락: 요청 경로(이벤트 루프)가 SQLite 쓰기를 잡고 있는 `_lock`을 기다리지 않도록 분리
+        self._stats_lock = threading.Lock()
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self.served = 0
+        self.fallbacks = 0
+        self.recorded = 0
+        self.pruned = 0
+        self.place_count: Optional[int] = None  # 저장된 장소 수 (연결 시 1회 COUNT 후 쓰기마다 갱신)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("record", "serve")
+
+    @property
+    def serving(self) -> bool:
+        return self.mode == "serve"
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            count = conn.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+            with self._stats_lock:
+                self.place_count = count
+            self._conn = conn
+        return self._conn
+
+    # -----------------------------
+    # 쓰기
+    # -----------------------------
+    def record(
+        self,
+        places: Sequence[Dict[str, Any]],
+        *,
+        included_types: Optional[Sequence[str]] = None,
+        location: Optional[Tuple[float, float]] = None,
+        radius_m: Optional[float] = None,
+        language: Optional[str] = None,
+    ) -> None:
+        """장소를 upsert하고, 검색 원이 주어지면 타입별 수집 이력(coverage)을 남긴다."""
+        now = time.time()
+        rows = []
+        for p in places:
+            loc = p.get("location") or {}
+            pid, plat, plng = p.get("id"), loc.get("latitude"), loc.get("longitude")
+            if not pid or plat is None or plng is None:
+                continue
+            types = set(p.get("types") or [])
+            if p.get("primaryType"):
+                types.add(p["primaryType"])
+            rows.append((pid, float(plat), float(plng), f" {' '.join(sorted(types))} ",
+                         json.dumps(p, ensure_ascii=False), now))
+
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN")
+            inserted = 0
+            try:
+                for pid, plat, plng, types, payload, ts in rows:
+                    found = db.execute("SELECT rowid FROM places WHERE place_id = ?", (pid,)).fetchone()
+                    if found is None:
+                        rowid = db.execute(
+                            "INSERT INTO places(place_id, lat, lng, types, payload, updated_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (pid, plat, plng, types, payload, ts),
+                        ).lastrowid
+                        inserted += 1
+                    else:
+                        rowid = found[0]
+                        db.execute(
+                            "UPDATE places SET lat = ?, lng = ?, types = ?, payload = ?, updated_at = ? "
+                            "WHERE rowid = ?",
+                            (plat, plng, types, payload, ts, rowid),
+                        )
+                    db.execute(
+                        "INSERT OR REPLACE INTO places_rtree(id, min_lat, max_lat, min_lng, max_lng) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (rowid, plat, plat, plng, plng),
+                    )
+                if included_types and location is not None and radius_m:
+                    db.executemany(
+                        "INSERT INTO coverage(place_type, language, lat, lng, radius_m, fetched_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        [(t, language or "", float(location[0]), float(location[1]), float(radius_m), now)
+                         for t in set(included_types)],
+                    )
+                # 신선도 판단에 더 이상 쓰이지 않는 수집 이력 / 오래된 장소 정리 (파일 크기 상한)
+                cutoff = now - self.max_age_s
+                db.execute("DELETE FROM coverage WHERE fetched_at < ?", (cutoff,))
+                db.execute(
+                    "DELETE FROM places_rtree WHERE id IN (SELECT rowid FROM places WHERE updated_at < ?)",
+                    (cutoff,),
+                )
+                pruned = db.execute("DELETE FROM places WHERE updated_at < ?", (cutoff,)).rowcount
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            with self._stats_lock:
+                self.recorded += len(rows)
+                self.pruned += max(pruned, 0)
+                self.place_count = (self.place_count or 0) + inserted - max(pruned, 0)
+
+    def record_async(self, places: Sequence[Dict[str, Any]], **kwargs: Any) -> None:
+        """요청 경로를 막지 않도록 전용 스레드에서 저장한다."""
+        if not self.enabled or not places:
+            return
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="poi-store")
+
+        def _job() -> None:
+            try:
+                self.record(list(places), **kwargs)
+            except Exception as e:
+                print(f"⚠️ 로컬 POI 저장 실패: {e}")
+
+        self._writer.submit(_job)
+
+    # -----------------------------
+    # 읽기
+    # -----------------------------
+    def is_fresh(
+        self,
+        location: Tuple[float, float],
+        radius_m: float,
+        included_types: Sequence[str],
+        *,
+        language: Optional[str] = None,
+        max_age_s: Optional[float] = None,
+    ) -> bool:
+        """모든 타입에 대해 검색 원 전체를 덮는 최근 수집 이력이 있는지 확인."""
+        if not included_types:
+            return False
+        since = time.time() - (self.max_age_s if max_age_s is None else max_age_s)
+        with self._lock:
+            db = self._db()
+            for t in set(included_types):
+                rows = db.execute(
+                    "SELECT lat, lng, radius_m FROM coverage "
+                    "WHERE place_type = ? AND language = ? AND fetched_at >= ? AND radius_m >= ?",
+                    (t, language or "", since, float(radius_m)),
+                ).fetchall()
+                if not any(
+                    distance_m(location, (clat, clng)) + radius_m <= crad
+                    for clat, clng, crad in rows
+                ):
+                    return False
+        return True
+
+    def query(
+        self,
+        location: Tuple[float, float],
+        radius_m: float,
+        included_types: Optional[Sequence[str]] = None,
+        *,
+        max_age_s: Optional[float] = None,
+        limit: int = 200,
+    ) -> List[Dict[str, Any]]:
+        """R-tree로 반경 후보를 조회한다 (원 안쪽 + 타입 일치, 평점 수 내림차순)."""
+        min_lat, max_lat, min_lng, max_lng = _bbox(location, radius_m)
+        params: List[Any] = [min_lat, max_lat, min_lng, max_lng]
+        sql = (
+            "SELECT p.lat, p.lng, p.payload FROM places_rtree r JOIN places p ON p.rowid = r.id "
+            "WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lng >= ? AND r.min_lng <= ?"
+        )
+        if max_age_s is not None:
+            sql += " AND p.updated_at >= ?"
+            params.append(time.time() - max_age_s)
+        if included_types:
+            sql += " AND (" + " OR ".join("p.types LIKE ?" for _ in included_types) + ")"
+            params.extend(f"% {t} %" for t in included_types)
+
+        with self._lock:
+            rows = self._db().execute(sql, params).fetchall()
+
+        places = []
+        if rows:
+            # bbox로 거른 후보를 한 번에 원 안쪽 판정 (벡터 연산)
+            lats = [r[0] for r in rows]
+            lngs = [r[1] for r in rows]
+            mask = within_radius(location, lats, lngs, radius_m)
+            places = [json.loads(payload) for (_, _, payload), keep in zip(rows, mask) if keep]
+        places.sort(key=lambda p: p.get("userRatingCount") or 0, reverse=True)
+        return places[:limit]
+
+    def count_served(self) -> None:
+        with self._stats_lock:
+            self.served += 1
+
+    def count_fallback(self) -> None:
+        with self._stats_lock:
+            self.fallbacks += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            info: Dict[str, Any] = {
+                "mode": self.mode,
+                "max_age_s": self.max_age_s,
+                "served": self.served,
+                "fallbacks": self.fallbacks,
+                "recorded": self.recorded,
+                "pruned": self.pruned,
+                "places": self.place_count,  # /health/stats 이벤트 루프에서 SQL을 돌리지 않도록 카운터만
+            }
+        return info
+
+
+# ✅ 프로세스 전역 저장소
+poi_store = PoiStore(POI_STORE_PATH, mode=POI_STORE_MODE, max_age_s=POI_STORE_MAX_AGE_S)
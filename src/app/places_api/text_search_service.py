@@ -1,25 +1,24 @@
 from typing import Optional, Sequence, Tuple, Dict, Any
-import requests
+import json
+import httpx
 
 from config import GOOGLE_PLACES_API_KEY                 # 상대 import 말고 절대 import
 from .field_mask_helper import build_field_mask  # 같은 패키지 내부는 . 로 import
+from app.core.settings import PLACES_SINGLEFLIGHT_TIMEOUT_S
+from .places_client import places_client, places_flight
+from .poi_store import poi_store
 
-TEXT_SEARCH_URL = "https://places.googleapis.com/v1/places:searchText"
+TEXT_SEARCH_PATH = "/places:searchText"
+TEXT_SEARCH_TIMEOUT_S = 30.0
 
-## 🚩 api 조사 🚩
-def search_text(
+def _build_text_request(
     text_query: str,
-    location: Optional[Tuple[float, float]] = None,   # (lat, lon)
-    radius: Optional[int] = None,                     # meters
-    fields: Optional[Sequence[str]] = None,
-    language: str = "ko",
-    api_key: Optional[str] = None,
-) -> Dict[str, Any]:
-    """
-    Google Places Text Search (v1)
-    - FieldMask 헤더 필수
-    - POST + JSON 바디 사용
-    """
+    location: Optional[Tuple[float, float]],
+    radius: Optional[int],
+    fields: Optional[Sequence[str]],
+    language: str,
+    api_key: Optional[str],
+) -> Tuple[Dict[str, str], Dict[str, Any]]:
     api_key = api_key or GOOGLE_PLACES_API_KEY
     if not api_key:
         raise RuntimeError("GOOGLE_PLACES_API_KEY가 설정되지 않았습니다. .env 또는 환경변수 확인하세요.")
@@ -46,17 +45,71 @@ def search_text(
             }
         }
 
-    resp = requests.post(TEXT_SEARCH_URL, headers=headers, json=body, timeout=30)
+    return headers, body
+
 
-    # 400 디버깅을 쉽도록 에러 내용을 그대로 보여줌
-    if not resp.ok:
+async def _post_text(headers: Dict[str, str], body: Dict[str, Any]) -> Dict[str, Any]:
+    resp = await places_client.request(
+        "POST", TEXT_SEARCH_PATH, headers=headers, json=body, timeout=TEXT_SEARCH_TIMEOUT_S
+    )
+
+    # 400 디버깅을 쉽도록 에러 내용을 그대로 보여줌 (API 키는 노출하지 않음)
+    if resp.is_error:
         try:
             detail = resp.json()
         except Exception:
             detail = resp.text
-        raise requests.HTTPError(
+        safe_headers = {k: v for k, v in headers.items() if k != "X-Goog-Api-Key"}
+        raise httpx.HTTPStatusError(
             f"TextSearch 실패 (status={resp.status_code})\n"
-            f"headers={headers}\nbody={body}\nresponse={detail}"
+            f"headers={safe_headers}\nbody={body}\nresponse={detail}",
+            request=resp.request,
+            response=resp,
         )
 
-    return resp.json()
+    data = resp.json()
+    # 텍스트 검색은 영역 전체를 덮지 않으므로 장소만 저장 (수집 이력은 남기지 않음)
+    poi_store.record_async(data.get("places") or [])
+    return data
+
+
+async def _fetch_text(headers: Dict[str, str], body: Dict[str, Any]) -> Dict[str, Any]:
+    """동시에 들어온 같은 TextSearch 요청은 하나로 합쳐서 호출한다."""
+    key = ("text", headers["X-Goog-FieldMask"], json.dumps(body, sort_keys=True, ensure_ascii=False))
+    return await places_flight.do(
+        key, lambda: _post_text(headers, body), timeout=PLACES_SINGLEFLIGHT_TIMEOUT_S
+    )
+
+
+## 🚩 api 조사 🚩
+async def asearch_text(
+    text_query: str,
+    location: Optional[Tuple[float, float]] = None,   # (lat, lon)
+    radius: Optional[int] = None,                     # meters
+    fields: Optional[Sequence[str]] = None,
+    language: str = "ko",
+    api_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Google Places Text Search (v1) — 비동기 버전
+    - 공유 커넥션 풀(places_client) 사용
+    """
+    headers, body = _build_text_request(text_query, location, radius, fields, language, api_key)
+    return await places_client.run(_fetch_text(headers, body))
+
+
+def search_text(
+    text_query: str,
+    location: Optional[Tuple[float, float]] = None,   # (lat, lon)
+    radius: Optional[int] = None,                     # meters
+    fields: Optional[Sequence[str]] = None,
+    language: str = "ko",
+    api_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Google Places Text Search (v1)
+    - FieldMask 헤더 필수
+    - POST + JSON 바디 사용
+    """
+    headers, body = _build_text_request(text_query, location, radius, fields, language, api_key)
+    return places_client.run_sync(_fetch_text(headers, body))
@@ -0,0 +1,218 @@
+"""
+공간 타일 캐시 (geohash 기반)
+-----------------------------
+
+정확한 키 캐시(`nearby_cache`)는 출발점이 50m만 달라도 miss가 납니다.
+이 모듈은 검색 원을 고정된 geohash 타일로 덮고, Places 결과를 (타일, 타입) 단위로
+캐시하여 가까운 사용자끼리 결과를 공유하게 합니다.
+
+동작:
+1.  검색 반경에 맞는 geohash 정밀도를 고르고 (`tile_precision`),
+    검색 원과 겹치는 타일 목록을 계산 (`covering_tiles`)
+2.  (타일, 타입)별 캐시를 조회하고, 없는 조합만 병렬로 Nearby Search
+    (타일 중심 + 타일 외접원 반경으로 검색)
+3.  타일 결과를 place id 기준으로 합쳐 반환
+    → 실제 반경 필터링은 호출부의 `_filter_places_within_radius`가 수행
+
+타일 검색 원의 반경은 사용자 검색 반경 이하가 되도록 정밀도를 정합니다.
+(타일, 타입) 호출도 최대 20개만 반환하므로, 타일 원이 사용자 원보다 넓으면 결과가
+반경 밖으로 흩어져 필터링 뒤 후보가 정확한 키 경로(검색 원 1회 호출)보다 적어집니다.
+예: 반경 1.6km → 정밀도 6 (1.2km × 0.6km 타일, 검색 원 약 0.6km).
+`PLACES_TILE_PRECISION`을 지정하면 그 값으로 고정합니다.
+
+`PLACES_TILE_CACHE_ENABLED=true`일 때만 사용되며 (`area_search` 모듈에서 선택),
+꺼져 있으면 기존 `asearch_nearby`와 동일하게 동작합니다.
+콜드 상태에서는 타입 × 타일 수만큼 호출이 늘어나므로 트래픽이 밀집된
+환경에서 켜는 것을 권장합니다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from math import cos, radians
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.settings import (
+    PLACES_SINGLEFLIGHT_TIMEOUT_S,
+    PLACES_TILE_MAX_ENTRIES,
+    PLACES_TILE_PRECISION,
+    PLACES_TILE_TTL_S,
+)
+from app.utils.geo import distance_m, place_coords, within_radius
+from app.utils.ttl_cache import TTLCache
+from .nearby_search_service import _build_nearby_request, _post_nearby
+from .places_client import places_flight
+from .poi_store import poi_store
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_MAX_NEARBY_RADIUS_M = 50000.0
+_MIN_PRECISION, _MAX_PRECISION = 3, 8
+
+tile_cache: TTLCache[List[Dict[str, Any]]] = TTLCache(
+    ttl_s=PLACES_TILE_TTL_S,
+    max_entries=PLACES_TILE_MAX_ENTRIES,
+    name="places_tiles",
+)
+
+
+# -----------------------------
+# geohash 유틸
+# -----------------------------
+def geohash_encode(lat: float, lng: float, precision: int) -> str:
+    lat_rng, lng_rng = [-90.0, 90.0], [-180.0, 180.0]
+    out: List[str] = []
+    bits, bit_count, even = 0, 0, True
+    while len(out) < precision:
+        rng, val = (lng_rng, lng) if even else (lat_rng, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if val >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            out.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(out)
+
+
+def geohash_bbox(tile: str) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lng, max_lat, max_lng)"""
+    lat_rng, lng_rng = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for ch in tile:
+        val = _BASE32.index(ch)
+        for shift in range(4, -1, -1):
+            rng = lng_rng if even else lat_rng
+            mid = (rng[0] + rng[1]) / 2
+            if (val >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_rng[0], lng_rng[0], lat_rng[1], lng_rng[1]
+
+
+def tile_search_circle(tile: str) -> Tuple[Tuple[float, float], float]:
+    """타일 전체를 덮는 Nearby Search 원 (중심, 반경m)."""
+    min_lat, min_lng, max_lat, max_lng = geohash_bbox(tile)
+    center = ((min_lat + max_lat) / 2, (min_lng + max_lng) / 2)
+    radius = distance_m(center, (max_lat, max_lng))
+    return center, min(radius, _MAX_NEARBY_RADIUS_M)
+
+
+def tile_precision(center: Tuple[float, float], radius_m: float) -> int:
+    """타일 검색 원이 검색 반경을 넘지 않는 가장 큰 타일의 정밀도 (`PLACES_TILE_PRECISION`이 있으면 그 값)."""
+    if PLACES_TILE_PRECISION > 0:
+        return PLACES_TILE_PRECISION
+    lat, lng = center
+    for precision in range(_MIN_PRECISION, _MAX_PRECISION + 1):
+        _, tile_radius = tile_search_circle(geohash_encode(lat, lng, precision))
+        if tile_radius <= radius_m:
+            return precision
+    return _MAX_PRECISION
+
+
+def covering_tiles(center: Tuple[float, float], radius_m: float, precision: int) -> List[str]:
+    """검색 원과 겹치는 geohash 타일 목록."""
+    lat, lng = center
+    d_lat = radius_m / 111320.0
+    d_lng = radius_m / (111320.0 * max(cos(radians(lat)), 1e-6))
+
+    # 타일 한 칸의 크기를 기준으로 원의 외접 사각형을 훑는다
+    min_lat, min_lng, max_lat, max_lng = geohash_bbox(geohash_encode(lat, lng, precision))
+    step_lat = (max_lat - min_lat) / 2
+    step_lng = (max_lng - min_lng) / 2
+
+    tiles: List[str] = []
+    seen = set()
+    y = lat - d_lat
+    while y <= lat + d_lat + step_lat:
+        x = lng - d_lng
+        while x <= lng + d_lng + step_lng:
+            tile = geohash_encode(min(y, lat + d_lat), min(x, lng + d_lng), precision)
+            if tile not in seen:
+                seen.add(tile)
+                t_min_lat, t_min_lng, t_max_lat, t_max_lng = geohash_bbox(tile)
+                nearest = (
+                    min(max(lat, t_min_lat), t_max_lat),
+                    min(max(lng, t_min_lng), t_max_lng),
+                )
+                if distance_m(center, nearest) <= radius_m:
+                    tiles.append(tile)
+            x += step_lng
+        y += step_lat
+    return tiles
+
+
+# -----------------------------
+# 타일 단위 검색
+# -----------------------------
+async def _fetch_tile(
+    tile: str,
+    place_type: str,
+    language: Optional[str],
+    fields: Optional[Sequence[str]],
+) -> List[Dict[str, Any]]:
+    center, radius = tile_search_circle(tile)
+    headers, payload = _build_nearby_request(center, int(radius), [place_type], fields, language)
+    key = (tile, place_type, language or "", headers["X-Goog-FieldMask"])
+
+    cached = tile_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async def _fetch_and_store() -> List[Dict[str, Any]]:
+        print(f"🧱 타일 Nearby Search 실행: tile={tile}, type={place_type}, 반경={int(radius)}m")
+        resp = await _post_nearby(headers, payload)
+        places = resp.get("places", []) or []
+        tile_cache.set(key, places)
+        poi_store.record_async(
+            places, included_types=[place_type], location=center, radius_m=radius, language=language
+        )
+        return places
+
+    return await places_flight.do(("tile", key), _fetch_and_store, timeout=PLACES_SINGLEFLIGHT_TIMEOUT_S)
+
+
+async def search_tiled(
+    location: Tuple[float, float],
+    radius: int,
+    included_types: Sequence[str],
+    language: Optional[str],
+    fields: Optional[Sequence[str]],
+) -> Dict[str, Any]:
+    center = (float(location[0]), float(location[1]))
+    precision = tile_precision(center, float(radius))
+    tiles = covering_tiles(center, float(radius), precision)
+    jobs = [(tile, t) for tile in tiles for t in dict.fromkeys(included_types)]
+    results = await asyncio.gather(
+        *[_fetch_tile(tile, t, language, fields) for tile, t in jobs],
+        return_exceptions=True,
+    )
+
+    merged: Dict[str, Dict[str, Any]] = {}
+    failures = 0
+    for (tile, t), res in zip(jobs, results):
+        if isinstance(res, BaseException):
+            failures += 1
+            print(f"⛔️ 타일 검색 실패 tile={tile}, type={t}: {res}")
+            continue
+        for place in res:
+            pid = place.get("id") or f"{tile}:{len(merged)}"
+            merged.setdefault(pid, place)
+
+    if failures and failures == len(jobs):
+        raise RuntimeError("모든 타일 검색 실패")
+
+    places = list(merged.values())
+    inside = int(within_radius(center, *place_coords(places), float(radius)).sum()) if places else 0
+    # 반경 안 장소 수가 타입당 20개(정확한 키 경로의 상한)보다 눈에 띄게 적으면 정밀도를 올릴 것
+    print(
+        f"🧱 타일 캐시 병합: 정밀도 {precision}, 타일 {len(tiles)}개 × 타입 {len(set(included_types))}개 "
+        f"→ 장소 {len(places)}개 (반경 {radius}m 안 {inside}개)"
+    )
+    return {"places": places}
@@ -1,10 +1,27 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import recommends, health, replace
+from app.core.couple_profile import couple_profiles
+from app.core.prompt_registry import prompt_registry
+from app.places_api.places_client import places_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # LangSmith 프롬프트를 미리 적재 (실패 시 로컬 스냅샷) 후 주기적 갱신 시작
+    await asyncio.to_thread(prompt_registry.warm)
+    prompt_registry.start()
+    yield
+    prompt_registry.stop()
+    # 공유 커넥션 풀 정리
+    await places_client.aclose()
+    await couple_profiles.aclose()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="PitterPetter AI - Reco API")
+    app = FastAPI(title="PitterPetter AI - Reco API", lifespan=lifespan)
 
     # ============================================================
     # 🌐 CORS 설정 (프론트 & API 도메인 허용)
@@ -0,0 +1,6 @@
+# src/app/tests/conftest.py
+# config.py가 import 시점에 Gemini 클라이언트를 만들므로, 실제 키가 없는 환경에서도 모듈을 불러올 수 있게 더미 값 지정
+import os
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("GOOGLE_PLACES_API_KEY", "test-key")
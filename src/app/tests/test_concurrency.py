@@ -0,0 +1,81 @@
+# src/app/tests/test_concurrency.py
+import asyncio
+
+from app.utils.concurrency import ConcurrencyLimiter
+
+
+def test_waiters_are_served_in_fifo_order():
+    limiter = ConcurrencyLimiter("test-fifo", 1)
+    order = []
+
+    async def worker(name):
+        async with limiter:
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await limiter.acquire()  # 슬롯을 먼저 잡아 두고 대기열을 만든다
+        tasks = []
+        for name in "abcd":
+            tasks.append(asyncio.ensure_future(worker(name)))
+            await asyncio.sleep(0)  # 대기열에 들어간 순서를 고정
+        assert limiter.stats()["waiting"] == 4
+        limiter.release()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order == list("abcd")
+    assert limiter.stats()["active"] == 0
+    assert limiter.stats()["peak"] == 1
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    limiter = ConcurrencyLimiter("test-cancel-waiting", 1)
+
+    async def main():
+        await limiter.acquire()
+        cancelled = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        assert limiter.stats()["waiting"] == 0
+
+        nxt = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.wait_for(nxt, timeout=1)
+        limiter.release()
+
+    asyncio.run(main())
+    assert limiter.stats()["active"] == 0
+
+
+def test_cancel_after_grant_passes_the_slot_on():
+    limiter = ConcurrencyLimiter("test-cancel-granted", 1)
+
+    async def main():
+        await limiter.acquire()
+        first = asyncio.ensure_future(limiter.acquire())
+        second = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        # 슬롯이 first에게 넘어가도록 예약된 직후 취소 → second가 받아야 한다
+        limiter.release()
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        await asyncio.wait_for(second, timeout=1)
+        assert limiter.stats()["active"] == 1
+        limiter.release()
+
+    asyncio.run(main())
+    assert limiter.stats()["active"] == 0
+    assert limiter.stats()["waiting"] == 0
+
+
+def test_non_positive_limit_disables_limiting():
+    limiter = ConcurrencyLimiter("test-unlimited", 0)
+
+    async def main():
+        await asyncio.gather(*[limiter.acquire() for _ in range(10)])
+
+    asyncio.run(main())
+    assert limiter.stats()["active"] == 0
@@ -1,7 +1,8 @@
 # test_data.py
 
 from typing import Dict, Any, List
-from app.models.schemas import State, UserData, POIData
+from app.models.lg_schemas import State
+from app.models.schemas import UserData, POIData
 
 # 더미 사용자 데이터 (본인)
 dummy_user_data: UserData = {
@@ -0,0 +1,83 @@
+# src/app/tests/test_fetch_planner.py
+import asyncio
+
+import app.places_api.fetch_planner as fetch_planner
+from app.places_api.fetch_planner import partition_places, plan_nearby_fetches
+from app.utils.filters.categories import category_types
+
+
+def _covered(plan):
+    return [c for fetch in plan for c in fetch.all_categories]
+
+
+def test_every_category_is_covered_exactly_once():
+    cats = ["nature", "walk", "view", "restaurant", "cafe", "walk"]
+    plan = plan_nearby_fetches(cats)
+    covered = _covered(plan)
+    assert sorted(covered) == sorted(set(cats))
+    for fetch in plan:
+        for c in fetch.all_categories:
+            assert set(category_types(c)) <= set(fetch.included_types)
+
+
+def test_subset_categories_ride_along_for_free():
+    # walk(park), view(tourist_attraction) ⊂ nature(park, tourist_attraction)
+    plan = plan_nearby_fetches(["walk", "view", "nature"])
+    assert len(plan) == 1
+    assert plan[0].categories == ["nature"]
+    assert sorted(plan[0].riders) == ["view", "walk"]
+
+
+def test_call_limits_are_respected():
+    cats = ["restaurant", "cafe", "bar", "shopping", "exhibit", "activity"]
+    plan = plan_nearby_fetches(cats, max_types_per_call=3, max_categories_per_call=2)
+    assert sorted(_covered(plan)) == sorted(cats)
+    for fetch in plan:
+        assert len(fetch.categories) <= 2
+        # 한 카테고리의 타입 수가 상한보다 많으면 단독 호출로 남는다
+        assert len(fetch.included_types) <= 3 or len(fetch.categories) == 1
+
+
+def test_partition_places_by_types_and_primary_type():
+    places = [
+        {"id": "1", "types": ["park"]},
+        {"id": "2", "types": ["point_of_interest"], "primaryType": "tourist_attraction"},
+        {"id": "3", "types": ["restaurant"]},
+        {"id": "4", "types": ["cafe", "bakery"]},
+    ]
+    pools = partition_places(places, ["walk", "view", "nature", "cafe"])
+    ids = {c: [p["id"] for p in pool] for c, pool in pools.items()}
+    assert ids == {"walk": ["1"], "view": ["2"], "nature": ["1", "2"], "cafe": ["4"]}
+
+
+def test_disjoint_merge_never_costs_more_calls_than_solo_searches(monkeypatch):
+    # 한 호출은 최대 20개: 타입이 겹치지 않는 두 카테고리가 나눠 가진다
+    returned = {"cafe": 15, "restaurant": 5, "park": 10, "tourist_attraction": 10}
+    calls = []
+
+    async def fake_search(location, radius, included_types, *, language=None):
+        calls.append(list(included_types))
+        places = [
+            {"id": f"{t}-{i}", "types": [t]}
+            for t in included_types
+            for i in range(returned.get(t, 0))
+        ]
+        return {"places": places[:20]}
+
+    monkeypatch.setattr(fetch_planner, "asearch_nearby_area", fake_search)
+    cats = ["restaurant", "cafe", "walk", "view"]
+    pools = asyncio.run(fetch_planner.afetch_category_pools(cats, (37.5, 127.0), 1500, min_pool=11))
+
+    # 몫(20 // 2 = 10)에 못 미친 restaurant만 단독 검색으로 다시 가져온다
+    assert sorted(pools) == ["cafe", "view", "walk"]
+    solo_fallbacks = [c for c in cats if c not in pools]
+    assert len(calls) == 2
+    assert len(calls) + len(solo_fallbacks) < len(cats)
+
+
+def test_min_pool_is_capped_by_the_share_of_one_call():
+    restaurant_cafe, = plan_nearby_fetches(["restaurant", "cafe"])
+    assert fetch_planner.fetch_min_pool(restaurant_cafe, 11) == 10
+    nature, = plan_nearby_fetches(["nature", "walk", "view"])
+    assert fetch_planner.fetch_min_pool(nature, 11) == 11
+    assert fetch_planner.fetch_min_pool(nature, 3) == 3
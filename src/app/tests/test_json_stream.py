@@ -0,0 +1,53 @@
+# src/app/tests/test_json_stream.py
+import json
+
+from app.utils.json_stream import JsonArrayStream
+
+RESPONSE = json.dumps(
+    {"title": "성수 데이트", "explain": "카페 후 산책", "categories": ["cafe", "walk", "restaurant"]},
+    ensure_ascii=False,
+)
+
+
+def _feed_all(stream, chunks):
+    out = []
+    for chunk in chunks:
+        out.extend(stream.feed(chunk))
+    return out
+
+
+def test_items_survive_any_chunk_boundary():
+    for size in (1, 2, 3, 7, len(RESPONSE)):
+        chunks = [RESPONSE[i:i + size] for i in range(0, len(RESPONSE), size)]
+        stream = JsonArrayStream("categories")
+        assert _feed_all(stream, chunks) == [(0, "cafe"), (1, "walk"), (2, "restaurant")]
+        assert stream.done
+
+
+def test_item_is_emitted_as_soon_as_its_quote_closes():
+    stream = JsonArrayStream("categories")
+    assert stream.feed('{"categories": ["ca') == []
+    assert stream.feed('fe", "wa') == [(0, "cafe")]
+    assert stream.feed('lk"]') == [(1, "walk")]
+    assert stream.feed(', "title": "ignored"}') == []
+
+
+def test_escaped_quotes_and_unicode_escapes():
+    text = '{"categories": ["a\\"b", "\\uce74\\ud398", "x\\\\"]}'
+    chunks = [text[i:i + 2] for i in range(0, len(text), 2)]
+    assert _feed_all(JsonArrayStream("categories"), chunks) == [(0, 'a"b'), (1, "카페"), (2, "x\\")]
+
+
+def test_key_text_inside_other_strings_is_ignored():
+    text = json.dumps({
+        "explain": 'say "categories": ["bar"] here',
+        "categories": ["cafe"],
+    })
+    assert _feed_all(JsonArrayStream("categories"), [text]) == [(0, "cafe")]
+
+
+def test_code_fence_and_top_level_array():
+    text = '```json\n  ["cafe", 3, "walk"]\n```'
+    chunks = [text[i:i + 4] for i in range(0, len(text), 4)]
+    # 문자열이 아닌 항목은 건너뛴다
+    assert _feed_all(JsonArrayStream("categories"), chunks) == [(0, "cafe"), (1, "walk")]
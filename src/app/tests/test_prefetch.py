@@ -0,0 +1,27 @@
+# src/app/tests/test_prefetch.py
+from app.nodes.prefetch_node import PrefetchStats
+
+
+def test_call_whose_pools_were_all_dropped_counts_as_waste():
+    stats = PrefetchStats()
+    # cafe+restaurant 호출에서 restaurant 풀이 부족해 버려짐, walk+view 호출은 둘 다 사용 가능
+    stats.record_use(
+        sequence=["restaurant", "walk"],
+        prefetched=["cafe", "walk", "view"],
+        call_groups=[["cafe", "restaurant"], ["walk", "view"]],
+    )
+    out = stats.stats()
+    assert out["wasted_calls"] == 1
+    assert (out["hits"], out["misses"], out["dropped"]) == (1, 1, 1)
+
+
+def test_call_with_a_needed_pool_is_not_waste():
+    stats = PrefetchStats()
+    stats.record_use(
+        sequence=["cafe", "bar"],
+        prefetched=["cafe"],
+        call_groups=[["cafe", "restaurant"]],
+    )
+    out = stats.stats()
+    assert out["wasted_calls"] == 0
+    assert out["dropped"] == 1
@@ -0,0 +1,95 @@
+# src/app/tests/test_request_dedup.py
+import asyncio
+import copy
+
+import app.core.request_dedup as dedup
+from app.core.request_dedup import RecommendDedup, recommend_fingerprint
+
+
+def _body(**choice):
+    user_choice = {
+        "start": [37.51234, 127.05678],
+        "startTime": "2026-10-17T10:00:00Z",
+        "endTime": "2026-10-17T18:00:00Z",
+        "drink_intent": False,
+        "mood": "calm",
+    }
+    user_choice.update(choice)
+    return {"user_choice": user_choice}
+
+
+def test_start_location_is_quantized():
+    base = recommend_fingerprint(7, _body())
+    # 소수 3자리(약 100m) 격자 안에서의 GPS 흔들림은 같은 요청
+    assert recommend_fingerprint(7, _body(start=[37.51231, 127.05681])) == base
+    assert recommend_fingerprint(7, _body(start=[37.5202, 127.05678])) != base
+
+
+def test_keyed_fields_change_the_fingerprint():
+    base = recommend_fingerprint(7, _body())
+    assert recommend_fingerprint(8, _body()) != base
+    assert recommend_fingerprint(7, _body(drink_intent=True)) != base
+    assert recommend_fingerprint(7, _body(endTime="2026-10-17T20:00:00Z")) != base
+
+
+def test_rest_of_body_is_hashed_order_independently():
+    base = recommend_fingerprint(7, _body())
+    reordered = {"user_choice": dict(reversed(list(_body()["user_choice"].items())))}
+    assert recommend_fingerprint(7, reordered) == base
+    assert recommend_fingerprint(7, _body(mood="lively")) != base
+
+    with_excludes = {**_body(), "exclude_pois": [{"name": "카페 A", "seq": 1}]}
+    assert recommend_fingerprint(7, with_excludes) != base
+    assert recommend_fingerprint(7, {**_body(), "planner_mode": "batched"}) != base
+
+
+def test_concurrent_duplicates_share_one_run_and_fresh_bypasses(monkeypatch):
+    monkeypatch.setattr(dedup, "RECOMMEND_DEDUP_ENABLED", True)
+    store = RecommendDedup()
+    runs = 0
+
+    async def pipeline():
+        nonlocal runs
+        runs += 1
+        run_id = runs
+        await asyncio.sleep(0.05)
+        return {"course_id": f"c{run_id}", "data": [{"seq": 1}]}
+
+    async def main():
+        shared = await asyncio.gather(*[store.run("k", pipeline) for _ in range(3)])
+        replayed = await store.run("k", pipeline)
+        replayed["data"].append({"seq": 2})  # 복사본이므로 저장된 결과는 그대로
+        fresh = await store.run("k", pipeline, fresh=True)
+        return shared, copy.deepcopy(replayed), fresh, await store.run("k", pipeline)
+
+    shared, replayed, fresh, after = asyncio.run(main())
+    assert {r["course_id"] for r in shared} == {"c1"}
+    assert replayed["course_id"] == "c1"
+    assert fresh["course_id"] == "c2"
+    assert after == {"course_id": "c2", "data": [{"seq": 1}]}
+    assert runs == 2
+    stats = store.stats()
+    assert (stats["joined"], stats["replayed"], stats["bypassed"]) == (2, 2, 1)
+
+
+def test_empty_results_are_not_replayed(monkeypatch):
+    monkeypatch.setattr(dedup, "RECOMMEND_DEDUP_ENABLED", True)
+    store = RecommendDedup()
+    results = [{"course_id": "c1", "data": []}, {"course_id": "c2", "data": [{"seq": 1}]}]
+    runs = 0
+
+    async def pipeline():
+        nonlocal runs
+        runs += 1
+        return results[runs - 1]
+
+    async def main():
+        return [await store.run("k", pipeline) for _ in range(3)]
+
+    first, retry, replayed = asyncio.run(main())
+    assert first["course_id"] == "c1"
+    # 빈 결과는 저장하지 않으므로 같은 재시도는 파이프라인을 다시 실행
+    assert retry["course_id"] == "c2"
+    assert replayed["course_id"] == "c2"
+    assert runs == 2
+    assert (store.stats()["unstored"], store.stats()["replayed"]) == (1, 1)
@@ -0,0 +1,60 @@
+# src/app/tests/test_route.py
+import app.utils.route as route
+from app.utils.route import optimize_route
+
+START = (37.5, 127.0)
+
+
+def _poi(name, lat, lng=127.0):
+    return {"name": name, "lat": lat, "lng": lng}
+
+
+def _name(poi):
+    return poi["name"]
+
+
+def test_keeps_llm_picks_when_they_are_already_shortest():
+    layers = [[_poi("a", 37.501), _poi("a2", 37.53)], [_poi("b", 37.502), _poi("b2", 37.54)]]
+    plan = optimize_route(layers, START, key=_name)
+    assert plan.choice == [0, 0]
+    assert plan.swapped == []
+    assert plan.total_m == plan.baseline_m
+    assert plan.legs_m[0] > 0
+
+
+def test_swap_penalty_decides_whether_a_closer_alternate_wins():
+    # 원래 선택(far)은 약 2.2km, 차순위(near)는 약 110m
+    layers = [[_poi("far", 37.52), _poi("near", 37.501)]]
+    assert optimize_route(layers, START, swap_penalty_m=500).choice == [1]
+    assert optimize_route(layers, START, swap_penalty_m=5000).choice == [0]
+
+
+def test_same_place_is_never_chosen_for_two_stops():
+    shared = _poi("shared", 37.5005)
+    layers = [
+        [_poi("a", 37.53), shared],
+        [_poi("b", 37.54), dict(shared), _poi("b3", 37.5006)],
+    ]
+    plan = optimize_route(layers, START, key=_name)
+    picked = [layers[i][j]["name"] for i, j in enumerate(plan.choice)]
+    assert len(set(picked)) == len(picked)
+    assert picked == ["shared", "b3"]
+
+
+def test_duplicate_falls_back_to_llm_picks_when_search_is_too_large(monkeypatch):
+    monkeypatch.setattr(route, "MAX_COMBINATIONS", 1)
+    shared = _poi("shared", 37.5005)
+    layers = [[_poi("a", 37.53), shared], [_poi("b", 37.54), dict(shared)]]
+    plan = optimize_route(layers, START, key=_name)
+    assert plan.choice == [0, 0]
+
+
+def test_without_start_first_leg_is_unknown():
+    layers = [[_poi("a", 37.501)], [_poi("b", 37.502)]]
+    plan = optimize_route(layers, None)
+    assert plan.legs_m[0] is None
+    assert plan.total_m == plan.legs_m[1]
+
+
+def test_empty_layer_returns_none():
+    assert optimize_route([[_poi("a", 37.5)], []], START) is None
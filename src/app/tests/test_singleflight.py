@@ -0,0 +1,73 @@
+# src/app/tests/test_singleflight.py
+import asyncio
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_upstream():
+    sf = SingleFlight("test-share")
+    calls = 0
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    async def main():
+        return await asyncio.gather(*[sf.do("k", upstream) for _ in range(5)])
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert all(r == {"ok": True} for r in results)
+    assert sf.stats()["leaders"] == 1
+    assert sf.stats()["shared"] == 4
+
+
+def test_error_is_propagated_but_not_cached():
+    sf = SingleFlight("test-error")
+    calls = 0
+
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        if calls == 1:
+            raise RuntimeError("boom")
+        return "second"
+
+    async def main():
+        first = await asyncio.gather(sf.do("k", flaky), sf.do("k", flaky), return_exceptions=True)
+        second = await sf.do("k", flaky)
+        return first, second
+
+    first, second = asyncio.run(main())
+    # 같은 실패를 두 대기자가 함께 받고, 다음 호출은 upstream을 다시 실행
+    assert all(isinstance(e, RuntimeError) for e in first)
+    assert second == "second"
+    assert calls == 2
+    assert sf.stats()["errors"] == 1
+    assert sf.stats()["inflight"] == 0
+
+
+def test_waiter_timeout_does_not_cancel_shared_upstream():
+    sf = SingleFlight("test-timeout")
+    calls = 0
+
+    async def slow():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def main():
+        patient = asyncio.ensure_future(sf.do("k", slow))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await sf.do("k", slow, timeout=0.01)
+        return await patient
+
+    assert asyncio.run(main()) == "done"
+    assert calls == 1
@@ -0,0 +1,53 @@
+# src/app/tests/test_tile_cache.py
+import asyncio
+import random
+from math import cos, pi, radians, sin, sqrt
+
+import app.places_api.tile_cache as tile_cache_mod
+from app.places_api.tile_cache import geohash_encode, search_tiled, tile_precision, tile_search_circle
+from app.utils.geo import place_coords, within_radius
+
+CENTER = (37.5665, 126.9780)
+
+
+def _uniform_places(center, radius_m, place_type, n=20):
+    """검색 원 안에 고르게 흩어진 장소 n개 (Nearby Search 한 페이지 흉내)."""
+    rnd = random.Random(f"{center}:{radius_m}:{place_type}")
+    out = []
+    for i in range(n):
+        r = radius_m * sqrt(rnd.random())
+        a = rnd.random() * 2 * pi
+        lat = center[0] + r * sin(a) / 111320.0
+        lng = center[1] + r * cos(a) / (111320.0 * cos(radians(center[0])))
+        out.append({
+            "id": f"{place_type}-{i}-{lat:.6f},{lng:.6f}",
+            "types": [place_type],
+            "location": {"latitude": lat, "longitude": lng},
+        })
+    return out
+
+
+def test_precision_keeps_tile_circle_within_search_radius():
+    assert tile_precision(CENTER, 1600) == 6
+    for radius in (300, 1600, 5000):
+        precision = tile_precision(CENTER, radius)
+        _, tile_radius = tile_search_circle(geohash_encode(*CENTER, precision))
+        assert tile_radius <= radius
+        # 한 단계 거친 타일은 검색 반경보다 넓다 (필요 이상으로 잘게 나누지 않음)
+        _, coarser = tile_search_circle(geohash_encode(*CENTER, precision - 1))
+        assert coarser > radius
+
+
+def test_tiled_pool_after_radius_filter_is_not_smaller_than_exact_key(monkeypatch):
+    async def fake_post(headers, payload):
+        circle = payload["locationRestriction"]["circle"]
+        center = (circle["center"]["latitude"], circle["center"]["longitude"])
+        return {"places": _uniform_places(center, circle["radius"], payload["includedTypes"][0])}
+
+    monkeypatch.setattr(tile_cache_mod, "_post_nearby", fake_post)
+    radius = 1600
+    resp = asyncio.run(search_tiled(CENTER, radius, ["cafe"], "ko", None))
+    places = resp["places"]
+    inside = int(within_radius(CENTER, *place_coords(places), radius).sum())
+    # 정확한 키 경로: 검색 원 1회 호출 → 반경 안 최대 20개
+    assert inside >= 20
@@ -0,0 +1,110 @@
+# src/app/utils/concurrency.py
+from __future__ import annotations
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+from app.core.settings import LLM_MAX_CONCURRENCY, PLACES_MAX_CONCURRENCY
+
+_REGISTRY: List["ConcurrencyLimiter"] = []
+
+
+class ConcurrencyLimiter:
+    """
+    프로세스 전역 동시 실행 한도 (async 세마포어).
+
+    - asyncio.Semaphore는 하나의 이벤트 루프에 묶이지만, 이 리미터는
+      요청 루프 / places-io 루프 등 여러 루프에서 함께 쓸 수 있다.
+    - 대기 순서는 FIFO. 반납된 슬롯은 다음 대기자에게 그대로 넘긴다.
+    - limit <= 0 이면 제한하지 않는다.
+    """
+
+    def __init__(self, name: str, limit: int) -> None:
+        self.name = name
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = deque()
+        self.acquired = 0
+        self.waited = 0
+        self.peak = 0
+        _REGISTRY.append(self)
+
+    async def acquire(self) -> None:
+        if self.limit <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                self.acquired += 1
+                self.peak = max(self.peak, self._active)
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+            self.waited += 1
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            fut = waiter[1]
+            if fut.done() and not fut.cancelled():
+                # 슬롯을 받은 직후 취소됨 → 다음 대기자에게 넘긴다
+                self.release()
+            # 넘겨받는 중(_grant 예약)이었다면 _grant가 반납한다
+            raise
+        with self._lock:
+            self.acquired += 1
+
+    def release(self) -> None:
+        if self.limit <= 0:
+            return
+        with self._lock:
+            if self._waiters:
+                # 슬롯을 반납하지 않고 다음 대기자에게 넘긴다 (_active 유지)
+                loop, fut = self._waiters.popleft()
+            else:
+                self._active -= 1
+                return
+        try:
+            loop.call_soon_threadsafe(self._grant, fut)
+        except RuntimeError:  # 대기자의 루프가 이미 닫힘
+            self.release()
+
+    def _grant(self, fut: "asyncio.Future[None]") -> None:
+        if fut.done():  # 대기자가 그 사이 취소됨 → 다음 대기자에게
+            self.release()
+        else:
+            fut.set_result(None)
+
+    async def __aenter__(self) -> "ConcurrencyLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "limit": self.limit,
+                "active": self._active,
+                "waiting": len(self._waiters),
+                "peak": self.peak,
+                "acquired": self.acquired,
+                "waited": self.waited,
+            }
+
+
+def concurrency_stats() -> Dict[str, Dict[str, Any]]:
+    return {lim.name: lim.stats() for lim in _REGISTRY}
+
+
+# ✅ 프로세스 전역 한도 (LLM / Places 별도 설정)
+llm_limiter = ConcurrencyLimiter("llm", LLM_MAX_CONCURRENCY)
+places_limiter = ConcurrencyLimiter("places", PLACES_MAX_CONCURRENCY)
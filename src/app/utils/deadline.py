@@ -0,0 +1,141 @@
+# src/app/utils/deadline.py
+"""
+요청 단위 마감 시간 (deadline) 과 노드별 예산
+---------------------------------------------
+
+`/api/recommends`는 요청이 들어온 시점부터 `PIPELINE_DEADLINE_S` 안에 응답해야 합니다.
+마감 시각은 `state["deadline_ts"]`(time.monotonic 기준)로 LangGraph 상태에 실려 다니고,
+각 노드는 남은 시간 중 자기 몫(예산 조각)만 사용합니다.
+
+노드 예산 = 남은 시간 × (내 비중 / 나와 이후 노드 비중의 합)
+→ 앞 노드가 일찍 끝나면 남은 시간이 뒤 노드로 넘어갑니다.
+단, `NODE_MIN_BUDGET_S`에 있는 노드(시퀀스 LLM)는 남은 시간 안에서 최소 예산을 보장하고,
+그만큼 뒤 노드(agent_runner)의 몫이 줄어듭니다.
+
+기본값은 마감 없음(`PIPELINE_DEADLINE_S=0`)입니다.
+
+예산을 넘긴 노드는 취소하고 노드별 대체 결과(fallback)로 이어갑니다.
+에이전트 단위 대체(사전 수집 후보 중 상위 평점)는 agent_runner가 직접 처리합니다.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.settings import PIPELINE_DEADLINE_S, SEQUENCE_MIN_BUDGET_S
+
+# 노드 실행 순서와 예산 비중
+NODE_SHARES: Dict[str, float] = {
+    "hardfilter": 0.10,
+    "sequence_llm": 0.30,
+    "agent_runner": 0.55,
+    "output_json": 0.05,
+}
+_ORDER = list(NODE_SHARES)
+
+# 비중과 무관하게 보장하는 최소 예산 (시퀀스가 기본 코스로 대체되면 결과물 자체가 바뀌므로)
+NODE_MIN_BUDGET_S: Dict[str, float] = {
+    "sequence_llm": SEQUENCE_MIN_BUDGET_S,
+}
+
+
+def new_deadline(started: Optional[float] = None, budget_s: float = PIPELINE_DEADLINE_S) -> Optional[float]:
+    """요청 시작 시각(monotonic) 기준 마감 시각. budget_s <= 0 이면 None(무제한)."""
+    if budget_s <= 0:
+        return None
+    return (time.monotonic() if started is None else started) + budget_s
+
+
+def remaining(state: Dict[str, Any]) -> Optional[float]:
+    """마감까지 남은 초 (마감이 없으면 None, 지났으면 0)."""
+    deadline_ts = state.get("deadline_ts")
+    if deadline_ts is None:
+        return None
+    return max(0.0, deadline_ts - time.monotonic())
+
+
+def node_budget(state: Dict[str, Any], node: str) -> Optional[float]:
+    """이 노드가 쓸 수 있는 시간(초). 마감이 없으면 None."""
+    left = remaining(state)
+    if left is None:
+        return None
+    if node not in NODE_SHARES:
+        return left
+    later = sum(NODE_SHARES[n] for n in _ORDER[_ORDER.index(node):])
+    share = left * NODE_SHARES[node] / later if later > 0 else left
+    return min(left, max(share, NODE_MIN_BUDGET_S.get(node, 0.0)))
+
+
+class DeadlineStats:
+    """노드별 실행/예산 초과 카운터와 에이전트 대체 횟수."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.nodes: Dict[str, Dict[str, float]] = {}
+        self.agent_fallbacks = 0
+        self.agent_timeouts = 0
+
+    def record(self, node: str, elapsed_s: float, timed_out: bool) -> None:
+        with self._lock:
+            st = self.nodes.setdefault(node, {"runs": 0, "timeouts": 0, "max_s": 0.0})
+            st["runs"] += 1
+            st["timeouts"] += int(timed_out)
+            st["max_s"] = round(max(st["max_s"], elapsed_s), 3)
+
+    def record_agent(self, timed_out: bool, fallbacks: int) -> None:
+        with self._lock:
+            self.agent_timeouts += int(timed_out)
+            self.agent_fallbacks += fallbacks
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "deadline_s": PIPELINE_DEADLINE_S,
+                "nodes": {k: dict(v) for k, v in self.nodes.items()},
+                "agent_timeouts": self.agent_timeouts,
+                "agent_fallbacks": self.agent_fallbacks,
+            }
+
+
+# ✅ 프로세스 전역 카운터
+deadline_stats = DeadlineStats()
+
+
+def with_budget(
+    node: str,
+    fn: Callable[[Dict[str, Any]], Any],
+    fallback: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+) -> Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]:
+    """
+    LangGraph 노드를 예산 안에서 실행하도록 감싼다.
+    -   async 노드 + fallback: 예산을 넘기면 취소 후 `fallback(state)` 반환
+    -   fallback이 없거나 sync 노드: 그대로 실행하고 초과 여부만 기록
+        (agent_runner처럼 노드 안에서 `node_budget`으로 직접 마감을 지키는 경우)
+    """
+
+    async def _run(state: Dict[str, Any]) -> Dict[str, Any]:
+        budget = node_budget(state, node)
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            if not inspect.iscoroutinefunction(fn):
+                return fn(state)
+            if budget is None or fallback is None:
+                return await fn(state)
+            try:
+                return await asyncio.wait_for(fn(state), timeout=budget)
+            except asyncio.TimeoutError:
+                timed_out = True
+                print(f"⏱️ {node} 예산 {budget:.2f}s 초과 → 대체 결과로 진행")
+                return fallback(state)
+        finally:
+            elapsed = time.perf_counter() - started
+            if budget is not None and elapsed > budget:
+                timed_out = True
+            deadline_stats.record(node, elapsed, timed_out)
+
+    _run.__name__ = getattr(fn, "__name__", node)
+    return _run
@@ -11,3 +11,53 @@ OUTDOOR_STRICT = {"walk","nature"}
 MIXED = {"view","attraction","activity","exhibit"}
 
 assert set(ALL_CATEGORIES) == INDOOR_STRICT | OUTDOOR_STRICT | MIXED
+
+# ✅ Google Places 타입 매핑 (category → included_types)
+# Google Places API v1 Nearby Search - Trendy Mapping (<=5 each)
+# Google Places API v1 Nearby Search - 데이트 코스 추천용으로 수정 및 검증된 매핑
+TYPE_MAP = {
+    "restaurant": [
+        "restaurant",  # 'restaurant' 하나로 검색하는 것이 가장 넓고 안정적입니다.
+    ],
+    "cafe": [
+        "cafe", "bakery", "ice_cream_shop",
+    ],
+    "bar": [
+        "bar", "night_club",  # pub, wine_bar는 검색용 타입이 아니므로 bar로 통합 검색합니다.
+    ],
+    "activity": [
+        "amusement_center", "bowling_alley", "gym", "spa", "movie_theater", "performing_arts_theater",
+    ],  # 공연 카테고리를 통합하여 실내 활동의 폭을 넓혔습니다.
+    "attraction": [
+        "tourist_attraction", "museum", "art_gallery", "aquarium", "zoo",
+    ],
+    "exhibit": [
+        "museum", "art_gallery",  # 이 카테고리는 명확해서 그대로 사용합니다.
+    ],
+    "walk": [
+        "park",  # trailhead, plaza 등은 검색 불가. 'park'로 검색하는 것이 가장 적합합니다.
+    ],
+    "view": [
+        "tourist_attraction", # '전망'은 장소 유형이 아니므로, '관광 명소'로 검색 후 LLM이 판단하게 하는 것이 좋습니다. (아래 추가 제안 참고)
+    ],
+    "nature": [
+        "park", "tourist_attraction", # mountain, lake 등 자연물은 검색 불가. '공원', '관광 명소'가 최선입니다.
+    ],
+    "shopping": [
+        "shopping_mall", "department_store", "book_store", "market",
+    ],
+    # 'performance'는 activity에 통합하거나, 그대로 두어도 좋습니다.
+    "performance": [
+        "movie_theater", "performing_arts_theater", "stadium",
+    ],
+}
+
+
+def category_types(category: str) -> list[str]:
+    """카테고리의 Nearby Search includedTypes (매핑이 없으면 카테고리명 그대로)."""
+    types = TYPE_MAP.get(category)
+    if not types:
+        return [category]
+    if isinstance(types, str):
+        return [types]
+    return list(types)
@@ -0,0 +1,190 @@
+# src/app/utils/hedge.py
+"""
+LLM 요청 헤징 (hedged requests)
+-------------------------------
+
+Gemini 호출은 대부분 1.5초 안팎에 끝나지만, 몇 % 정도가 6초 이상 걸려서
+코스 전체 지연을 결정합니다. 헤징은 첫 요청이 최근 지연의 p95(설정값)를 넘기면
+같은 요청을 하나 더 보내고, 먼저 도착한 유효한 응답을 쓰고 나머지는 취소합니다.
+
+-   지연 기준은 호출 종류(sequence / category / planner)별 최근 완료 시간의 백분위
+    (샘플이 적을 때는 `LLM_HEDGE_INITIAL_DELAY_S`)
+-   추가 비용 상한: 헤지 요청 수 / 전체 호출 수 ≤ `LLM_HEDGE_MAX_RATIO`
+-   LLM 동시 실행 한도(`llm_limiter`)에 대기자가 있으면 헤지하지 않음 (혼잡을 키우지 않도록)
+-   첫 요청이 지연 전에 끝나면 결과(성공/실패) 그대로 반환 — 재시도가 아님
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import numpy as np
+
+from app.core.settings import (
+    LLM_HEDGE_ENABLED,
+    LLM_HEDGE_INITIAL_DELAY_S,
+    LLM_HEDGE_MAX_RATIO,
+    LLM_HEDGE_MIN_DELAY_S,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_PERCENTILE,
+)
+from app.utils.concurrency import ConcurrencyLimiter, llm_limiter
+
+T = TypeVar("T")
+
+
+class HedgeStats:
+    """호출 종류별 지연 샘플과 헤지 카운터."""
+
+    def __init__(self, name: str, window: int = 200) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+        self.skipped_budget = 0
+        self.skipped_busy = 0
+        self.errors = 0
+
+    def observe(self, latency_s: float) -> None:
+        with self._lock:
+            self._samples.append(latency_s)
+
+    def delay(self) -> float:
+        """헤지 요청을 보내기까지 기다릴 시간(초)."""
+        with self._lock:
+            samples = list(self._samples)
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_INITIAL_DELAY_S
+        return max(LLM_HEDGE_MIN_DELAY_S, float(np.percentile(samples, LLM_HEDGE_PERCENTILE)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = list(self._samples)
+            out: Dict[str, Any] = {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_rate": round(self.hedged / self.calls, 3) if self.calls else 0.0,
+                "hedge_wins": self.hedge_wins,
+                "primary_wins": self.primary_wins,
+                "skipped_budget": self.skipped_budget,
+                "skipped_busy": self.skipped_busy,
+                "errors": self.errors,
+            }
+        if samples:
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            out.update({"p50_s": round(float(p50), 3), "p95_s": round(float(p95), 3), "p99_s": round(float(p99), 3)})
+        out["delay_s"] = round(self.delay(), 3)
+        return out
+
+
+_STATS: Dict[str, HedgeStats] = {}
+_STATS_LOCK = threading.Lock()
+
+
+def _stats_for(name: str) -> HedgeStats:
+    with _STATS_LOCK:
+        st = _STATS.get(name)
+        if st is None:
+            st = _STATS[name] = HedgeStats(name)
+        return st
+
+
+def hedge_stats() -> Dict[str, Any]:
+    with _STATS_LOCK:
+        items = list(_STATS.items())
+    return {"enabled": LLM_HEDGE_ENABLED, **{name: st.stats() for name, st in items}}
+
+
+async def _attempt(
+    st: HedgeStats,
+    call: Callable[[], Awaitable[T]],
+    limiter: ConcurrencyLimiter,
+) -> T:
+    async with limiter:
+        started = time.perf_counter()
+        result = await call()
+    st.observe(time.perf_counter() - started)
+    return result
+
+
+async def hedged_call(
+    name: str,
+    call: Callable[[], Awaitable[T]],
+    *,
+    validate: Optional[Callable[[Any], bool]] = None,
+    limiter: ConcurrencyLimiter = llm_limiter,
+) -> T:
+    """
+    `call()`을 실행하고, 지연이 길어지면 같은 호출을 한 번 더 보내 먼저 온 유효한 응답을 반환한다.
+    `validate`가 False를 주는 응답(빈 구조화 응답 등)은 다른 쪽을 계속 기다린다.
+    """
+    st = _stats_for(name)
+    with st._lock:
+        st.calls += 1
+    if not LLM_HEDGE_ENABLED:
+        return await _attempt(st, call, limiter)
+
+    is_valid = validate or (lambda r: r is not None)
+    started = time.perf_counter()
+    primary = asyncio.ensure_future(_attempt(st, call, limiter))
+    tasks = {primary}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=st.delay())
+        if done:
+            return primary.result()
+
+        # ✅ 헤지 여부: 비용 상한 / 리미터 혼잡 확인
+        with st._lock:
+            over_budget = st.hedged + 1 > LLM_HEDGE_MAX_RATIO * st.calls
+        busy = limiter.stats().get("waiting", 0) > 0
+        if over_budget or busy:
+            with st._lock:
+                if over_budget:
+                    st.skipped_budget += 1
+                else:
+                    st.skipped_busy += 1
+            return await primary
+
+        with st._lock:
+            st.hedged += 1
+        print(f"🪁 {name} LLM 응답 지연 → 헤지 요청 전송")
+        hedge = asyncio.ensure_future(_attempt(st, call, limiter))
+        tasks.add(hedge)
+
+        last_error: Optional[BaseException] = None
+        last_result: Any = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    last_error = task.exception()
+                    continue
+                result = task.result()
+                if is_valid(result):
+                    with st._lock:
+                        if task is hedge:
+                            st.hedge_wins += 1
+                        else:
+                            st.primary_wins += 1
+                    if task is hedge and not primary.done():
+                        # 취소될 첫 요청의 지연도 (최소값으로) 남겨야 백분위가 꼬리를 잃지 않는다
+                        st.observe(time.perf_counter() - started)
+                    return result
+                last_result = result
+        if last_error is not None and last_result is None:
+            raise last_error
+        return last_result
+    except Exception:
+        with st._lock:
+            st.errors += 1
+        raise
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
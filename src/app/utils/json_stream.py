@@ -0,0 +1,104 @@
+# src/app/utils/json_stream.py
+"""
+LLM 스트리밍 응답에서 JSON 배열 항목을 점진적으로 꺼내는 파서
+--------------------------------------------------------------
+
+시퀀스 LLM은 `{"title": ..., "explain": ..., "categories": ["cafe", "walk", ...]}` 형태로 답하는데,
+응답 전체가 도착해야 `json.loads`를 할 수 있습니다. 이 파서는 토큰 조각을 받을 때마다
+`categories` 배열에서 "따옴표가 닫힌" 문자열 항목만 바로 돌려줍니다.
+
+-   코드 펜스(```json), 키 앞뒤 공백/줄바꿈, 조각 경계에서 잘린 키/문자열을 허용
+-   응답이 최상위 배열(`["cafe", ...]`)이어도 동작
+-   숫자 등 문자열이 아닌 항목은 무시 / 배열이 닫히면(`]`) 이후 입력은 무시
+-   최종 결과는 기존처럼 전체 응답을 다시 파싱해서 확정 (이 파서는 조기 시작용)
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import List, Optional, Tuple
+
+_SEEK, _ARRAY, _STRING, _DONE = range(4)
+
+
+class JsonArrayStream:
+    """`key` 배열의 문자열 항목을 조각 단위 입력에서 점진적으로 추출한다."""
+
+    def __init__(self, key: str = "categories") -> None:
+        self._key_re = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self._buf = ""
+        self._pos = 0            # 다음에 볼 위치
+        self._state = _SEEK
+        self._item_start = 0
+        self._escaped = False
+        self.count = 0           # 지금까지 꺼낸 항목 수
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def _seek(self) -> bool:
+        match = self._key_re.search(self._buf)
+        if match:
+            self._pos = match.end()
+            return True
+        # 최상위 배열 응답 (코드 펜스 허용)
+        head = self._buf.lstrip()
+        offset = len(self._buf) - len(head)
+        if head.startswith("```"):
+            newline = head.find("\n")
+            if newline < 0:
+                return False
+            rest = head[newline + 1:]
+            head = rest.lstrip()
+            offset += newline + 1 + len(rest) - len(head)
+        if head.startswith("["):
+            self._pos = offset + 1
+            return True
+        return False
+
+    def feed(self, chunk: str) -> List[Tuple[int, str]]:
+        """새 조각을 넣고, 이번에 완성된 (인덱스, 문자열) 항목을 반환."""
+        if self._state == _DONE or not chunk:
+            return []
+        self._buf += chunk
+        out: List[Tuple[int, str]] = []
+
+        if self._state == _SEEK:
+            if not self._seek():
+                return out
+            self._state = _ARRAY
+
+        buf, pos = self._buf, self._pos
+        while pos < len(buf):
+            ch = buf[pos]
+            if self._state == _STRING:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    item = self._decode(buf[self._item_start:pos])
+                    if item:
+                        out.append((self.count, item))
+                        self.count += 1
+                    self._state = _ARRAY
+            elif ch == '"':
+                self._state = _STRING
+                self._item_start = pos + 1
+            elif ch == "]":
+                self._state = _DONE
+                pos += 1
+                break
+            pos += 1
+        self._pos = pos
+        return out
+
+    @staticmethod
+    def _decode(raw: str) -> Optional[str]:
+        try:
+            value = json.loads(f'"{raw}"')
+        except json.JSONDecodeError:
+            value = raw
+        value = value.strip()
+        return value or None
@@ -0,0 +1,106 @@
+# src/app/utils/prompt_context.py
+"""
+요청 단위 프롬프트 컨텍스트 (직렬화 메모이즈)
+--------------------------------------------
+
+시퀀스 LLM과 모든 카테고리 에이전트가 같은 user/partner/couple/user_choice를
+매번 `json.dumps(..., indent=2)`로 다시 직렬화하던 것을 요청당 한 번으로 줄입니다.
+
+-   들여쓰기 없는 compact JSON(`,` `:` 구분자)으로 인코딩 → 프롬프트 공백 토큰 절감
+-   state의 값이 같은 객체인 동안은 캐시된 문자열을 재사용
+    (다른 객체로 교체되면 그 필드만 다시 인코딩)
+-   `already_selected_pois`처럼 에이전트 사이에 뒤에 덧붙기만 하는 리스트는
+    새로 추가된 항목만 인코딩해서 이어 붙임 (같은 리스트 객체이고 길이가 줄지 않은 동안).
+    이미 들어 있는 항목을 고치거나 교체한 쪽은 `ctx.invalidate(key)`로 다시 인코딩하게 한다
+    (항목 id 비교로는 제자리 수정이나 해제된 객체의 id 재사용을 잡을 수 없음)
+
+사용: `ctx = get_prompt_context(state)` → `ctx.agent_inputs(state)`
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Tuple
+
+# 정적 필드: (프롬프트 변수명, state 키, 기본값)
+_STATIC_FIELDS: Tuple[Tuple[str, str, Any], ...] = (
+    ("var2", "available_categories", []),
+    ("user1", "user", {}),
+    ("user2", "partner", {}),
+    ("couple", "couple", {}),
+    ("trigger", "user_choice", {}),
+)
+
+
+def compact_dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class PromptContext:
+    """요청 하나 동안 유지되는 프롬프트 입력 인코딩 캐시."""
+
+    def __init__(self) -> None:
+        self._fields: Dict[str, Tuple[Any, str]] = {}
+        self._lists: Dict[str, Tuple[Any, List[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def field(self, state: Dict[str, Any], key: str, default: Any = None) -> str:
+        obj = state.get(key)
+        if obj is None:
+            obj = default
+        cached = self._fields.get(key)
+        if cached is not None and cached[0] is obj:
+            self.hits += 1
+            return cached[1]
+        encoded = compact_dumps(obj)
+        self._fields[key] = (obj, encoded)
+        self.misses += 1
+        return encoded
+
+    def growing_list(self, state: Dict[str, Any], key: str) -> str:
+        """뒤에 덧붙기만 하는 리스트: 새 항목만 인코딩한다 (기존 항목을 바꿨으면 invalidate 필요)."""
+        items = state.get(key) or []
+        cached = self._lists.get(key)
+        if cached is not None and cached[0] is items and len(items) >= len(cached[1]):
+            parts = cached[1]
+            new_items = items[len(parts):]
+            if new_items:
+                self.misses += 1
+            else:
+                self.hits += 1
+            parts.extend(compact_dumps(item) for item in new_items)
+        else:
+            parts = [compact_dumps(item) for item in items]
+            self._lists[key] = (items, parts)
+            self.misses += 1
+        return "[" + ",".join(parts) + "]"
+
+    def invalidate(self, key: str) -> None:
+        """state[key]의 기존 항목을 제자리에서 고쳤거나 교체했을 때 호출 (다음 조회에서 전체 재인코딩)."""
+        self._lists.pop(key, None)
+        self._fields.pop(key, None)
+
+    def sequence_inputs(self, state: Dict[str, Any]) -> Dict[str, str]:
+        """시퀀스 LLM 프롬프트 변수."""
+        inputs = {name: self.field(state, key, default) for name, key, default in _STATIC_FIELDS}
+        inputs["question"] = state.get("query", "")
+        return inputs
+
+    def agent_inputs(self, state: Dict[str, Any]) -> Dict[str, str]:
+        """카테고리 에이전트 프롬프트 변수 (poi_data 제외)."""
+        inputs = self.sequence_inputs(state)
+        inputs["previous_recommendations"] = self.field(state, "previous_recommendations", [])
+        inputs["already_selected_pois"] = self.growing_list(state, "already_selected_pois")
+        return inputs
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def get_prompt_context(state: Dict[str, Any]) -> PromptContext:
+    """state에 붙은 컨텍스트를 돌려주고, 없으면 만들어 붙인다."""
+    ctx = state.get("prompt_context")
+    if not isinstance(ctx, PromptContext):
+        ctx = PromptContext()
+        state["prompt_context"] = ctx
+    return ctx
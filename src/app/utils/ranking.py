@@ -0,0 +1,215 @@
+# src/app/utils/ranking.py
+"""
+LLM 호출 전 후보 사전 정렬 / 축약
+---------------------------------
+
+카테고리 에이전트가 반경 내 후보 전체(최대 20개, 주소 포함)를 `poi_data`로 보내면
+프롬프트가 후보 수만큼 커지고, Gemini 지연과 비용도 함께 늘어납니다.
+
+이 모듈은 후보를 결정적으로 점수화(NumPy 벡터 연산)하여 상위 K개만 남기고,
+필드명을 줄인 축약 형식으로 직렬화합니다.
+
+점수 (0~1 가중합):
+-   평점: 리뷰 수로 보정한 베이지안 평균 (리뷰 3개짜리 5.0점이 과대평가되지 않도록)
+-   리뷰 수: log 스케일
+-   거리: 검색 중심에서 가까울수록 높음 (반경 밖은 0)
+-   가격대 적합도: 커플의 평소 데이트 비용(`date_cost`)으로 추정한 가격대와의 차이
+"""
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.geo import haversine_m
+
+# 점수 가중치
+W_RATING = 0.40
+W_REVIEWS = 0.20
+W_DISTANCE = 0.25
+W_PRICE = 0.15
+
+# 베이지안 평균 보정: 리뷰 PRIOR_COUNT개 분량의 PRIOR_RATING을 더한 것으로 본다
+PRIOR_RATING = 3.8
+PRIOR_COUNT = 20.0
+
+_PRICE_LEVELS = {
+    "PRICE_LEVEL_FREE": 0,
+    "PRICE_LEVEL_INEXPENSIVE": 1,
+    "PRICE_LEVEL_MODERATE": 2,
+    "PRICE_LEVEL_EXPENSIVE": 3,
+    "PRICE_LEVEL_VERY_EXPENSIVE": 4,
+}
+
+# 축약 필드 → 원래 의미 (LLM이 해석할 수 있도록 poi_data에 함께 보냄)
+COMPACT_LEGEND = {
+    "n": "name",
+    "la": "lat",
+    "ln": "lng",
+    "r": "rating",
+    "c": "review_count",
+    "p": "price_level(0~4)",
+    "t": "type",
+    "d": "distance_m",
+}
+
+
+def price_level_int(value: Any) -> Optional[int]:
+    """Google priceLevel enum / 정수 → 0~4 (모르면 None)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    return _PRICE_LEVELS.get(value) if isinstance(value, str) else None
+
+
+def couple_price_target(user: Optional[Dict[str, Any]], partner: Optional[Dict[str, Any]]) -> Optional[float]:
+    """두 사람의 평소 데이트 비용(원) 평균을 Google 가격대(1~4)로 환산."""
+    costs = []
+    for person in (user or {}, partner or {}):
+        try:
+            cost = float(person.get("date_cost") or 0)
+        except (TypeError, ValueError):
+            continue
+        if cost > 0:
+            costs.append(cost)
+    if not costs:
+        return None
+    avg = sum(costs) / len(costs)
+    if avg < 20000:
+        return 1.0
+    if avg < 50000:
+        return 2.0
+    if avg < 100000:
+        return 3.0
+    return 4.0
+
+
+def score_candidates(
+    places: Sequence[Dict[str, Any]],
+    center: Tuple[float, float],
+    radius_m: float,
+    price_target: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """정제된 후보(simplify_places 형식)의 (점수, 거리m) 배열."""
+    n = len(places)
+    if n == 0:
+        return np.zeros(0), np.zeros(0)
+
+    def _col(key: str) -> np.ndarray:
+        return np.array(
+            [np.nan if p.get(key) is None else float(p[key]) for p in places],
+            dtype="float64",
+        )
+
+    rating = _col("rating")
+    reviews = np.nan_to_num(_col("review_count"), nan=0.0)
+    lats, lngs = _col("lat"), _col("lng")
+    price = np.array(
+        [np.nan if price_level_int(p.get("price_level")) is None else price_level_int(p.get("price_level"))
+         for p in places],
+        dtype="float64",
+    )
+
+    # 평점: 베이지안 평균 → 0~1
+    r = np.nan_to_num(rating, nan=PRIOR_RATING)
+    bayes = (reviews * r + PRIOR_COUNT * PRIOR_RATING) / (reviews + PRIOR_COUNT)
+    s_rating = np.clip((bayes - 1.0) / 4.0, 0.0, 1.0)
+
+    # 리뷰 수: log 스케일 (후보 중 최댓값 기준)
+    log_reviews = np.log1p(reviews)
+    s_reviews = log_reviews / log_reviews.max() if log_reviews.max() > 0 else np.zeros(n)
+
+    # 거리: 좌표가 없으면 중간값
+    with np.errstate(invalid="ignore"):
+        dist = haversine_m(center, lats, lngs)
+    s_distance = np.where(np.isnan(dist), 0.5, np.clip(1.0 - dist / max(radius_m, 1.0), 0.0, 1.0))
+
+    # 가격대 적합도: 정보가 없으면 중립(0.5)
+    if price_target is None:
+        s_price = np.full(n, 0.5)
+    else:
+        s_price = np.where(np.isnan(price), 0.5, 1.0 - np.abs(price - price_target) / 4.0)
+
+    score = W_RATING * s_rating + W_REVIEWS * s_reviews + W_DISTANCE * s_distance + W_PRICE * s_price
+    return score, dist
+
+
+def rank_candidates(
+    places: Sequence[Dict[str, Any]],
+    center: Tuple[float, float],
+    radius_m: float,
+    price_target: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """점수 내림차순으로 정렬한 후보 (각 항목에 distance_m 추가, 동점은 이름순)."""
+    if not places:
+        return []
+    score, dist = score_candidates(places, center, radius_m, price_target)
+    names = np.array([p.get("name") or "" for p in places])
+    order = np.lexsort((names, -score))
+    ranked = []
+    for i in order:
+        place = dict(places[i])
+        place["distance_m"] = None if np.isnan(dist[i]) else int(round(dist[i]))
+        ranked.append(place)
+    return ranked
+
+
+def compact_candidates(places: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """LLM 입력용 축약 형식: 필드명 축약 + 불필요 필드(id, 주소) 제거 + 좌표 6자리."""
+    items = []
+    for p in places:
+        item = {
+            "n": p.get("name"),
+            "la": None if p.get("lat") is None else round(float(p["lat"]), 6),
+            "ln": None if p.get("lng") is None else round(float(p["lng"]), 6),
+            "r": p.get("rating"),
+            "c": p.get("review_count"),
+            "p": price_level_int(p.get("price_level")),
+            "t": p.get("type"),
+            "d": p.get("distance_m"),
+        }
+        items.append({k: v for k, v in item.items() if v is not None})
+    return {"legend": COMPACT_LEGEND, "places": items}
+
+
+class PromptSavings:
+    """축약 전/후 poi_data 크기 누적 (토큰 수는 UTF-8 바이트 / 4 로 근사)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.candidates_in = 0
+        self.candidates_out = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+    def record(self, full: Sequence[Dict[str, Any]], sent: Sequence[Dict[str, Any]], payload: str) -> int:
+        before = len(json.dumps(list(full), ensure_ascii=False).encode("utf-8"))
+        after = len(payload.encode("utf-8"))
+        with self._lock:
+            self.calls += 1
+            self.candidates_in += len(full)
+            self.candidates_out += len(sent)
+            self.bytes_before += before
+            self.bytes_after += after
+        return (before - after) // 4
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            saved = self.bytes_before - self.bytes_after
+            return {
+                "calls": self.calls,
+                "candidates_in": self.candidates_in,
+                "candidates_out": self.candidates_out,
+                "bytes_before": self.bytes_before,
+                "bytes_after": self.bytes_after,
+                "approx_tokens_saved": saved // 4,
+                "saved_ratio": round(saved / self.bytes_before, 3) if self.bytes_before else 0.0,
+            }
+
+
+# ✅ 프로세스 전역 카운터
+prompt_savings = PromptSavings()
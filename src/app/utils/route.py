@@ -0,0 +1,131 @@
+# src/app/utils/route.py
+"""
+코스 동선 최적화
+----------------
+
+모든 에이전트가 같은 출발점(`user_choice.start`) 주변을 검색하기 때문에,
+5곳짜리 코스가 반경 전체를 지그재그로 오가는 경우가 생깁니다.
+
+순번(`recommended_sequence`) 순서는 그대로 두고, 각 순번마다
+"LLM이 고른 장소 + 같은 카테고리의 차순위 후보" 중 하나를 골라
+출발점 → 1번 → 2번 → … 의 총 이동 거리가 최소가 되는 조합을 찾습니다.
+
+-   순번 순서가 고정된 체인이므로 Viterbi(DP)로 정확한 최적해를 구함 — O(n·k²)
+-   LLM 선택을 바꾸는 데에는 `swap_penalty_m`만큼의 비용을 더해, 거리 이득이
+    충분히 클 때만 차순위 후보로 교체
+-   같은 장소가 두 순번에 뽑히면 중복 없는 조합을 전수 탐색 (n, k가 작을 때만)
+-   거리는 허버사인 직선거리 (도보/대중교통 실제 경로의 근사값)
+"""
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.geo import distance_matrix, haversine_m, poi_coords
+
+# 전수 탐색 상한 (넘으면 중복이 생긴 순번만 LLM 선택으로 되돌린다)
+MAX_COMBINATIONS = 50_000
+
+
+@dataclass
+class RoutePlan:
+    choice: List[int]                          # 순번별로 고른 후보 인덱스 (0 = 원래 선택)
+    legs_m: List[Optional[float]]              # 순번별 직전 지점에서의 거리 (첫 순번은 출발점 기준)
+    total_m: float                             # 총 이동 거리
+    baseline_m: float                          # 원래 선택 그대로일 때의 총 이동 거리
+    swapped: List[int] = field(default_factory=list)  # 교체된 순번 인덱스
+
+
+def _leg_matrices(
+    layers: Sequence[Sequence[Dict[str, Any]]],
+    start: Optional[Tuple[float, float]],
+) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """출발점 → 첫 순번 거리 벡터와, 인접 순번 간 거리 행렬 목록 (좌표가 없으면 0)."""
+    coords = [poi_coords(layer) for layer in layers]
+    if start is not None:
+        with np.errstate(invalid="ignore"):
+            first = np.nan_to_num(haversine_m(start, *coords[0]), nan=0.0)
+    else:
+        first = np.zeros(len(layers[0]))
+    legs = []
+    for (lat_a, lng_a), (lat_b, lng_b) in zip(coords, coords[1:]):
+        with np.errstate(invalid="ignore"):
+            legs.append(np.nan_to_num(distance_matrix(lat_a, lng_a, lat_b, lng_b), nan=0.0))
+    return first, legs
+
+
+def _path_legs(choice: Sequence[int], first: np.ndarray, legs: List[np.ndarray]) -> List[float]:
+    out = [float(first[choice[0]])]
+    for i, mat in enumerate(legs):
+        out.append(float(mat[choice[i], choice[i + 1]]))
+    return out
+
+
+def optimize_route(
+    layers: Sequence[Sequence[Dict[str, Any]]],
+    start: Optional[Tuple[float, float]] = None,
+    *,
+    swap_penalty_m: float = 0.0,
+    key: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> Optional[RoutePlan]:
+    """
+    `layers[i]`는 i번째 순번의 후보 목록(0번이 원래 선택, lat/lng 필드).
+    `key`를 주면 같은 키의 장소가 두 순번에 동시에 뽑히지 않게 한다.
+    """
+    if not layers or any(len(layer) == 0 for layer in layers):
+        return None
+
+    first, legs = _leg_matrices(layers, start)
+    penalties = [np.where(np.arange(len(layer)) == 0, 0.0, swap_penalty_m) for layer in layers]
+
+    # -----------------------------
+    # Viterbi: cost[j] = 현재 순번에서 후보 j로 끝나는 최소 비용
+    # -----------------------------
+    cost = first + penalties[0]
+    back: List[np.ndarray] = []
+    for i, mat in enumerate(legs):
+        total = cost[:, None] + mat
+        back.append(np.argmin(total, axis=0))
+        cost = total.min(axis=0) + penalties[i + 1]
+
+    choice = [int(np.argmin(cost))]
+    for ptr in reversed(back):
+        choice.append(int(ptr[choice[-1]]))
+    choice.reverse()
+
+    def _has_dup(ch: Sequence[int]) -> bool:
+        if key is None:
+            return False
+        keys = [key(layers[i][j]) for i, j in enumerate(ch)]
+        return len(set(keys)) != len(keys)
+
+    def _cost(ch: Sequence[int]) -> float:
+        return sum(_path_legs(ch, first, legs)) + sum(float(penalties[i][j]) for i, j in enumerate(ch))
+
+    if _has_dup(choice):
+        # 중복 없는 조합 중 최소 비용을 전수 탐색 (원래 선택은 중복이 없다고 가정)
+        best = [0] * len(layers)
+        if int(np.prod([len(layer) for layer in layers])) <= MAX_COMBINATIONS:
+            best_cost = _cost(best)
+            for ch in itertools.product(*[range(len(layer)) for layer in layers]):
+                if _has_dup(ch):
+                    continue
+                c = _cost(ch)
+                if c < best_cost:
+                    best, best_cost = list(ch), c
+        choice = best
+
+    legs_m: List[Optional[float]] = list(_path_legs(choice, first, legs))
+    if start is None:
+        legs_m[0] = None
+    baseline = _path_legs([0] * len(layers), first, legs)
+    return RoutePlan(
+        choice=choice,
+        legs_m=legs_m,
+        total_m=float(sum(d for d in legs_m if d is not None)),
+        baseline_m=float(sum(baseline[1:] if start is None else baseline)),
+        swapped=[i for i, j in enumerate(choice) if j != 0],
+    )
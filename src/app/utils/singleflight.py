@@ -0,0 +1,87 @@
+# src/app/utils/singleflight.py
+from __future__ import annotations
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_REGISTRY: List["SingleFlight"] = []
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 비동기 호출을 하나의 upstream 호출로 합친다.
+
+    - 첫 호출자(leader)가 upstream 작업을 별도 Task로 시작하고,
+      이후 호출자(follower)는 같은 결과를 함께 기다린다.
+    - upstream 예외는 모든 대기자에게 그대로 전파되며, 결과는 저장하지 않는다
+      (완료 즉시 키를 비우므로 실패가 캐시되지 않음).
+    - timeout은 대기자별로 적용된다. 한 대기자가 타임아웃/취소되어도
+      공유 upstream 작업은 다른 대기자를 위해 계속 진행된다.
+    - 이벤트 루프별로 키를 분리하므로 여러 루프에서 같은 인스턴스를 써도 안전하다.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._inflight: Dict[Tuple[int, Hashable], "asyncio.Future[Any]"] = {}
+        self.leaders = 0
+        self.shared = 0
+        self.errors = 0
+        _REGISTRY.append(self)
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        timeout: Optional[float] = None,
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+
+        fut = self._inflight.get(slot)
+        if fut is not None and not fut.done():
+            self.shared += 1
+        else:
+            fut = loop.create_future()
+            self._inflight[slot] = fut
+            self.leaders += 1
+            loop.create_task(self._run(slot, fut, fn))
+
+        if timeout is None:
+            return await asyncio.shield(fut)
+        return await asyncio.wait_for(asyncio.shield(fut), timeout)
+
+    async def _run(
+        self,
+        slot: Tuple[int, Hashable],
+        fut: "asyncio.Future[Any]",
+        fn: Callable[[], Awaitable[Any]],
+    ) -> None:
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            self.errors += 1
+            fut.set_exception(e)
+            fut.exception()  # 대기자가 모두 떠난 경우 "never retrieved" 경고 방지
+        else:
+            fut.set_result(result)
+        finally:
+            if self._inflight.get(slot) is fut:
+                del self._inflight[slot]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "inflight": len(self._inflight),
+            "leaders": self.leaders,
+            "shared": self.shared,
+            "errors": self.errors,
+        }
+
+
+def singleflight_stats() -> Dict[str, Dict[str, Any]]:
+    return {sf.name: sf.stats() for sf in _REGISTRY}
@@ -6,8 +6,12 @@ from zoneinfo import ZoneInfo
 from typing import List, Dict, Any
 
 from app.weather.types import ForecastProvider, WindowSummary
-from app.core.settings import KMA_SERVICE_KEY
+from app.core.settings import KMA_SERVICE_KEY, WEATHER_SINGLEFLIGHT_TIMEOUT_S
 from app.weather.weather_urls import KMA_ENDPOINT
+from app.utils.singleflight import SingleFlight
+
+# 같은 격자/발표시각의 동시 예보 조회는 한 번만 호출
+_flight = SingleFlight("kma")
 
 # ✅ 위경도 → 기상청 격자 변환 함수
 def latlon_to_grid(lat: float, lon: float) -> tuple[int, int]:
@@ -53,6 +57,12 @@ def latlon_to_grid(lat: float, lon: float) -> tuple[int, int]:
 class KmaForecastProvider(ForecastProvider):
     """한국 기상청 동네예보 기반 Provider"""
 
+    async def _fetch(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        async with httpx.AsyncClient(timeout=7.0) as client:
+            r = await client.get(KMA_ENDPOINT, params=params)
+            r.raise_for_status()
+            return r.json().get("response", {}).get("body", {}).get("items", {}).get("item", [])
+
     async def window_summary(self, *, lat: float, lon: float, start_dt: datetime, end_dt: datetime) -> WindowSummary:
         nx, ny = latlon_to_grid(lat, lon)
 
@@ -71,10 +81,11 @@ class KmaForecastProvider(ForecastProvider):
             "ny": ny,
         }
 
-        async with httpx.AsyncClient(timeout=7.0) as client:
-            r = await client.get(KMA_ENDPOINT, params=params)
-            r.raise_for_status()
-            items = r.json().get("response", {}).get("body", {}).get("items", {}).get("item", [])
+        items = await _flight.do(
+            (nx, ny, base_date, base_time),
+            lambda: self._fetch(params),
+            timeout=WEATHER_SINGLEFLIGHT_TIMEOUT_S,
+        )
 
         # 필요한 데이터 추출
         temps, hums, conds = [], [], []
@@ -5,10 +5,16 @@ from zoneinfo import ZoneInfo
 import httpx
 from typing import List, Dict, Any
 
-from app.core.settings import OPENWEATHER_API_KEY, TEMP_HOT_C, TEMP_COLD_C, HUMIDITY_HIGH
+from app.core.settings import (
+    OPENWEATHER_API_KEY, TEMP_HOT_C, TEMP_COLD_C, HUMIDITY_HIGH, WEATHER_SINGLEFLIGHT_TIMEOUT_S,
+)
 from app.weather.weather_urls import OpenWeatherEndpoint, openweather_url
 from app.utils.timewindow import slot_overlaps
 from app.weather.types import ForecastProvider, WindowSummary
+from app.utils.singleflight import SingleFlight
+
+# 같은 좌표의 동시 예보 조회는 한 번만 호출
+_flight = SingleFlight("openweather")
 
 class Free3hForecastProvider(ForecastProvider):
     """
@@ -20,6 +26,12 @@ class Free3hForecastProvider(ForecastProvider):
             raise RuntimeError("OPENWEATHER_API_KEY missing")
 
     async def _get(self, *, lat: float, lon: float) -> List[Dict[str, Any]]:
+        key = (self.api_key, round(float(lat), 4), round(float(lon), 4))
+        return await _flight.do(
+            key, lambda: self._fetch(lat=lat, lon=lon), timeout=WEATHER_SINGLEFLIGHT_TIMEOUT_S
+        )
+
+    async def _fetch(self, *, lat: float, lon: float) -> List[Dict[str, Any]]:
         url = openweather_url(OpenWeatherEndpoint.FORECAST_3H)
         params = {"lat": lat, "lon": lon, "appid": self.api_key, "units": "metric"}
         async with httpx.AsyncClient(timeout=7.0) as client: